@@ -0,0 +1,20 @@
+from django.contrib import admin
+from .models import AuditEvent
+
+
+@admin.register(AuditEvent)
+class AuditEventAdmin(admin.ModelAdmin):
+    """Read-only admin for the audit log"""
+
+    list_display = ('occurred_at', 'model', 'object_id', 'action', 'user')
+    list_filter = ('action', 'model')
+    search_fields = ('model', 'object_id')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class AuditAction(models.TextChoices):
+    """What happened to the audited record"""
+    CREATE = 'CREATE', 'Create'
+    UPDATE = 'UPDATE', 'Update'
+    SOFT_DELETE = 'SOFT_DELETE', 'Soft delete'
+    RESTORE = 'RESTORE', 'Restore'
+
+
+class AuditEventQuerySet(models.QuerySet):
+
+    def for_object(self, obj, object_id=None):
+        """
+        History of one record, oldest first: for_object(job), or
+        for_object('jobs.job', 5) for a record that may be gone.
+        """
+        if object_id is None:
+            model, object_id = obj._meta.label_lower, obj.pk
+        else:
+            model = obj.lower()
+        return self.filter(model=model, object_id=object_id).order_by('id')
+
+
+class AuditEvent(models.Model):
+    """
+    Append-only history of BaseModel changes.
+    Written in batches by libs/audit.py, never updated or deleted.
+    Not a BaseModel itself: it would audit its own writes.
+    """
+
+    model = models.CharField(max_length=100)  # e.g. 'jobs.job'
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=20, choices=AuditAction.choices)
+    changes = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        help_text='Changed fields, e.g. {"title": ["Old", "New"]}'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_constraint=False,
+        related_name='audit_events'
+    )
+    occurred_at = models.DateTimeField()
+
+    objects = AuditEventQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.action} {self.model}#{self.object_id}"
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['model', 'object_id', 'id']),
+        ]
@@ -0,0 +1,14 @@
+from rest_framework import serializers
+from .models import AuditEvent
+
+
+class AuditEventSerializer(serializers.ModelSerializer):
+    """Serializer for reading audit events"""
+
+    class Meta:
+        model = AuditEvent
+        fields = [
+            'id', 'model', 'object_id', 'action', 'changes',
+            'user', 'occurred_at'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,202 @@
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from libs.audit import AuditWriter
+from users.models import User, UserRole
+from companies.models import Company, Industry
+from jobs.models import Job
+from .models import AuditEvent, AuditAction
+
+SYNC_AUDIT = {'ENABLED': True, 'ASYNC': False}
+
+
+# Job writes also refresh the candidate feed on commit: in this thread
+@override_settings(AUDIT_LOG=SYNC_AUDIT, JOB_FEED={'ASYNC': False})
+class AuditEventTests(TestCase):
+    """Tests for audit events recorded on BaseModel changes"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            phone='0502222222',
+            password='testpass123',
+            role=UserRole.COMPANY
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.company = Company.objects.create(
+                user=self.user,
+                name='TechCorp',
+                industry=Industry.TECH,
+                location='Riyadh',
+                created_by=self.user
+            )
+
+    def history(self, obj):
+        return list(AuditEvent.objects.for_object(obj))
+
+    def test_create_records_initial_values(self):
+        """Test creating a record logs a CREATE event with its values"""
+        [event] = self.history(self.company)
+        self.assertEqual(event.action, AuditAction.CREATE)
+        self.assertEqual(event.user, self.user)
+        self.assertEqual(event.changes['name'], [None, 'TechCorp'])
+        self.assertNotIn('created_at', event.changes)
+
+    def test_update_records_only_changed_fields(self):
+        """Test an update logs a field-level diff"""
+        company = Company.objects.get(pk=self.company.pk)
+        company.name = 'TechCorp Arabia'
+        company.updated_by = self.user
+        with self.captureOnCommitCallbacks(execute=True):
+            company.save()
+
+        event = self.history(company)[-1]
+        self.assertEqual(event.action, AuditAction.UPDATE)
+        self.assertEqual(event.changes, {'name': ['TechCorp', 'TechCorp Arabia']})
+        self.assertEqual(event.user, self.user)
+
+    def test_save_without_changes_records_nothing(self):
+        """Test saving an unchanged record logs no event"""
+        company = Company.objects.get(pk=self.company.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            company.save()
+        self.assertEqual(len(self.history(company)), 1)
+
+    def test_in_place_json_edit_is_detected(self):
+        """Test mutating a JSON list in place still shows in the diff"""
+        job = Job.objects.create(
+            company=self.company, title='Engineer', description='Description',
+            requirements='Requirements', location='Riyadh', required_skills=['Python']
+        )
+        job = Job.objects.get(pk=job.pk)
+        job.required_skills.append('Django')
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+        event = self.history(job)[-1]
+        self.assertEqual(
+            event.changes['required_skills'], [['Python'], ['Python', 'Django']]
+        )
+
+    def test_soft_delete_and_restore(self):
+        """Test soft delete and restore are logged with the cascade"""
+        job = Job.objects.create(
+            company=self.company, title='Engineer', description='Description',
+            requirements='Requirements', location='Riyadh'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.company.soft_delete(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.company.restore()
+
+        actions = [e.action for e in self.history(self.company)]
+        self.assertEqual(
+            actions, [AuditAction.CREATE, AuditAction.SOFT_DELETE, AuditAction.RESTORE]
+        )
+        job_actions = [e.action for e in self.history(job)]
+        self.assertEqual(job_actions, [AuditAction.SOFT_DELETE, AuditAction.RESTORE])
+        self.assertEqual(self.history(job)[0].user, self.user)
+
+    def test_rolled_back_change_is_not_logged(self):
+        """Test events are only queued once the transaction commits"""
+        company = Company.objects.get(pk=self.company.pk)
+        company.name = 'Never saved'
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            company.save()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(len(self.history(company)), 1)
+
+    @override_settings(AUDIT_LOG={'ENABLED': False})
+    def test_disabled(self):
+        """Test nothing is recorded when the audit log is disabled"""
+        company = Company.objects.get(pk=self.company.pk)
+        company.name = 'Quiet'
+        with self.captureOnCommitCallbacks(execute=True):
+            company.save()
+        self.assertEqual(len(self.history(company)), 1)
+
+
+@override_settings(AUDIT_LOG={'ASYNC': True, 'MAX_QUEUE_SIZE': 3, 'BATCH_SIZE': 2})
+class AuditWriterTests(TestCase):
+    """Tests for the buffered writer (background thread stubbed out)"""
+
+    def event(self, object_id):
+        return {
+            'model': 'jobs.job', 'object_id': object_id, 'action': 'UPDATE',
+            'changes': {}, 'user_id': None, 'occurred_at': '2025-01-01T00:00:00Z',
+        }
+
+    @mock.patch.object(AuditWriter, '_run')
+    def test_events_are_buffered_until_flush(self, _run):
+        """Test events stay in memory until flushed"""
+        writer = AuditWriter()
+        writer.put([self.event(1), self.event(2)])
+        self.assertEqual(AuditEvent.objects.count(), 0)
+        writer.flush()
+        self.assertEqual(AuditEvent.objects.count(), 2)
+
+    @mock.patch.object(AuditWriter, '_run')
+    def test_full_queue_applies_backpressure(self, _run):
+        """Test a full queue is drained by the producer, not dropped"""
+        writer = AuditWriter()
+        writer.put([self.event(i) for i in range(5)])
+        # Queue held 3, the 4th put flushed them
+        self.assertEqual(AuditEvent.objects.count(), 3)
+        writer.flush()
+        self.assertEqual(AuditEvent.objects.count(), 5)
+
+    @mock.patch.object(AuditWriter, '_run')
+    def test_queue_refilled_during_flush_writes_directly(self, _run):
+        """Test an event is written, not lost, when the queue stays full"""
+        writer = AuditWriter()
+        writer.put([self.event(i) for i in range(3)])
+        with mock.patch.object(AuditWriter, 'flush'):
+            writer.put([self.event(3)])
+        self.assertEqual(list(AuditEvent.objects.values_list('object_id', flat=True)), [3])
+
+    @mock.patch('libs.audit.close_old_connections')
+    @mock.patch.object(AuditWriter, '_take', side_effect=[[], [None], SystemExit])
+    @mock.patch.object(AuditWriter, 'write')
+    def test_writer_thread_releases_its_connection(self, write, _take, close):
+        """Test the writer thread closes its connection after each batch"""
+        with self.assertRaises(SystemExit):
+            AuditWriter()._run()
+        write.assert_called_once_with([None])
+        close.assert_called_once_with()
+
+
+@override_settings(AUDIT_LOG=SYNC_AUDIT)
+class AuditAPITests(APITestCase):
+    """Tests for the object history endpoint"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            phone='0501111111',
+            password='adminpass123'
+        )
+        self.user = User.objects.create_user(
+            phone='0502222222',
+            password='testpass123',
+            role=UserRole.COMPANY
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.company = Company.objects.create(
+                user=self.user, name='TechCorp', location='Riyadh'
+            )
+        self.url = reverse(
+            'audit-history', kwargs={'model': 'companies.company', 'object_id': self.company.pk}
+        )
+
+    def test_history_as_admin(self):
+        """Test admins can read an object's history"""
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['action'], 'CREATE')
+
+    def test_history_forbidden_for_non_admin(self):
+        """Test regular users cannot read the audit log"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import ObjectHistoryView
+
+urlpatterns = [
+    path('<str:model>/<int:object_id>/', ObjectHistoryView.as_view(), name='audit-history'),
+]
@@ -0,0 +1,19 @@
+from rest_framework import generics, permissions
+from .models import AuditEvent
+from .serializers import AuditEventSerializer
+
+
+class ObjectHistoryView(generics.ListAPIView):
+    """
+    History of one record (admins only).
+    GET /api/audit/{app_label}.{model}/{id}/   e.g. /api/audit/jobs.job/5/
+
+    Events are written behind the request, so the newest change
+    may take up to AUDIT_LOG['FLUSH_INTERVAL'] seconds to appear.
+    """
+    serializer_class = AuditEventSerializer
+    permission_classes = [permissions.IsAdminUser]
+    filter_backends = []
+
+    def get_queryset(self):
+        return AuditEvent.objects.for_object(self.kwargs['model'], self.kwargs['object_id'])
@@ -0,0 +1,27 @@
+# benchmarks/_django.py
+"""Bootstrap Django for benchmark scripts against a throwaway SQLite file"""
+import os
+import tempfile
+
+
+def setup(db_path=None, **overrides):
+    """
+    Configure settings, point the default database at `db_path` (a new
+    temp file by default) and migrate it. `overrides` are applied to
+    django.conf.settings first. Returns the database path.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mini_sbr.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark-only')
+
+    import django
+    from django.conf import settings
+
+    db_path = db_path or os.path.join(tempfile.mkdtemp(prefix='mini-sbr-bench-'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return db_path
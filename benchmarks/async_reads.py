@@ -0,0 +1,190 @@
+# benchmarks/async_reads.py
+"""
+Concurrent-connection capacity of the job read endpoints: WSGI with the
+sync viewsets vs ASGI with the async read views (libs/async_views.py).
+
+    python -m benchmarks.async_reads
+    python -m benchmarks.async_reads --clients 400 --client-delay 0.2 --workers 8
+
+Every client is a connection that keeps sending GET /api/jobs/?page=N
+and GET /api/jobs/{id}/ and reads each response slowly (--client-delay
+seconds, e.g. a mobile network). Under WSGI the worker thread is held
+for that time; under ASGI the event loop serves other connections.
+Only responses completed within --seconds are counted. Each mode runs
+in its own process, servers are driven in-process.
+"""
+import argparse
+import asyncio
+import io
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks._django import setup
+
+MODES = {
+    'wsgi': 'WSGI, sync viewsets',
+    'asgi-sync': 'ASGI, sync viewsets',
+    'asgi': 'ASGI, async views',
+}
+
+
+def paths(ids, index):
+    if index % 2:
+        return f'/api/jobs/{ids[index % len(ids)]}/', ''
+    return '/api/jobs/', f'page={index % 10 + 1}'
+
+
+def run_wsgi(ids, args):
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+    workers = ThreadPoolExecutor(max_workers=args.workers)
+
+    def serve(path, query):
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query,
+            'SERVER_NAME': 'bench', 'SERVER_PORT': '80', 'HTTP_HOST': 'bench',
+            'wsgi.input': io.BytesIO(b''), 'wsgi.errors': sys.stderr,
+            'wsgi.url_scheme': 'http',
+        }
+        statuses = []
+        body = b''.join(handler(environ, lambda status, headers: statuses.append(status)))
+        # Slow client: the worker is busy until the response is read
+        time.sleep(args.client_delay)
+        return statuses[0], body
+
+    latencies, failures = [], []
+    deadline = time.perf_counter() + args.seconds
+
+    def client(offset):
+        index = offset
+        while time.perf_counter() < deadline:
+            index += args.clients
+            started = time.perf_counter()
+            status, _ = workers.submit(serve, *paths(ids, index)).result()
+            finished = time.perf_counter()
+            if finished <= deadline:
+                (latencies if status.startswith('200') else failures).append(finished - started)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    workers.shutdown()
+    return latencies, failures
+
+
+def run_asgi(ids, args):
+    from django.core.handlers.asgi import ASGIHandler
+
+    handler = ASGIHandler()
+    latencies, failures = [], []
+
+    async def request(path, query):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': query.encode(), 'root_path': '',
+            'headers': [(b'host', b'bench')],
+            'server': ('bench', 80), 'client': ('127.0.0.1', 50000),
+        }
+        received = False
+        statuses = []
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await asyncio.Event().wait()  # Client stays connected
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+            elif not message.get('more_body'):
+                # Slow client: only this connection waits
+                await asyncio.sleep(args.client_delay)
+
+        await handler(scope, receive, send)
+        return statuses[0]
+
+    async def client(offset, deadline):
+        index = offset
+        while time.perf_counter() < deadline:
+            index += args.clients
+            started = time.perf_counter()
+            status = await request(*paths(ids, index))
+            finished = time.perf_counter()
+            if finished <= deadline:
+                (latencies if status == 200 else failures).append(finished - started)
+
+    async def main():
+        deadline = time.perf_counter() + args.seconds
+        await asyncio.gather(*(client(n, deadline) for n in range(args.clients)))
+
+    asyncio.run(main())
+    return latencies, failures
+
+
+def run_mode(args):
+    setup(AUDIT_LOG={'ENABLED': False}, ASYNC_READ_VIEWS=args.mode == 'asgi', DEBUG=False)
+
+    from companies.models import Company
+    from jobs.models import Job
+    from users.models import User, UserRole
+
+    owner = User.objects.create_user(phone='0500000000', password='x', role=UserRole.COMPANY)
+    company = Company.objects.create(user=owner, name='BenchCorp', location='Riyadh')
+    Job.objects.bulk_create([
+        Job(company=company, title=f'Job {i}', description='Description',
+            requirements='Requirements', location='Riyadh', required_skills=['Python'])
+        for i in range(args.rows)
+    ])
+    ids = list(Job.objects.values_list('pk', flat=True))
+
+    run = run_wsgi if args.mode == 'wsgi' else run_asgi
+    latencies, failures = run(ids, args)
+    p99 = sorted(latencies)[int(len(latencies) * 0.99)] if latencies else float('nan')
+    print(
+        f'{MODES[args.mode]:<22} {len(latencies) / args.seconds:>8.1f} '
+        f'{statistics.median(latencies or [float("nan")]) * 1000:>8.0f} '
+        f'{p99 * 1000:>8.0f} {len(failures):>7}',
+        flush=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--mode', choices=MODES, help='Run one mode only')
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--clients', type=int, default=200, help='Concurrent connections')
+    parser.add_argument('--client-delay', type=float, default=0.1, help='Seconds per response read')
+    parser.add_argument('--workers', type=int, default=8, help='WSGI worker threads')
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args)
+        return
+
+    print(
+        f'{args.clients} connections, {args.client_delay * 1000:.0f} ms per response read, '
+        f'{args.workers} WSGI workers, {args.seconds:g}s per mode\n'
+    )
+    print(f'{"mode":<22} {"req/s":>8} {"p50 ms":>8} {"p99 ms":>8} {"errors":>7}')
+    for mode in MODES:
+        subprocess.run(
+            [sys.executable, '-m', 'benchmarks.async_reads', '--mode', mode]
+            + [f'--{name.replace("_", "-")}={value}' for name, value in vars(args).items()
+               if name != 'mode'],
+            check=True
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/dirty_fields.py
+"""
+Write amplification of one-field PATCHes, with and without
+BaseModel dirty-field tracking.
+
+    python -m benchmarks.dirty_fields
+    python -m benchmarks.dirty_fields --rows 1000 --text-kb 20
+
+Each scenario runs the write serializers the API uses
+(JobWriteSerializer / CandidateWriteSerializer with partial=True) and
+records the UPDATE statements sent to the database.
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+from benchmarks._django import setup
+
+
+def run_updates(model, serializer_class, instances, request, field, value):
+    """PATCH `field` on every instance, return (bytes, statements, seconds)"""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    table = f'UPDATE "{model._meta.db_table}"'
+    started = time.perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        for index, instance in enumerate(instances):
+            serializer = serializer_class(
+                instance, data={field: f'{value} {index}'},
+                partial=True, context={'request': request}
+            )
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
+    elapsed = time.perf_counter() - started
+    updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith(table)]
+    return sum(len(sql) for sql in updates), len(updates), elapsed
+
+
+def run_noop_saves(instances):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        for instance in instances:
+            instance.save()
+    return len(queries.captured_queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=300)
+    parser.add_argument('--text-kb', type=int, default=10, help='Size of description/bio')
+    args = parser.parse_args()
+
+    setup(AUDIT_LOG={'ENABLED': False})
+
+    from libs.base_models import BaseModel
+    from users.models import User, UserRole
+    from companies.models import Company
+    from candidates.models import Candidate
+    from candidates.serializers import CandidateWriteSerializer
+    from jobs.models import Job
+    from jobs.serializers import JobWriteSerializer
+
+    text = ('Lorem ipsum dolor sit amet. ' * 40 * args.text_kb)[:args.text_kb * 1024]
+    owner = User.objects.create_user(phone='0500000000', password='x', role=UserRole.COMPANY)
+    company = Company.objects.create(user=owner, name='BenchCorp', location='Riyadh')
+    request = SimpleNamespace(user=owner)
+
+    Job.objects.bulk_create([
+        Job(company=company, title=f'Job {i}', description=text,
+            requirements=text, location='Riyadh')
+        for i in range(args.rows)
+    ])
+    users = User.objects.bulk_create([
+        User(phone=f'051{i:07d}', role=UserRole.CANDIDATE) for i in range(args.rows)
+    ])
+    Candidate.objects.bulk_create([
+        Candidate(user=user, full_name=f'Candidate {i}', bio=text)
+        for i, user in enumerate(users)
+    ])
+
+    scenarios = [
+        ('Job title PATCH', Job, JobWriteSerializer, 'title', 'Engineer'),
+        ('Candidate location PATCH', Candidate, CandidateWriteSerializer, 'location', 'Jeddah'),
+    ]
+    print(f'{args.rows} rows, {args.text_kb} KB text columns\n')
+    print(f'{"scenario":<26} {"mode":<8} {"bytes/update":>13} {"ms/update":>10}')
+    for label, model, serializer_class, field, value in scenarios:
+        results = {}
+        for mode, tracked in (('full', False), ('dirty', True)):
+            BaseModel.track_dirty_fields = tracked
+            instances = list(model.objects.all())
+            size, count, elapsed = run_updates(
+                model, serializer_class, instances, request, field, f'{value} {mode}'
+            )
+            results[mode] = size / count
+            print(f'{label:<26} {mode:<8} {size / count:>13.0f} {elapsed / count * 1000:>10.3f}')
+        saved = 1 - results['dirty'] / results['full']
+        print(f'{"":<26} {"saved":<8} {saved:>12.1%}\n')
+
+    BaseModel.track_dirty_fields = False
+    full_noop = run_noop_saves(list(Job.objects.all()))
+    BaseModel.track_dirty_fields = True
+    dirty_noop = run_noop_saves(list(Job.objects.all()))
+    print(f'Unchanged save(): {full_noop} queries without tracking, {dirty_noop} with')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,381 @@
+# benchmarks/http_load.py
+"""
+End-to-end HTTP load test of the API, compared against a stored baseline.
+
+    python -m benchmarks.http_load
+    python -m benchmarks.http_load --concurrency 16 --seconds 30
+    python -m benchmarks.http_load --server-env SQLITE_PRODUCTION=True
+    python -m benchmarks.http_load --save-baseline
+
+Seeds a throwaway SQLite database, starts the API on a local port (the
+threaded runserver WSGI server, in its own process) and keeps
+--concurrency keep-alive clients sending a weighted mix of requests
+(MIX below) for --seconds after a --warmup. Reports throughput and
+p50/p95/p99 latency per endpoint.
+
+Results are compared with benchmarks/baselines/http_load.json: a run
+regresses when total throughput drops, or the p95 of an endpoint with
+at least --min-samples requests grows, by more than --tolerance, or an
+endpoint returns more errors. The exit status is 1 on regression, so the run can
+gate CI. Baselines are only comparable on the same machine with the same
+parameters; re-record with --save-baseline after intended changes.
+"""
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlencode
+
+from benchmarks._django import setup
+
+BASELINE = Path(__file__).with_name('baselines') / 'http_load.json'
+PASSWORD = 'bench-pass-123'
+
+# name: (weight, method, auth)
+MIX = {
+    'jobs.list': (30, 'GET', False),
+    'jobs.search': (10, 'GET', False),
+    'jobs.retrieve': (20, 'GET', False),
+    'companies.list': (10, 'GET', False),
+    'companies.retrieve': (5, 'GET', False),
+    'candidates.list': (10, 'GET', True),
+    'candidates.retrieve': (5, 'GET', True),
+    'auth.login': (5, 'POST', False),
+}
+
+SKILLS = ['Python', 'Django', 'React', 'SQL', 'AWS', 'Go', 'Kotlin', 'Figma']
+CITIES = ['Riyadh', 'Jeddah', 'Dammam', 'Mecca', 'Medina']
+
+
+def seed(args):
+    """Fill the database, return the ids and phones the clients use"""
+    from django.contrib.auth.hashers import make_password
+
+    from candidates.models import Candidate
+    from companies.models import Company
+    from jobs.models import Job
+    from users.models import User, UserRole
+
+    rng = random.Random(0)
+    # Hashing is deliberately slow: hash once, share it
+    password = make_password(PASSWORD)
+    User.objects.bulk_create(
+        [User(phone=f'050{n:07d}', password=password, role=UserRole.COMPANY)
+         for n in range(args.companies)]
+        + [User(phone=f'055{n:07d}', password=password, role=UserRole.CANDIDATE)
+           for n in range(args.candidates)]
+    )
+    users = {user.phone: user for user in User.objects.all()}
+    Company.objects.bulk_create([
+        Company(user=users[f'050{n:07d}'], name=f'Company {n}',
+                location=rng.choice(CITIES), description='Bench company')
+        for n in range(args.companies)
+    ])
+    companies = list(Company.objects.all())
+    Job.objects.bulk_create([
+        Job(company=companies[n % len(companies)], title=f'{rng.choice(SKILLS)} Engineer {n}',
+            description='Build and run services. ' * 20, requirements='Experience. ' * 10,
+            location=rng.choice(CITIES), required_skills=rng.sample(SKILLS, 3),
+            salary_min=rng.randrange(5000, 20000, 500))
+        for n in range(args.rows)
+    ])
+    Candidate.objects.bulk_create([
+        Candidate(user=users[f'055{n:07d}'], full_name=f'Candidate {n}',
+                  phone=f'055{n:07d}', skills=rng.sample(SKILLS, 4),
+                  experience_years=rng.randint(0, 15), location=rng.choice(CITIES))
+        for n in range(args.candidates)
+    ])
+    return {
+        'jobs': list(Job.objects.values_list('pk', flat=True)),
+        'companies': [company.pk for company in companies],
+        'candidates': list(Candidate.objects.values_list('pk', flat=True)),
+        'phones': list(users),
+    }
+
+
+def build_request(name, data, rng):
+    """(path, body) for one request of kind `name`"""
+    pages = max(1, len(data['jobs']) // 20)
+    if name == 'jobs.list':
+        return f'/api/jobs/?page={rng.randint(1, min(pages, 10))}', None
+    if name == 'jobs.search':
+        query = {'search': rng.choice(SKILLS), 'location': rng.choice(CITIES)}
+        return f'/api/jobs/?{urlencode(query)}', None
+    if name == 'jobs.retrieve':
+        return f'/api/jobs/{rng.choice(data["jobs"])}/', None
+    if name == 'companies.list':
+        return '/api/companies/', None
+    if name == 'companies.retrieve':
+        return f'/api/companies/{rng.choice(data["companies"])}/', None
+    if name == 'candidates.list':
+        return f'/api/candidates/?skills={rng.choice(SKILLS)}', None
+    if name == 'candidates.retrieve':
+        return f'/api/candidates/{rng.choice(data["candidates"])}/', None
+    if name == 'auth.login':
+        body = {'phone': rng.choice(data['phones']), 'password': PASSWORD}
+        return '/api/auth/login/', json.dumps(body)
+    raise ValueError(name)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(db_path, port, server_env):
+    env = {**os.environ, 'DEBUG': 'False', **server_env}
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.http_load', '--serve', db_path, '--port', str(port)],
+        env=env
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f'Server exited with status {process.returncode}')
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/api/companies/')
+            connection.getresponse().read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise SystemExit('Server did not start within 30s')
+
+
+def serve(db_path, port):
+    """Server process: the runserver WSGI server on the seeded database"""
+    setup(db_path)
+    from django.core.servers.basehttp import WSGIServer, run
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    # Keep the per-request access log out of the report
+    logging.getLogger('django.server').setLevel(logging.WARNING)
+    # More pending connections than clients, so none are refused
+    WSGIServer.request_queue_size = 128
+    run('127.0.0.1', port, application, threading=True)
+
+
+def login(port, phone):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    connection.request(
+        'POST', '/api/auth/login/', json.dumps({'phone': phone, 'password': PASSWORD}),
+        {'Content-Type': 'application/json'}
+    )
+    response = connection.getresponse()
+    if response.status != 200:
+        raise SystemExit(f'Login failed: {response.status} {response.read()[:200]}')
+    return json.loads(response.read())['access']
+
+
+class Client(threading.Thread):
+    """One keep-alive connection sending requests from MIX"""
+
+    def __init__(self, index, port, data, token, args, results):
+        super().__init__(daemon=True)
+        self.rng = random.Random(index)
+        self.port = port
+        self.data = data
+        self.token = token
+        self.args = args
+        self.results = results
+        self.connection = None
+
+    def send(self, name):
+        _, method, auth = MIX[name]
+        path, body = build_request(name, self.data, self.rng)
+        headers = {'Content-Type': 'application/json'} if body else {}
+        if auth:
+            headers['Authorization'] = f'Bearer {self.token}'
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+        try:
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            return 0
+        if response.getheader('Connection', '').lower() == 'close':
+            self.connection.close()
+            self.connection = None
+        return response.status
+
+    def run(self):
+        names = list(MIX)
+        weights = [MIX[name][0] for name in names]
+        while time.perf_counter() < self.args.end:
+            name = self.rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            status = self.send(name)
+            finished = time.perf_counter()
+            if self.args.start <= started and finished <= self.args.end:
+                self.results[name].append((status, finished - started))
+        if self.connection is not None:
+            self.connection.close()
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+def summarize(results, seconds):
+    endpoints = {}
+    for name in MIX:
+        samples = results.get(name, [])
+        latencies = sorted(duration for status, duration in samples if 200 <= status < 300)
+        endpoints[name] = {
+            'requests': len(latencies),
+            'errors': len(samples) - len(latencies),
+            'rps': round(len(latencies) / seconds, 2),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        }
+    total = sum(endpoint['requests'] for endpoint in endpoints.values())
+    return {'rps': round(total / seconds, 2), 'endpoints': endpoints}
+
+
+def compare(summary, baseline, tolerance, min_samples):
+    """[(name, message)] for metrics worse than baseline by > tolerance"""
+    regressions = []
+    if summary['rps'] < baseline['rps'] * (1 - tolerance):
+        regressions.append(('total', f'throughput {baseline["rps"]} -> {summary["rps"]} req/s'))
+    for name, current in summary['endpoints'].items():
+        before = baseline['endpoints'].get(name)
+        if not before:
+            continue
+        if current['errors'] > before['errors']:
+            regressions.append((name, f'errors {before["errors"]} -> {current["errors"]}'))
+        # A p95 of a handful of samples is noise
+        if min(current['requests'], before['requests']) < min_samples:
+            continue
+        if current['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append((name, f'p95 {before["p95_ms"]} -> {current["p95_ms"]} ms'))
+    return regressions
+
+
+def print_report(summary, baseline, min_samples):
+    before = baseline['endpoints'] if baseline else {}
+    print(f'{"endpoint":<20} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} '
+          f'{"errors":>7} {"p95 vs baseline":>16}')
+    for name, result in summary['endpoints'].items():
+        delta = ''
+        if before.get(name, {}).get('p95_ms'):
+            delta = f'{(result["p95_ms"] / before[name]["p95_ms"] - 1) * 100:+.0f}%'
+            if min(result['requests'], before[name]['requests']) < min_samples:
+                delta = f'({delta}, n<{min_samples})'
+        print(f'{name:<20} {result["rps"]:>8.1f} {result["p50_ms"]:>8.1f} {result["p95_ms"]:>8.1f} '
+              f'{result["p99_ms"]:>8.1f} {result["errors"]:>7} {delta:>16}')
+    total = f'{"total":<20} {summary["rps"]:>8.1f}'
+    if baseline:
+        total += f'   (baseline {baseline["rps"]:.1f})'
+    print(total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients')
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--warmup', type=float, default=3, help='Seconds not measured')
+    parser.add_argument('--rows', type=int, default=2000, help='Jobs')
+    parser.add_argument('--companies', type=int, default=100)
+    parser.add_argument('--candidates', type=int, default=1000)
+    parser.add_argument('--server-env', action='append', default=[], metavar='NAME=VALUE',
+                        help='Environment of the server process, e.g. SQLITE_PRODUCTION=True')
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed throughput drop / p95 growth (0.25 = 25%%)')
+    parser.add_argument('--min-samples', type=int, default=50,
+                        help='Requests an endpoint needs for its p95 to be compared')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--serve', metavar='DB_PATH', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    db_path = setup(AUDIT_LOG={'ENABLED': False})
+    data = seed(args)
+    from django.db import connections
+    connections.close_all()
+
+    params = {
+        name: getattr(args, name)
+        for name in ('concurrency', 'seconds', 'rows', 'companies', 'candidates')
+    }
+    params['server_env'] = sorted(args.server_env)
+    port = free_port()
+    server = start_server(db_path, port, dict(item.split('=', 1) for item in args.server_env))
+    try:
+        token = login(port, data['phones'][0])
+        results = defaultdict(list)
+        args.start = time.perf_counter() + args.warmup
+        args.end = args.start + args.seconds
+        clients = [Client(n, port, data, token, args, results) for n in range(args.concurrency)]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    summary = summarize(results, args.seconds)
+    baseline = None
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline['params'] != params:
+            print(f'Baseline was recorded with {baseline["params"]}, not comparing\n')
+            baseline = None
+
+    print(f'{args.concurrency} clients, {args.seconds:g}s after {args.warmup:g}s warmup, '
+          f'{args.rows} jobs / {args.companies} companies / {args.candidates} candidates\n')
+    print_report(summary, baseline, args.min_samples)
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(exist_ok=True)
+        record = {
+            'params': params,
+            'machine': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+            },
+            **summary,
+        }
+        args.baseline.write_text(json.dumps(record, indent=2) + '\n')
+        print(f'\nBaseline saved to {args.baseline}')
+        return
+
+    if baseline:
+        regressions = compare(summary, baseline, args.tolerance, args.min_samples)
+        if regressions:
+            print(f'\nRegressions (tolerance {args.tolerance:.0%}):')
+            for name, message in regressions:
+                print(f'  {name}: {message}')
+            sys.exit(1)
+        print(f'\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,326 @@
+# benchmarks/micro.py
+"""
+Microbenchmarks of hot components, measured in isolation.
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro -k serializers --instances 500
+    python -m benchmarks.micro --json before.json
+    python -m benchmarks.micro --json after.json --compare before.json
+
+Each benchmark is a function registered with @bench that prepares its
+inputs and returns the callable to time. The runner calibrates how many
+calls make one sample (at least --min-time seconds), discards --warmup
+samples, then takes --repeat samples with the garbage collector off, like
+timeit. Reported per call: min, median, mean, standard deviation and the
+number of outliers (outside 1.5 IQR). --json writes every sample, and
+--compare prints the median change against an earlier --json file.
+
+Serializers run over instances already in memory (select_related), so
+only serialization is timed, not the queries.
+"""
+import argparse
+import fnmatch
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from benchmarks._django import setup
+
+BENCHMARKS = {}
+
+
+def bench(name):
+    """Register `func(fixtures) -> callable` as benchmark `name`"""
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+# Serializers
+
+@bench('serializers.JobListSerializer')
+def job_list_serializer(fixtures):
+    from jobs.serializers import JobListSerializer
+    jobs = fixtures['jobs']
+    return lambda: JobListSerializer(jobs, many=True).data
+
+
+@bench('serializers.JobReadSerializer')
+def job_read_serializer(fixtures):
+    from jobs.serializers import JobReadSerializer
+    jobs = fixtures['jobs']
+    return lambda: JobReadSerializer(jobs, many=True).data
+
+
+@bench('serializers.JobReadSerializer.uncached')
+def job_read_serializer_uncached(fixtures):
+    from django.test.utils import override_settings
+    from jobs.serializers import JobReadSerializer
+    jobs = fixtures['jobs']
+    disabled = override_settings(REPRESENTATION_CACHE={'ENABLED': False})
+
+    def serialize():
+        with disabled:
+            return JobReadSerializer(jobs, many=True).data
+    return serialize
+
+
+@bench('serializers.CandidateReadSerializer')
+def candidate_read_serializer(fixtures):
+    from candidates.serializers import CandidateReadSerializer
+    candidates = fixtures['candidates']
+    return lambda: CandidateReadSerializer(candidates, many=True).data
+
+
+# Filters: parse the query string and build the SQL, without running it
+
+def filter_to_sql(filterset_class, params):
+    from django.db import connection
+    from django.http import QueryDict
+
+    data = QueryDict(params)
+    model = filterset_class._meta.model
+
+    def run():
+        filterset = filterset_class(data, queryset=model.objects.all())
+        return filterset.qs.query.get_compiler(connection=connection).as_sql()
+    return run
+
+
+@bench('filters.JobFilter')
+def job_filter(fixtures):
+    from jobs.filters import JobFilter
+    return filter_to_sql(
+        JobFilter,
+        'title=engineer&location=riyadh&employment_type=FULL_TIME&min_salary=5000&is_active=true'
+    )
+
+
+@bench('filters.CandidateFilter')
+def candidate_filter(fixtures):
+    from candidates.filters import CandidateFilter
+    return filter_to_sql(
+        CandidateFilter, 'full_name=ahmed&location=riyadh&min_experience=2&max_experience=10'
+    )
+
+
+# Managers
+
+@bench('managers.SoftDeleteManager.queryset')
+def soft_delete_queryset(fixtures):
+    from jobs.models import Job
+    return lambda: Job.objects.filter(is_active=True).order_by('-created_at')
+
+
+@bench('managers.SoftDeleteManager.sql')
+def soft_delete_sql(fixtures):
+    from django.db import connection
+
+    from jobs.models import Job
+
+    def run():
+        queryset = Job.objects.filter(is_active=True).order_by('-created_at')
+        return queryset.query.get_compiler(connection=connection).as_sql()
+    return run
+
+
+# Autocomplete: lookups in an index built from the seeded jobs (every
+# title matches 'eng')
+
+@bench('autocomplete.JobAutocomplete.complete')
+def autocomplete_complete(fixtures):
+    from jobs.autocomplete import JobAutocomplete
+    index = JobAutocomplete.build()
+    titles = index.indexes['title']
+
+    def run():
+        titles._cache.clear()
+        return index.complete('title', 'eng', 10)
+    return run
+
+
+@bench('autocomplete.JobAutocomplete.complete.cached')
+def autocomplete_complete_cached(fixtures):
+    from jobs.autocomplete import JobAutocomplete
+    index = JobAutocomplete.build()
+    return lambda: index.complete('title', 'eng', 10)
+
+
+# Validators
+
+PHONES = ['0501234567', '+966501234567', '966-50-123', '0501']
+
+
+@bench('validators.RegisterSerializer.validate_phone')
+def validate_phone(fixtures):
+    from rest_framework.exceptions import ValidationError
+
+    from users.serializers import RegisterSerializer
+    serializer = RegisterSerializer()
+
+    def run():
+        for phone in PHONES:
+            try:
+                serializer.validate_phone(phone)
+            except ValidationError:
+                pass
+    return run
+
+
+def seed(instances):
+    """Rows for the serializers, loaded the way the views load them"""
+    from candidates.models import Candidate
+    from companies.models import Company
+    from jobs.models import Job
+    from users.models import User, UserRole
+
+    User.objects.bulk_create(
+        [User(phone=f'050{n:07d}', role=UserRole.COMPANY) for n in range(10)]
+        + [User(phone=f'055{n:07d}', role=UserRole.CANDIDATE) for n in range(instances)]
+    )
+    owners = User.objects.filter(role=UserRole.COMPANY)
+    Company.objects.bulk_create([
+        Company(user=user, name=f'Company {n}', location='Riyadh')
+        for n, user in enumerate(owners)
+    ])
+    companies = list(Company.objects.all())
+    Job.objects.bulk_create([
+        Job(company=companies[n % len(companies)], title=f'Engineer {n}',
+            description='Build and run services. ' * 20, requirements='Experience. ' * 10,
+            location='Riyadh', required_skills=['Python', 'Django', 'SQL'],
+            salary_min=8000, salary_max=15000)
+        for n in range(instances)
+    ])
+    Candidate.objects.bulk_create([
+        Candidate(user=user, full_name=f'Candidate {n}', phone=user.phone,
+                  skills=['Python', 'Django', 'React', 'SQL'], experience_years=n % 15,
+                  location='Riyadh', bio='Experienced developer. ' * 10)
+        for n, user in enumerate(User.objects.filter(role=UserRole.CANDIDATE))
+    ])
+    return {
+        'jobs': list(Job.objects.select_related('company__user')),
+        'candidates': list(Candidate.objects.select_related('user')),
+    }
+
+
+def calibrate(func, min_time):
+    """Calls per sample so one sample takes at least `min_time` seconds"""
+    loops = 1
+    while True:
+        if time_loops(func, loops) >= min_time:
+            return loops
+        loops *= 2
+
+
+def time_loops(func, loops):
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        return time.perf_counter() - started
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def summarize(samples):
+    """Statistics over per-call times (seconds)"""
+    ordered = sorted(samples)
+    quartiles = statistics.quantiles(ordered, n=4) if len(ordered) > 1 else ordered * 3
+    iqr = quartiles[2] - quartiles[0]
+    low, high = quartiles[0] - 1.5 * iqr, quartiles[2] + 1.5 * iqr
+    return {
+        'min': ordered[0],
+        'median': statistics.median(ordered),
+        'mean': statistics.fmean(ordered),
+        'stdev': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        'outliers': sum(1 for value in ordered if not low <= value <= high),
+    }
+
+
+def run_benchmark(func, args):
+    loops = calibrate(func, args.min_time)
+    for _ in range(args.warmup):
+        time_loops(func, loops)
+    samples = [time_loops(func, loops) / loops for _ in range(args.repeat)]
+    return {'loops': loops, **summarize(samples), 'samples': samples}
+
+
+def format_time(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.2f} {unit}'
+    return f'{seconds / 1e-9:.0f} ns'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-k', dest='pattern', default='*',
+                        help='Only benchmarks matching this glob (substring if no wildcard)')
+    parser.add_argument('--list', action='store_true', help='List benchmarks and exit')
+    parser.add_argument('--instances', type=int, default=100, help='Rows per serializer call')
+    parser.add_argument('--repeat', type=int, default=20, help='Samples per benchmark')
+    parser.add_argument('--warmup', type=int, default=3, help='Samples discarded first')
+    parser.add_argument('--min-time', type=float, default=0.05, help='Seconds per sample')
+    parser.add_argument('--json', metavar='PATH', help='Write results as JSON')
+    parser.add_argument('--compare', metavar='PATH', help='Earlier --json results')
+    args = parser.parse_args()
+
+    pattern = args.pattern if any(c in args.pattern for c in '*?[') else f'*{args.pattern}*'
+    names = [name for name in BENCHMARKS if fnmatch.fnmatch(name, pattern)]
+    if args.list:
+        print('\n'.join(names))
+        return
+
+    setup(AUDIT_LOG={'ENABLED': False}, DEBUG=False)
+    fixtures = seed(args.instances)
+    previous = {}
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)['benchmarks']
+
+    print(f'{args.instances} instances, {args.repeat} samples of >= {args.min_time:g}s '
+          f'after {args.warmup} warmup\n')
+    print(f'{"benchmark":<48} {"min":>10} {"median":>10} {"mean":>10} {"stdev":>9} '
+          f'{"outliers":>8} {"vs prev":>8}')
+    results = {}
+    for name in names:
+        result = run_benchmark(BENCHMARKS[name](fixtures), args)
+        results[name] = result
+        change = ''
+        if name in previous:
+            change = f'{(result["median"] / previous[name]["median"] - 1) * 100:+.1f}%'
+        print(
+            f'{name:<48} {format_time(result["min"]):>10} {format_time(result["median"]):>10} '
+            f'{format_time(result["mean"]):>10} {result["stdev"] / result["mean"] * 100:>8.1f}% '
+            f'{result["outliers"]:>8} {change:>8}',
+            flush=True
+        )
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'machine': {
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'cpus': os.cpu_count(),
+                },
+                'params': {
+                    name: getattr(args, name)
+                    for name in ('instances', 'repeat', 'warmup', 'min_time')
+                },
+                'benchmarks': results,
+            }, f, indent=2)
+            f.write('\n')
+        print(f'\nResults written to {args.json}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
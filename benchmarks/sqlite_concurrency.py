@@ -0,0 +1,157 @@
+# benchmarks/sqlite_concurrency.py
+"""
+Concurrent read/write workload against plain SQLite and the production
+SQLite mode (libs.sqlite_backend).
+
+    python -m benchmarks.sqlite_concurrency
+    python -m benchmarks.sqlite_concurrency --writers 8 --readers 16 --seconds 10
+
+Writer threads run request-like write transactions (read a job, then
+update it, inside atomic()); reader threads run the job list query.
+After every operation the connection is handled like at the end of a
+request (closed unless CONN_MAX_AGE keeps it). Failed operations are
+"database is locked" errors that would have been 500s.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from benchmarks._django import setup
+
+PRODUCTION = {
+    'ENGINE': 'libs.sqlite_backend',
+    'CONN_MAX_AGE': 600,
+    'OPTIONS': {
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64000,
+            'busy_timeout': 5000,
+            'temp_store': 'MEMORY',
+        },
+        'transaction_mode': 'IMMEDIATE',
+        'serialize_writes': True,
+    },
+}
+
+
+def write_op(alias, pk, index):
+    from django.db import transaction
+    from django.utils import timezone
+    from jobs.models import Job
+
+    jobs = Job.objects.using(alias)
+    with transaction.atomic(using=alias):
+        job = jobs.only('id', 'title').get(pk=pk)
+        jobs.filter(pk=job.pk).update(title=f'Job {pk} v{index}', updated_at=timezone.now())
+
+
+def read_op(alias, pk, index):
+    from jobs.models import Job
+
+    list(
+        Job.objects.using(alias).filter(is_active=True)
+        .order_by('-created_at').values('id', 'title', 'location')[:20]
+    )
+
+
+def worker(alias, op, ids, deadline, latencies, errors):
+    from django.db import OperationalError, connections
+
+    index = 0
+    while time.perf_counter() < deadline:
+        index += 1
+        started = time.perf_counter()
+        try:
+            op(alias, ids[index % len(ids)], index)
+            latencies.append(time.perf_counter() - started)
+        except OperationalError:
+            errors.append(1)
+        connections[alias].close_if_unusable_or_obsolete()
+    connections[alias].close()
+
+
+def run(alias, ids, args):
+    deadline = time.perf_counter() + args.seconds
+    results = {'write': ([], []), 'read': ([], [])}
+    threads = [
+        threading.Thread(target=worker, args=(alias, write_op, ids, deadline, *results['write']))
+        for _ in range(args.writers)
+    ] + [
+        threading.Thread(target=worker, args=(alias, read_op, ids, deadline, *results['read']))
+        for _ in range(args.readers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    return sorted(values)[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='mini-sbr-bench-')
+    plain = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(directory, 'plain.sqlite3'),
+        # Same wait as busy_timeout above, the sqlite3 module default is 5s
+        'OPTIONS': {'timeout': 5},
+    }
+    setup(
+        AUDIT_LOG={'ENABLED': False},
+        DATABASE_ROUTERS=[],
+        DATABASES={
+            'default': plain,
+            'production': {**PRODUCTION, 'NAME': os.path.join(directory, 'production.sqlite3')},
+        },
+    )
+
+    from django.core.management import call_command
+    from companies.models import Company
+    from jobs.models import Job
+    from users.models import User, UserRole
+
+    print(f'{args.writers} writers, {args.readers} readers, {args.seconds:g}s per mode\n')
+    print(f'{"mode":<11} {"op":<6} {"ops/s":>8} {"p50 ms":>8} {"p99 ms":>8} {"errors":>7}')
+    for alias in ('default', 'production'):
+        if alias != 'default':
+            call_command('migrate', database=alias, verbosity=0)
+        owner = User.objects.db_manager(alias).create_user(
+            phone='0500000000', password='x', role=UserRole.COMPANY
+        )
+        company = Company.objects.using(alias).create(user=owner, name='BenchCorp', location='Riyadh')
+        Job.objects.using(alias).bulk_create([
+            Job(company=company, title=f'Job {i}', description='Description',
+                requirements='Requirements', location='Riyadh')
+            for i in range(args.rows)
+        ])
+        ids = list(Job.objects.using(alias).values_list('pk', flat=True))
+
+        results = run(alias, ids, args)
+        label = 'plain' if alias == 'default' else alias
+        for op, (latencies, errors) in results.items():
+            print(
+                f'{label:<11} {op:<6} {len(latencies) / args.seconds:>8.0f} '
+                f'{statistics.median(latencies or [float("nan")]) * 1000:>8.2f} '
+                f'{percentile(latencies, 0.99) * 1000:>8.2f} {len(errors):>7}'
+            )
+
+
+if __name__ == '__main__':
+    main()
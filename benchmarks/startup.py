@@ -0,0 +1,148 @@
+# benchmarks/startup.py
+"""
+Worker cold start and API request stack overhead.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 20 --top 30
+    python -m benchmarks.startup --profile-only
+
+Boots a fresh interpreter the way a WSGI worker does (import settings,
+get_wsgi_application()) --runs times and reports:
+
+    boot        process start -> application ready
+    first       the first GET /api/jobs/{id}/ (lazy imports, connection)
+    warm        mean of the following --requests requests
+
+for the lean stack (BROWSER_MIDDLEWARE skipped on /api/, the default)
+and the full one (API_PATH_PREFIXES empty: every middleware everywhere).
+Then one boot runs under `python -X importtime` and the slowest imports
+are listed, by import chain and by package.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from benchmarks._django import setup
+
+MODES = {
+    'lean': {},
+    'full': {'API_PATH_PREFIXES': ''},
+}
+
+# Run with `python -c`, so nothing but the worker's own imports is timed
+BOOT = '''
+import io, json, os, sys, time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mini_sbr.settings')
+from django.conf import settings
+settings.DATABASES['default']['NAME'] = sys.argv[1]
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+ready = time.time()
+
+def get(path):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+        'SERVER_NAME': 'bench', 'SERVER_PORT': '80', 'HTTP_HOST': 'bench',
+        'wsgi.input': io.BytesIO(b''), 'wsgi.errors': sys.stderr, 'wsgi.url_scheme': 'http',
+    }
+    statuses = []
+    b''.join(application(environ, lambda status, headers: statuses.append(status)))
+    assert statuses[0].startswith('200'), statuses[0]
+
+path = f'/api/jobs/{sys.argv[2]}/'
+started = time.perf_counter()
+get(path)
+first = time.perf_counter() - started
+requests = int(sys.argv[3])
+started = time.perf_counter()
+for _ in range(requests):
+    get(path)
+warm = (time.perf_counter() - started) / requests
+print(json.dumps({'ready': ready, 'first': first, 'warm': warm}))
+'''
+
+
+def boot(db_path, job_id, requests, env, importtime=False):
+    """Run BOOT in a new interpreter: (boot, first, warm) seconds[, stderr]"""
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else [])
+    command += ['-c', BOOT, db_path, str(job_id), str(requests)]
+    started = time.time()
+    result = subprocess.run(
+        command, env={**os.environ, **env}, capture_output=True, text=True, check=True
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return (timings['ready'] - started, timings['first'], timings['warm']), result.stderr
+
+
+def parse_importtime(stderr):
+    """[(depth, self_us, cumulative_us, module)] from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line.split(':', 1)[1].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, int(self_us), int(cumulative), name.strip()))
+    return rows
+
+
+def print_profile(rows, top):
+    total = sum(self_us for _, self_us, _, _ in rows)
+    print(f'\nImport time: {total / 1000:.0f} ms in {len(rows)} modules\n')
+
+    print(f'{"slowest import chains":<56} {"ms":>8}')
+    chains = sorted((row for row in rows if row[0] <= 1), key=lambda row: -row[2])
+    for depth, _, cumulative, name in chains[:top]:
+        print(f'{"  " * depth + name:<56} {cumulative / 1000:>8.1f}')
+
+    packages = Counter()
+    for _, self_us, _, name in rows:
+        packages[name.split('.')[0]] += self_us
+    print(f'\n{"package (own import time)":<56} {"ms":>8}')
+    for package, self_us in packages.most_common(top):
+        print(f'{package:<56} {self_us / 1000:>8.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=10, help='Cold boots per mode')
+    parser.add_argument('--requests', type=int, default=200, help='Warm requests per boot')
+    parser.add_argument('--top', type=int, default=20, help='Rows in the import profile')
+    parser.add_argument('--profile-only', action='store_true')
+    args = parser.parse_args()
+
+    db_path = setup(AUDIT_LOG={'ENABLED': False})
+    from companies.models import Company
+    from jobs.models import Job
+    from users.models import User, UserRole
+
+    owner = User.objects.create_user(phone='0500000000', password='x', role=UserRole.COMPANY)
+    company = Company.objects.create(user=owner, name='BenchCorp', location='Riyadh')
+    job = Job.objects.create(
+        company=company, title='Engineer', description='Description',
+        requirements='Requirements', location='Riyadh'
+    )
+
+    if not args.profile_only:
+        print(f'{args.runs} cold boots per mode, {args.requests} warm requests each\n')
+        print(f'{"stack":<8} {"boot ms":>9} {"(min)":>7} {"first ms":>9} {"warm us":>9}')
+        for mode, env in MODES.items():
+            runs = [boot(db_path, job.pk, args.requests, env)[0] for _ in range(args.runs)]
+            boots, firsts, warms = zip(*runs)
+            print(
+                f'{mode:<8} {statistics.median(boots) * 1000:>9.0f} {min(boots) * 1000:>7.0f} '
+                f'{statistics.median(firsts) * 1000:>9.1f} {statistics.median(warms) * 1e6:>9.0f}',
+                flush=True
+            )
+
+    _, stderr = boot(db_path, job.pk, 1, {}, importtime=True)
+    print_profile(parse_importtime(stderr), args.top)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+# candidates/alerts.py
+"""
+Job alerts: a reverse (percolator) index over saved searches.
+
+Instead of running every SavedSearch against each new job, every search
+is stored under one anchor, its most selective criterion:
+
+    skill:<skill>        the skill the fewest public jobs require
+    title:<word>         its longest title word
+    location:<word>      its longest location word
+    type:<employment>    its employment type
+    any:                 no criteria but min_salary (or none at all)
+
+A job lists every anchor it could satisfy (its skills, every prefix of
+its title and location words, its type, 'any:'), so one indexed
+`anchor IN (...)` query returns the only searches that can match. Those
+are checked against all their criteria in Python:
+
+- title / location: each word starts a word of the job's title / location
+- skills: the job requires all of them (case-insensitive)
+- employment_type: equal
+- min_salary: the job's salary_min is at least this (as JobFilter)
+
+Skill frequencies come from the feed's JobSkill table and are read when
+the search is saved.
+
+Matches become JobAlert rows, inserted in batches of BATCH_SIZE, once
+the transaction that made the job public (created, activated or
+restored) commits: the write never waits for percolation. A job is
+alerted once per search, even if it is re-activated.
+"""
+import re
+
+from django.db import transaction
+from django.db.models import Count
+
+from jobs.models import Job
+
+from .models import JobAlert, JobSkill, SavedSearch
+
+BATCH_SIZE = 1000
+
+_WORD = re.compile(r'\w+')
+
+
+def _words(text):
+    return _WORD.findall((text or '').casefold())
+
+
+def _skills(skills):
+    return {skill.strip().casefold() for skill in skills or () if skill.strip()}
+
+
+def anchor_for(search):
+    """The anchor `search` is stored under"""
+    skills = _skills(search.skills)
+    if skills:
+        jobs = dict(
+            JobSkill.objects.filter(skill__in=skills).values_list('skill')
+            .annotate(n=Count('pk')).order_by()
+        )
+        # Ties (e.g. no jobs yet) go alphabetically
+        return f'skill:{min(skills, key=lambda skill: (jobs.get(skill, 0), skill))}'
+    for kind, text in (('title', search.title), ('location', search.location)):
+        words = _words(text)
+        if words:
+            return f'{kind}:{max(words, key=len)}'
+    if search.employment_type:
+        return f'type:{search.employment_type}'
+    return 'any:'
+
+
+def _prefixes(kind, text):
+    return {f'{kind}:{word[:end]}' for word in _words(text) for end in range(1, len(word) + 1)}
+
+
+def job_anchors(job):
+    """Every anchor of a search `job` could match"""
+    return (
+        {f'skill:{skill}' for skill in _skills(job.required_skills)}
+        | _prefixes('title', job.title)
+        | _prefixes('location', job.location)
+        | {f'type:{job.employment_type}', 'any:'}
+    )
+
+
+def _starts_words(query, text):
+    words = _words(text)
+    return all(any(word.startswith(term) for word in words) for term in _words(query))
+
+
+def matches(search, job):
+    """Whether `job` meets every criterion of `search`"""
+    if search.employment_type and search.employment_type != job.employment_type:
+        return False
+    if search.min_salary is not None and (
+        job.salary_min is None or job.salary_min < search.min_salary
+    ):
+        return False
+    return (
+        _skills(search.skills) <= _skills(job.required_skills)
+        and _starts_words(search.title, job.title)
+        and _starts_words(search.location, job.location)
+    )
+
+
+def matching_searches(job):
+    """Live saved searches `job` matches"""
+    candidates = SavedSearch.objects.filter(anchor__in=job_anchors(job)).only(
+        'id', 'title', 'skills', 'employment_type', 'location', 'min_salary'
+    )
+    return [search for search in candidates.iterator(chunk_size=2000) if matches(search, job)]
+
+
+def percolate(ids):
+    """Alert the saved searches matching the public jobs `ids`"""
+    alerts = []
+    for job in Job.objects.filter(pk__in=ids, is_active=True):
+        alerts += [JobAlert(search_id=search.pk, job_id=job.pk) for search in matching_searches(job)]
+        if len(alerts) >= BATCH_SIZE:
+            JobAlert.objects.bulk_create(alerts, batch_size=BATCH_SIZE, ignore_conflicts=True)
+            alerts = []
+    JobAlert.objects.bulk_create(alerts, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+def percolate_on_commit(ids):
+    """percolate(ids) once the current transaction commits"""
+    ids = list(ids)
+    transaction.on_commit(lambda: percolate(ids))
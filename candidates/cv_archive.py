@@ -0,0 +1,71 @@
+# candidates/cv_archive.py
+"""
+CVs of many candidates as one ZIP, streamed by GET /api/candidates/cvs/
+(see libs/zipstream.py).
+
+The archive is bounded before the first byte is sent, since a streamed
+response cannot turn into an error halfway:
+
+    CV_ARCHIVES = {
+        'MAX_FILES': 100,                 # CVs per archive
+        'MAX_BYTES': 200 * 1024 * 1024,   # their total size
+    }
+
+Members are named "<id>-<full-name>.<ext>" and keep their profile's
+updated_at as date. PDFs, DOCX files and images are stored, other
+formats deflated.
+"""
+import os
+
+from django.conf import settings
+from django.utils.text import slugify
+
+from libs.zipstream import ZipEntry
+
+from .models import Candidate
+
+DEFAULTS = {
+    'MAX_FILES': 100,
+    'MAX_BYTES': 200 * 1024 * 1024,
+}
+
+# Already compressed: deflate would only cost CPU
+STORED_EXTENSIONS = frozenset({'.pdf', '.docx', '.odt', '.jpg', '.jpeg', '.png', '.zip'})
+
+
+class ArchiveTooLarge(ValueError):
+    pass
+
+
+def archive_settings():
+    return {**DEFAULTS, **getattr(settings, 'CV_ARCHIVES', {})}
+
+
+def cv_entries(candidates):
+    """ZipEntry per CV of `candidates`, ArchiveTooLarge past the limits"""
+    config = archive_settings()
+    storage = Candidate._meta.get_field('cv_file').storage
+    rows = list(
+        candidates.exclude(cv_file='').exclude(cv_file__isnull=True).order_by('pk')
+        .values_list('pk', 'full_name', 'cv_file', 'updated_at')[:config['MAX_FILES'] + 1]
+    )
+    if len(rows) > config['MAX_FILES']:
+        raise ArchiveTooLarge(f'At most {config["MAX_FILES"]} CVs per archive')
+
+    entries = []
+    total = 0
+    for pk, full_name, name, updated_at in rows:
+        try:
+            total += storage.size(name)
+        except FileNotFoundError:
+            continue  # Listed but lost: leave it out
+        if total > config['MAX_BYTES']:
+            raise ArchiveTooLarge(f'The CVs exceed {config["MAX_BYTES"]} bytes')
+        extension = os.path.splitext(name)[1].lower()
+        entries.append(ZipEntry(
+            f'{pk}-{slugify(full_name) or "candidate"}{extension}',
+            lambda name=name: storage.open(name, 'rb'),
+            updated_at.timetuple()[:6],
+            compress=extension not in STORED_EXTENSIONS,
+        ))
+    return entries
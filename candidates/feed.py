@@ -0,0 +1,428 @@
+# candidates/feed.py
+"""
+Materialized "jobs for you" feed, read by GET /api/candidates/me/feed/.
+
+JobRecommendation holds a candidate's MAX_PER_CANDIDATE best public
+jobs among those sharing at least one skill, with their scores. Two
+inverted tables, CandidateSkill and JobSkill, list the normalized skills
+of the live candidates and public jobs, so a change is only scored
+against the rows it shares a skill with, never against the whole other
+side:
+
+- a candidate profile changes (skills, experience, location) or is
+  deleted/restored: its rows are recomputed against the public jobs
+  sharing one of its skills, once the write commits, in the same thread
+  (at most MAX_PER_CANDIDATE rows)
+- a job is created, updated (title, skills, location), activated,
+  deactivated, deleted or restored (Job.after_save / Job.rows_changed):
+  once the write commits its id is queued, and a background thread
+  merges its new scores into the feeds of the candidates sharing one of
+  its skills, CHUNK_SIZE candidates per transaction. A new score enters
+  a full feed only if it beats the last row, which is then dropped; a
+  full feed losing a row is recomputed to take the next best job.
+
+When the queue is full (MAX_QUEUE_SIZE refreshes) the writer's thread
+refreshes its jobs itself. Reading a page is one indexed query on
+(candidate, -score, -job). `python manage.py rebuild_job_feed`
+recomputes every row in chunks of CHUNK_SIZE candidates, each committed
+on its own (first deployment, or after changing the scoring).
+
+Settings:
+
+    JOB_FEED = {
+        'ASYNC': True,              # False = refresh jobs on commit, in the caller
+        'MAX_PER_CANDIDATE': 200,   # rows kept per candidate
+        'MAX_QUEUE_SIZE': 1000,     # queued job refreshes
+    }
+
+Score, 0-130: the share of the job's skills the candidate has (0-100),
++20 for the same location, +10 when the experience fits the level in
+the job title (e.g. 'Senior' wants 5+ years).
+"""
+import atexit
+import heapq
+import logging
+import queue
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+
+from jobs.models import Job
+
+from .models import Candidate, CandidateSkill, JobRecommendation, JobSkill
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ASYNC': True,
+    'MAX_PER_CANDIDATE': 200,
+    'MAX_QUEUE_SIZE': 1000,
+}
+
+LOCATION_POINTS = 20
+EXPERIENCE_POINTS = 10
+
+# Title word -> (min, max) years of experience; other titles fit anyone
+EXPERIENCE_LEVELS = {
+    'intern': (0, 1),
+    'internship': (0, 1),
+    'junior': (0, 2),
+    'senior': (5, None),
+    'lead': (6, None),
+    'principal': (8, None),
+}
+
+# Fields that change a job's or a candidate's scores
+JOB_FIELDS = {'title', 'required_skills', 'location', 'is_active', 'deleted_at'}
+CANDIDATE_FIELDS = {'skills', 'experience_years', 'location', 'deleted_at'}
+
+_WORD = re.compile(r'\w+')
+
+BATCH_SIZE = 500
+
+# Candidates per transaction of refresh_jobs() and rebuild()
+CHUNK_SIZE = 1000
+
+# Job ids per refresh_jobs() of the background thread
+QUEUE_BATCH_SIZE = 100
+
+# CandidateSkill / JobSkill.skill max_length
+MAX_SKILL_LENGTH = 100
+
+
+def feed_settings():
+    return {**DEFAULTS, **getattr(settings, 'JOB_FEED', {})}
+
+
+def _skills(skills):
+    return {skill.strip().casefold()[:MAX_SKILL_LENGTH] for skill in skills or () if skill.strip()}
+
+
+def experience_range(title):
+    for word in _WORD.findall(title.casefold()):
+        if word in EXPERIENCE_LEVELS:
+            return EXPERIENCE_LEVELS[word]
+    return 0, None
+
+
+class JobProfile:
+    """What a job is scored on"""
+
+    def __init__(self, pk, title, required_skills, location):
+        self.pk = pk
+        self.skills = _skills(required_skills)
+        self.location = location.strip().casefold()
+        self.experience = experience_range(title)
+
+
+class CandidateProfile:
+    """What a candidate is scored on"""
+
+    def __init__(self, pk, skills, experience_years, location):
+        self.pk = pk
+        self.skills = _skills(skills)
+        self.experience_years = experience_years
+        self.location = location.strip().casefold()
+
+
+def score(candidate, job):
+    """The job's score for the candidate, 0 if they share no skill"""
+    matched = len(candidate.skills & job.skills)
+    if not matched:
+        return 0
+    points = round(100 * matched / len(job.skills))
+    if candidate.location and candidate.location == job.location:
+        points += LOCATION_POINTS
+    low, high = job.experience
+    if candidate.experience_years >= low and (high is None or candidate.experience_years <= high):
+        points += EXPERIENCE_POINTS
+    return points
+
+
+def public_jobs(ids=None):
+    """JobProfiles of the public jobs, of `ids` (a list or a subquery) only if given"""
+    jobs = Job.objects.filter(is_active=True)
+    if ids is not None:
+        jobs = jobs.filter(pk__in=ids)
+    return [
+        JobProfile(*values) for values in
+        jobs.values_list('id', 'title', 'required_skills', 'location')
+        .iterator(chunk_size=2000)
+    ]
+
+
+def live_candidates(ids=None):
+    """CandidateProfiles of the live candidates, of `ids` only if given"""
+    candidates = Candidate.objects.all()
+    if ids is not None:
+        candidates = candidates.filter(pk__in=ids)
+    return [
+        CandidateProfile(*values) for values in
+        candidates.values_list('id', 'skills', 'experience_years', 'location')
+        .iterator(chunk_size=2000)
+    ]
+
+
+def by_skill(profiles):
+    """{skill: [profile]}"""
+    index = defaultdict(list)
+    for profile in profiles:
+        for skill in profile.skills:
+            index[skill].append(profile)
+    return index
+
+
+def _index_skills(model, owner, ids, profiles):
+    """Replace the CandidateSkill / JobSkill rows of `ids` by those of `profiles`"""
+    model.objects.filter(**{f'{owner}__in': ids}).delete()
+    model.objects.bulk_create([
+        model(**{owner: profile.pk}, skill=skill)
+        for profile in profiles for skill in profile.skills
+    ], batch_size=BATCH_SIZE)
+
+
+def _best(candidate, jobs_by_skill, limit):
+    """[(score, job id)] of the candidate's `limit` best jobs, in feed order"""
+    jobs = {job.pk: job for skill in candidate.skills for job in jobs_by_skill.get(skill, ())}
+    return heapq.nlargest(limit, [
+        (points, pk) for pk, job in jobs.items() if (points := score(candidate, job))
+    ])
+
+
+def _save(candidates, jobs_by_skill):
+    """Write the best rows of `candidates` against the jobs they share a skill with"""
+    limit = feed_settings()['MAX_PER_CANDIDATE']
+    rows = [
+        JobRecommendation(candidate_id=candidate.pk, job_id=pk, score=points)
+        for candidate in candidates
+        for points, pk in _best(candidate, jobs_by_skill, limit)
+    ]
+    JobRecommendation.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+    return len(rows)
+
+
+def _shared(model, owner, skills):
+    """Subquery of the owners (candidates or jobs) having one of `skills`"""
+    return model.objects.filter(skill__in=skills).values(owner).distinct()
+
+
+def _rescore(candidates):
+    """Write every row of `candidates` (whose old rows are gone), return how many"""
+    skills = set().union(*(candidate.skills for candidate in candidates))
+    if not skills:
+        return 0
+    jobs = public_jobs(_shared(JobSkill, 'job_id', skills))
+    return _save(candidates, by_skill(jobs))
+
+
+def _row_counts(candidate_ids):
+    """{candidate id: rows}, for those having rows"""
+    return dict(
+        JobRecommendation.objects.filter(candidate_id__in=candidate_ids)
+        .values_list('candidate_id').annotate(n=Count('pk')).order_by()
+    )
+
+
+def _prune(candidate_ids, limit):
+    """Drop the rows of `candidate_ids` after their `limit` best"""
+    ranked = JobRecommendation.objects.filter(candidate_id__in=candidate_ids).annotate(
+        rank=Window(
+            RowNumber(), partition_by=F('candidate_id'),
+            order_by=[F('score').desc(), F('job_id').desc()]
+        )
+    )
+    extra = list(ranked.filter(rank__gt=limit).values_list('pk', flat=True))
+    JobRecommendation.objects.filter(pk__in=extra).delete()
+
+
+def _merge(candidates, ids, jobs_by_skill):
+    """
+    Replace the rows of jobs `ids` in the feeds of `candidates`, keeping
+    each feed's best MAX_PER_CANDIDATE; return how many rows were written.
+    """
+    limit = feed_settings()['MAX_PER_CANDIDATE']
+    candidate_ids = [candidate.pk for candidate in candidates]
+    before = _row_counts(candidate_ids)
+    replaced = JobRecommendation.objects.filter(candidate_id__in=candidate_ids, job_id__in=ids)
+    losing = set(replaced.values_list('candidate_id', flat=True))
+    replaced.delete()
+    written = _save(candidates, jobs_by_skill)
+
+    after = _row_counts(candidate_ids)
+    full = [pk for pk, count in after.items() if count > limit]
+    if full:
+        _prune(full, limit)
+    # A full feed that lost a row may have a next best job to take its place
+    refill = [
+        candidate for candidate in candidates
+        if candidate.pk in losing and before.get(candidate.pk, 0) >= limit
+        and after.get(candidate.pk, 0) < limit
+    ]
+    if refill:
+        JobRecommendation.objects.filter(candidate_id__in=[c.pk for c in refill]).delete()
+        written += _rescore(refill)
+    return written
+
+
+def refresh_jobs(ids, chunk_size=CHUNK_SIZE):
+    """
+    Recompute the rows of jobs `ids` (none when a job is not public),
+    return how many were written. The candidates sharing a skill with
+    the jobs or holding one of their rows are merged CHUNK_SIZE at a
+    time, each chunk in its own transaction.
+    """
+    ids = list(ids)
+    jobs = public_jobs(ids)
+    with transaction.atomic():
+        _index_skills(JobSkill, 'job_id', ids, jobs)
+    skills = set().union(*(job.skills for job in jobs))
+    affected = Candidate.objects.filter(
+        Q(pk__in=_shared(CandidateSkill, 'candidate_id', skills))
+        | Q(pk__in=JobRecommendation.objects.filter(job_id__in=ids).values('candidate_id'))
+    )
+    jobs_by_skill = by_skill(jobs)
+    written = 0
+    last = 0
+    while True:
+        chunk = list(
+            affected.filter(pk__gt=last).order_by('pk').values_list('pk', flat=True)[:chunk_size]
+        )
+        if not chunk:
+            return written
+        with transaction.atomic():
+            written += _merge(live_candidates(chunk), ids, jobs_by_skill)
+        last = chunk[-1]
+
+
+def refresh_candidates(ids):
+    """Recompute the rows of candidates `ids` (none once deleted)"""
+    with transaction.atomic():
+        JobRecommendation.objects.filter(candidate_id__in=ids).delete()
+        candidates = live_candidates(ids)
+        _index_skills(CandidateSkill, 'candidate_id', ids, candidates)
+        return _rescore(candidates)
+
+
+class JobRefresher:
+    """Bounded queue of job ids plus the thread running refresh_jobs() on them"""
+
+    def __init__(self):
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, ids):
+        config = feed_settings()
+        if not config['ASYNC']:
+            refresh_jobs(ids)
+            return
+        self._ensure_started(config)
+        try:
+            self._queue.put_nowait(ids)
+        except queue.Full:
+            # Backpressure: refresh in the caller rather than drop
+            self._refresh(ids)
+
+    def flush(self):
+        """Refresh every job queued so far (callable from any thread)"""
+        if self._queue is None:
+            return
+        while True:
+            ids = self._take()
+            if not ids:
+                return
+            self._refresh(ids)
+
+    def _take(self, block=False):
+        """Up to QUEUE_BATCH_SIZE distinct queued job ids"""
+        ids = set()
+        try:
+            if block:
+                ids.update(self._queue.get())
+            while len(ids) < QUEUE_BATCH_SIZE:
+                ids.update(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return sorted(ids)
+
+    def _refresh(self, ids):
+        try:
+            refresh_jobs(ids)
+        except Exception:
+            logger.exception('Failed to refresh the feed rows of jobs %s', ids)
+
+    def _ensure_started(self, config):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._queue = queue.Queue(maxsize=config['MAX_QUEUE_SIZE'])
+                self._thread = threading.Thread(
+                    target=self._run, name='job-feed-refresher', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._refresh(self._take(block=True))
+            # This thread's connection, as after a request (CONN_MAX_AGE)
+            close_old_connections()
+
+
+refresher = JobRefresher()
+atexit.register(refresher.flush)
+
+
+def refresh_jobs_on_commit(ids):
+    """Queue refresh_jobs(ids) once the current transaction commits"""
+    ids = list(ids)
+    transaction.on_commit(lambda: refresher.put(ids))
+
+
+def refresh_candidates_on_commit(ids):
+    """refresh_candidates(ids) once the current transaction commits"""
+    ids = list(ids)
+    transaction.on_commit(lambda: refresh_candidates(ids))
+
+
+def rebuild(chunk_size=CHUNK_SIZE):
+    """
+    Recompute every row, return how many were written.
+    The public jobs are read once; then each chunk of candidates is
+    rescored and committed on its own, so writers are never blocked for
+    long and the feed stays readable throughout.
+    """
+    jobs = public_jobs()
+    public = Job.objects.filter(is_active=True).values('pk')
+    # Rows of jobs and candidates that left the feed
+    JobRecommendation.objects.exclude(job__in=public).delete()
+    JobRecommendation.objects.exclude(candidate__in=Candidate.objects.values('pk')).delete()
+    JobSkill.objects.exclude(job__in=public).delete()
+    CandidateSkill.objects.exclude(candidate__in=Candidate.objects.values('pk')).delete()
+
+    for start in range(0, len(jobs), chunk_size):
+        chunk = jobs[start:start + chunk_size]
+        with transaction.atomic():
+            _index_skills(JobSkill, 'job_id', [job.pk for job in chunk], chunk)
+
+    jobs_by_skill = by_skill(jobs)
+    written = 0
+    last = 0
+    while True:
+        ids = list(
+            Candidate.objects.filter(pk__gt=last).order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not ids:
+            return written
+        with transaction.atomic():
+            JobRecommendation.objects.filter(candidate_id__in=ids).delete()
+            candidates = live_candidates(ids)
+            _index_skills(CandidateSkill, 'candidate_id', ids, candidates)
+            written += _save(candidates, jobs_by_skill)
+        last = ids[-1]
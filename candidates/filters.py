@@ -1,4 +1,5 @@
 import django_filters
+from libs.trigrams import FuzzyFilter
 from .models import Candidate
 
 
@@ -6,6 +7,8 @@ class CandidateFilter(django_filters.FilterSet):
     """Filter for candidates list"""
 
     full_name = django_filters.CharFilter(lookup_expr='icontains')
+    # Typo-tolerant full_name match, most similar first
+    fuzzy = FuzzyFilter(index=Candidate.name_index)
     location = django_filters.CharFilter(lookup_expr='icontains')
     min_experience = django_filters.NumberFilter(
         field_name='experience_years',
@@ -0,0 +1,60 @@
+# Generated by Django 5.0.1 on 2026-10-19 00:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0002_archivedcandidate"),
+        ("jobs", "0003_jobchange"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobRecommendation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.PositiveSmallIntegerField()),
+                (
+                    "candidate",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recommendations",
+                        to="candidates.candidate",
+                    ),
+                ),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recommendations",
+                        to="jobs.job",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["candidate", "-score", "-job"],
+                        name="candidate_feed_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="jobrecommendation",
+            constraint=models.UniqueConstraint(
+                fields=("candidate", "job"), name="unique_candidate_recommendation"
+            ),
+        ),
+    ]
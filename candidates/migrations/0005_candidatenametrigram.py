@@ -0,0 +1,50 @@
+# Generated by Django 5.0.1 on 2026-10-19 00:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0004_savedsearch_jobalert"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CandidateNameTrigram",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("trigram", models.CharField(max_length=3)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="name_trigrams",
+                        to="candidates.candidate",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["trigram", "owner"], name="candidate_trigram_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="candidatenametrigram",
+            constraint=models.UniqueConstraint(
+                fields=("owner", "trigram"), name="unique_candidate_trigram"
+            ),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0006_archivedsavedsearch"),
+        ("jobs", "0004_jobband"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobSkill",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("skill", models.CharField(max_length=100)),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="feed_skills",
+                        to="jobs.job",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="CandidateSkill",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("skill", models.CharField(max_length=100)),
+                (
+                    "candidate",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="feed_skills",
+                        to="candidates.candidate",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["skill", "candidate"], name="candidate_skill_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="candidateskill",
+            constraint=models.UniqueConstraint(
+                fields=("candidate", "skill"), name="unique_candidate_skill"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobskill",
+            index=models.Index(fields=["skill", "job"], name="job_skill_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="jobskill",
+            constraint=models.UniqueConstraint(
+                fields=("job", "skill"), name="unique_job_skill"
+            ),
+        ),
+    ]
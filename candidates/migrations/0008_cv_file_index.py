@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("candidates", "0007_candidateskill_jobskill"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="archivedcandidate",
+            name="cv_file",
+            field=models.FileField(
+                blank=True, db_index=True, null=True, upload_to="cvs/"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="candidate",
+            name="cv_file",
+            field=models.FileField(
+                blank=True, db_index=True, null=True, upload_to="cvs/"
+            ),
+        ),
+    ]
@@ -1,13 +1,12 @@
 from django.db import models
 from libs.base_models import BaseModel
-from libs.managers import SoftDeleteManager, AllObjectsManager
+from jobs.models import EmploymentType
+from libs.managers import SoftDeleteManager, AllObjectsManager, ArchivedObjectsManager
+from libs.trigrams import AbstractTrigram, TrigramIndex
 
 
-class Candidate(BaseModel):
-    """
-    Candidate profile linked to a User with role=CANDIDATE.
-    Inherits audit fields and soft delete from BaseModel.
-    """
+class AbstractCandidate(BaseModel):
+    """Candidate columns, shared by Candidate and its archive table"""
 
     user = models.OneToOneField(
         'users.User',
@@ -19,7 +18,8 @@ class Candidate(BaseModel):
     cv_file = models.FileField(
         upload_to='cvs/',
         blank=True,
-        null=True
+        null=True,
+        db_index=True  # libs/media.py finds the owner of a file by name
     )
     skills = models.JSONField(
         default=list,
@@ -29,9 +29,284 @@ class Candidate(BaseModel):
     location = models.CharField(max_length=100, blank=True)
     bio = models.TextField(blank=True)
 
+    class Meta:
+        abstract = True
+
+
+class Candidate(AbstractCandidate):
+    """
+    Candidate profile linked to a User with role=CANDIDATE.
+    Inherits audit fields and soft delete from BaseModel.
+    """
+
+    # Managers for soft delete pattern
+    objects = SoftDeleteManager()
+    all_objects = AllObjectsManager()
+    archived_objects = ArchivedObjectsManager('candidates.ArchivedCandidate')
+
+    # Trigram rows are written in the same transaction as the profile
+    atomic_save = True
+
+    # Deleting a profile also deletes its saved searches
+    soft_cascade = ['saved_searches']
+
+    # Derived rows dropped, not archived, by archive_soft_deleted
+    archive_discard = ['recommendations', 'feed_skills', 'name_trigrams']
+
+    # ?fuzzy= name search (see libs/trigrams.py)
+    name_index = TrigramIndex('candidates.CandidateNameTrigram', 'full_name')
+
+    def __str__(self):
+        return self.full_name
+
+    def after_save(self, adding, changes):
+        super().after_save(adding, changes)
+        # Imported here: candidates/feed.py imports this module
+        from .feed import CANDIDATE_FIELDS, refresh_candidates_on_commit
+        if adding or set(changes) & CANDIDATE_FIELDS:
+            refresh_candidates_on_commit([self.pk])
+        if adding or 'full_name' in changes:
+            self.name_index.update(self)
+
+    @classmethod
+    def rows_changed(cls, ids, action, user=None):
+        super().rows_changed(ids, action, user)
+        from .feed import refresh_candidates_on_commit
+        refresh_candidates_on_commit(ids)
+
+
+class CandidateNameTrigram(AbstractTrigram):
+    """One trigram of a candidate's full_name, for Candidate.name_index"""
+
+    owner = models.ForeignKey(
+        Candidate,
+        on_delete=models.CASCADE,
+        related_name='name_trigrams'
+    )
+
+    def __str__(self):
+        return f"{self.trigram!r} of candidate #{self.owner_id}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'trigram'], name='unique_candidate_trigram'),
+        ]
+        indexes = [
+            models.Index(fields=['trigram', 'owner'], name='candidate_trigram_idx'),
+        ]
+
+
+class ArchivedCandidate(AbstractCandidate):
+    """
+    Soft-deleted candidate moved out of candidates_candidate by
+    archive_soft_deleted. Read via Candidate.archived_objects.
+    """
+
+    # Not one-to-one: archiving frees the user to create a new profile
+    user = models.ForeignKey(
+        'users.User',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='archived_candidates'
+    )
+    # Copied from the live row, not reset on insert
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.full_name} (archived)"
+
+
+class JobRecommendation(models.Model):
+    """
+    A public job matching a candidate, with its score: the materialized
+    feed behind GET /api/candidates/me/feed/ (see candidates/feed.py).
+    """
+
+    candidate = models.ForeignKey(
+        Candidate,
+        on_delete=models.CASCADE,
+        related_name='recommendations'
+    )
+    job = models.ForeignKey(
+        'jobs.Job',
+        on_delete=models.CASCADE,
+        related_name='recommendations'
+    )
+    score = models.PositiveSmallIntegerField()
+
+    def __str__(self):
+        return f"Job #{self.job_id} for candidate #{self.candidate_id} ({self.score})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['candidate', 'job'], name='unique_candidate_recommendation'
+            ),
+        ]
+        # One range scan per feed page
+        indexes = [
+            models.Index(
+                fields=['candidate', '-score', '-job'], name='candidate_feed_idx'
+            ),
+        ]
+
+
+class AbstractSavedSearch(BaseModel):
+    """Saved search columns, shared by SavedSearch and its archive table"""
+
+    name = models.CharField(max_length=100, blank=True)
+    title = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text='Words the job title must contain, each as a word start'
+    )
+    skills = models.JSONField(
+        default=list,
+        blank=True,
+        help_text='Skills the job must all require, e.g. ["Python"]'
+    )
+    employment_type = models.CharField(
+        max_length=20,
+        choices=EmploymentType.choices,
+        blank=True
+    )
+    location = models.CharField(max_length=100, blank=True)
+    min_salary = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True
+    )
+    # The one criterion the search is found by, e.g. 'skill:python'
+    anchor = models.CharField(max_length=250, db_index=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+
+class CandidateSkill(models.Model):
+    """
+    One normalized skill of a live candidate: the feed scores a job only
+    against the candidates sharing one of its skills (see candidates/feed.py).
+    """
+
+    candidate = models.ForeignKey(
+        Candidate,
+        on_delete=models.CASCADE,
+        related_name='feed_skills'
+    )
+    skill = models.CharField(max_length=100)
+
+    def __str__(self):
+        return f"{self.skill} of candidate #{self.candidate_id}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['candidate', 'skill'], name='unique_candidate_skill'),
+        ]
+        indexes = [
+            models.Index(fields=['skill', 'candidate'], name='candidate_skill_idx'),
+        ]
+
+
+class JobSkill(models.Model):
+    """One normalized skill of a public job, the other side of CandidateSkill"""
+
+    job = models.ForeignKey(
+        'jobs.Job',
+        on_delete=models.CASCADE,
+        related_name='feed_skills'
+    )
+    skill = models.CharField(max_length=100)
+
+    def __str__(self):
+        return f"{self.skill} of job #{self.job_id}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'skill'], name='unique_job_skill'),
+        ]
+        indexes = [
+            models.Index(fields=['skill', 'job'], name='job_skill_idx'),
+        ]
+
+
+class SavedSearch(AbstractSavedSearch):
+    """
+    Job search a candidate is alerted about: every new public job matching
+    all of its set criteria gets a JobAlert (see candidates/alerts.py).
+    """
+
+    candidate = models.ForeignKey(
+        Candidate,
+        on_delete=models.CASCADE,
+        related_name='saved_searches'
+    )
+
     # Managers for soft delete pattern
     objects = SoftDeleteManager()
     all_objects = AllObjectsManager()
+    archived_objects = ArchivedObjectsManager('candidates.ArchivedSavedSearch')
+
+    # Dropped, not archived, by archive_soft_deleted
+    archive_discard = ['alerts']
 
     def __str__(self):
-        return self.full_name
\ No newline at end of file
+        return self.name or f"Saved search #{self.pk}"
+
+    def save(self, *args, **kwargs):
+        # Imported here: candidates/alerts.py imports this module
+        from .alerts import anchor_for
+        self.anchor = anchor_for(self)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'anchor'}
+        super().save(*args, **kwargs)
+
+
+class ArchivedSavedSearch(AbstractSavedSearch):
+    """
+    Soft-deleted saved search moved out of candidates_savedsearch by
+    archive_soft_deleted, before its candidate.
+    """
+
+    # No FK constraint: the candidate is archived right after
+    candidate = models.ForeignKey(
+        Candidate,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='archived_saved_searches'
+    )
+    # Copied from the live row, not reset on insert
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name or f'Saved search #{self.pk}'} (archived)"
+
+
+class JobAlert(models.Model):
+    """A new job matching a saved search, listed by the candidate's alerts"""
+
+    search = models.ForeignKey(
+        SavedSearch,
+        on_delete=models.CASCADE,
+        related_name='alerts'
+    )
+    job = models.ForeignKey(
+        'jobs.Job',
+        on_delete=models.CASCADE,
+        related_name='alerts'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Job #{self.job_id} for search #{self.search_id}"
+
+    class Meta:
+        ordering = ['-id']
+        constraints = [
+            models.UniqueConstraint(fields=['search', 'job'], name='unique_search_alert'),
+        ]
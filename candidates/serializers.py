@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Candidate
+from .models import Candidate, JobAlert, JobRecommendation, SavedSearch
+from jobs.serializers import JobListSerializer
 from users.serializers import UserReadSerializer
 
 
@@ -35,4 +36,51 @@ class CandidateWriteSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         validated_data['updated_by'] = self.context['request'].user
-        return super().update(instance, validated_data)
\ No newline at end of file
+        return super().update(instance, validated_data)
+
+
+class JobRecommendationSerializer(serializers.ModelSerializer):
+    """Serializer for entries of the candidate job feed"""
+    job = JobListSerializer(read_only=True)
+
+    class Meta:
+        model = JobRecommendation
+        fields = ['score', 'job']
+        read_only_fields = fields
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    """Serializer for a candidate's saved searches"""
+
+    class Meta:
+        model = SavedSearch
+        fields = [
+            'id', 'name', 'title', 'skills', 'employment_type',
+            'location', 'min_salary', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+    def validate_skills(self, value):
+        if not isinstance(value, list) or not all(isinstance(skill, str) for skill in value):
+            raise serializers.ValidationError('Must be a list of skill names')
+        return value
+
+    def create(self, validated_data):
+        user = self.context['request'].user
+        validated_data['candidate'] = user.candidate
+        validated_data['created_by'] = user
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        validated_data['updated_by'] = self.context['request'].user
+        return super().update(instance, validated_data)
+
+
+class JobAlertSerializer(serializers.ModelSerializer):
+    """Serializer for job alerts of saved searches"""
+    job = JobListSerializer(read_only=True)
+
+    class Meta:
+        model = JobAlert
+        fields = ['id', 'search', 'job', 'created_at']
+        read_only_fields = fields
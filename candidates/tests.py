@@ -1,9 +1,30 @@
-from django.test import TestCase
+from datetime import timedelta
+import io
+import os
+import tempfile
+import zipfile
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from libs.query_budget import query_budget
+from libs.trigrams import similarity, trigrams
+from companies.models import Company
+from jobs.models import Job
 from users.models import User, UserRole
-from .models import Candidate
+from . import alerts, feed
+from .models import (
+    Candidate, CandidateNameTrigram, CandidateSkill, JobAlert, JobRecommendation, JobSkill,
+    SavedSearch
+)
+from .views import CandidateViewSet
 
 
 class CandidateModelTests(TestCase):
@@ -118,6 +139,23 @@ class CandidateAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['full_name'], 'Ahmed Ali')
 
+    def test_list_within_query_budget(self):
+        """Test the candidate list loads users without a query per candidate"""
+        for index in range(4):
+            user = User.objects.create_user(
+                phone=f'051000000{index}',
+                password='testpass123',
+                role=UserRole.CANDIDATE
+            )
+            Candidate.objects.create(
+                user=user, full_name=f'Candidate {index}', phone=f'051000000{index}'
+            )
+        # A real token: budgets include the authentication queries
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.company_user)}')
+        with query_budget.for_view(CandidateViewSet, 'list'):
+            response = self.client.get(reverse('candidate-list'))
+        self.assertEqual(len(response.data['results']), 5)
+
     def test_create_candidate_authenticated(self):
         """Test creating a candidate profile when authenticated"""
         new_user = User.objects.create_user(
@@ -209,3 +247,516 @@ class CandidateAPITests(APITestCase):
 
         response = self.client.get(url, {'min_experience': 10})
         self.assertEqual(len(response.data['results']), 0)
+
+
+class CandidateFuzzySearchTests(APITestCase):
+    """Tests for the trigram ?fuzzy= name filter"""
+
+    def setUp(self):
+        self.company_user = User.objects.create_user(
+            phone='0502222222',
+            password='testpass123',
+            role=UserRole.COMPANY
+        )
+        self.candidates = {}
+        for index, name in enumerate(['Ahmed Hassan', 'Ahmad Hasan Ali', 'Fatima Zahra']):
+            user = User.objects.create_user(
+                phone=f'051000000{index}',
+                password='testpass123',
+                role=UserRole.CANDIDATE
+            )
+            self.candidates[name] = Candidate.objects.create(user=user, full_name=name)
+        self.client.force_authenticate(user=self.company_user)
+
+    def fuzzy(self, query):
+        response = self.client.get(reverse('candidate-list'), {'fuzzy': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [result['full_name'] for result in response.data['results']]
+
+    def test_trigrams(self):
+        """Test words are padded pg_trgm style and accents ignored"""
+        self.assertEqual(trigrams('Ahmed'), {'  a', ' ah', 'ahm', 'hme', 'med', 'ed '})
+        self.assertEqual(trigrams('Zoë'), trigrams('zoe'))
+        self.assertAlmostEqual(similarity('Ahmad Hasan', 'Ahmed Hassan'), 8 / 17)
+
+    def test_fuzzy_matches_misspellings_best_first(self):
+        """Test a misspelt name finds the close names, most similar first"""
+        self.assertEqual(self.fuzzy('Ahmad Hasan'), ['Ahmad Hasan Ali', 'Ahmed Hassan'])
+        self.assertEqual(self.fuzzy('ahmed hasan'), ['Ahmed Hassan', 'Ahmad Hasan Ali'])
+        self.assertEqual(self.fuzzy('Fatema Zahra'), ['Fatima Zahra'])
+        self.assertEqual(self.fuzzy('Omar'), [])
+
+    def test_index_follows_renames_and_deletes(self):
+        """Test renamed and soft-deleted candidates are found as they now are"""
+        candidate = self.candidates['Fatima Zahra']
+        candidate.full_name = 'Omar Khalid'
+        candidate.save()
+        self.assertEqual(self.fuzzy('Fatema Zahra'), [])
+        self.assertEqual(self.fuzzy('Omar Kaled'), ['Omar Khalid'])
+
+        candidate.soft_delete()
+        self.assertEqual(self.fuzzy('Omar Kaled'), [])
+
+    def test_rebuild_command_indexes_bulk_inserts(self):
+        """Test rebuild_name_trigrams indexes rows inserted without hooks"""
+        CandidateNameTrigram.objects.all().delete()
+        self.assertEqual(self.fuzzy('Ahmed Hassan'), [])
+        call_command('rebuild_name_trigrams', stdout=StringIO())
+        self.assertEqual(self.fuzzy('Ahmed Hassan'), ['Ahmed Hassan', 'Ahmad Hasan Ali'])
+
+    def test_rebuild_keeps_names_searchable(self):
+        """Test names not re-indexed yet are still found during a rebuild"""
+        index = Candidate.name_index
+        found = []
+        update_many = index.update_many
+
+        def batch(instances):
+            update_many(instances)
+            found.append(self.fuzzy('Fatima Zahra'))
+
+        with mock.patch.object(index, 'update_many', batch):
+            count = index.rebuild(Candidate.objects.exclude(full_name='Ahmed Hassan'), batch_size=1)
+        self.assertEqual(count, 2)
+        self.assertEqual(found, [['Fatima Zahra']] * 2)
+        # Rows of owners outside the queryset are dropped at the end
+        self.assertEqual(self.fuzzy('Ahmed Hassan'), ['Ahmad Hasan Ali'])
+
+
+class CandidateArchiveTests(TestCase):
+    """Tests for archiving soft-deleted candidates"""
+
+    def test_archiving_frees_user_for_new_profile(self):
+        """Test an archived profile no longer blocks a new one"""
+        user = User.objects.create_user(
+            phone='0503333333',
+            password='testpass123',
+            role=UserRole.CANDIDATE
+        )
+        candidate = Candidate.objects.create(user=user, full_name='Ahmed Ali')
+        Candidate.objects.filter(pk=candidate.pk).update(
+            deleted_at=timezone.now() - timedelta(days=365)
+        )
+
+        call_command('archive_soft_deleted', stdout=StringIO())
+
+        self.assertEqual(Candidate.all_objects.count(), 0)
+        self.assertEqual(Candidate.archived_objects.get().full_name, 'Ahmed Ali')
+        Candidate.objects.create(user=user, full_name='Ahmed Ali')
+        self.assertEqual(Candidate.objects.count(), 1)
+
+    def test_saved_searches_archived_before_candidate(self):
+        """Test saved searches are archived and derived rows dropped"""
+        user = User.objects.create_user(
+            phone='0503333333',
+            password='testpass123',
+            role=UserRole.CANDIDATE
+        )
+        candidate = Candidate.objects.create(user=user, full_name='Ahmed Ali')
+        search = SavedSearch.objects.create(candidate=candidate, name='Python', skills=['Python'])
+        candidate.soft_delete()
+        Candidate.all_objects.update(deleted_at=timezone.now() - timedelta(days=365))
+        SavedSearch.all_objects.update(deleted_at=timezone.now() - timedelta(days=365))
+
+        call_command('archive_soft_deleted', stdout=StringIO())
+
+        self.assertEqual(SavedSearch.archived_objects.get().pk, search.pk)
+        self.assertEqual(Candidate.archived_objects.get().pk, candidate.pk)
+        self.assertFalse(CandidateNameTrigram.objects.exists())
+
+    def test_candidate_with_live_saved_search_is_kept(self):
+        """Test a row other records depend on is not archived"""
+        user = User.objects.create_user(
+            phone='0503333333',
+            password='testpass123',
+            role=UserRole.CANDIDATE
+        )
+        candidate = Candidate.objects.create(user=user, full_name='Ahmed Ali')
+        SavedSearch.objects.create(candidate=candidate, name='Python')
+        Candidate.objects.update(deleted_at=timezone.now() - timedelta(days=365))
+
+        out = StringIO()
+        call_command('archive_soft_deleted', stdout=out)
+
+        self.assertEqual(Candidate.all_objects.count(), 1)
+        self.assertEqual(SavedSearch.objects.count(), 1)
+        self.assertIn('Candidate: archived 0 rows, kept 1 still referenced', out.getvalue())
+
+
+# Writes here run their on-commit hooks: keep the audit log and the feed
+# refresher thread out of them
+@override_settings(AUDIT_LOG={'ENABLED': False}, JOB_FEED={'ASYNC': False})
+class CandidateFeedTests(APITestCase):
+    """Tests for the materialized job feed at /api/candidates/me/feed/"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            phone='0503333333', password='testpass123', role=UserRole.CANDIDATE
+        )
+        # The feed is refreshed once a write commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.candidate = Candidate.objects.create(
+                user=self.user, full_name='Ahmed Ali',
+                skills=['Python', 'Django'], experience_years=6, location='Riyadh'
+            )
+        owner = User.objects.create_user(
+            phone='0502222222', password='testpass123', role=UserRole.COMPANY
+        )
+        self.company = Company.objects.create(user=owner, name='TechCorp', location='Riyadh')
+        self.url = reverse('candidate-feed')
+        self.client.force_authenticate(user=self.user)
+
+    def create_job(self, title, skills, location='Riyadh', **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Job.objects.create(
+                company=self.company, title=title, description='D', requirements='R',
+                required_skills=skills, location=location, **fields
+            )
+
+    def feed(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_scores(self):
+        """Test skills coverage, location and experience level make the score"""
+        profile = feed.CandidateProfile(1, ['python', 'Django'], 6, 'Riyadh')
+        job = feed.JobProfile
+        self.assertEqual(feed.score(profile, job(1, 'Senior Dev', ['Python', 'Django'], 'riyadh')), 130)
+        self.assertEqual(feed.score(profile, job(1, 'Junior Dev', ['Python', 'Go'], 'Jeddah')), 50)
+        self.assertEqual(feed.score(profile, job(1, 'Developer', ['Go'], 'Riyadh')), 0)
+
+    def test_feed_follows_job_and_profile_changes(self):
+        """Test writes to jobs and the profile update the stored feed"""
+        best = self.create_job('Senior Python Developer', ['Python', 'Django'])
+        other = self.create_job('Data Engineer', ['Python', 'Spark'], location='Jeddah')
+        self.create_job('Designer', ['Figma'])
+        self.assertEqual(
+            [(entry['job']['id'], entry['score']) for entry in self.feed()['results']],
+            [(best.pk, 130), (other.pk, 60)]
+        )
+
+        best.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            best.save(update_fields=['is_active'])
+            Job.objects.filter(pk=other.pk).soft_delete()
+        self.assertEqual(self.feed()['results'], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            Job.all_objects.filter(pk=other.pk).restore()
+        self.assertEqual([entry['job']['id'] for entry in self.feed()['results']], [other.pk])
+
+        self.candidate.skills = ['Figma']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.candidate.save()
+        self.assertEqual(
+            [entry['job']['title'] for entry in self.feed()['results']], ['Designer']
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.candidate.soft_delete()
+        self.assertFalse(JobRecommendation.objects.exists())
+        self.assertFalse(CandidateSkill.objects.exists())
+
+    @override_settings(JOB_FEED={'ASYNC': False, 'MAX_PER_CANDIDATE': 2})
+    def test_rows_capped_per_candidate(self):
+        """Test a feed keeps its best rows as jobs come, go and are rebuilt"""
+        def stored():
+            return list(
+                JobRecommendation.objects.order_by('-score', '-job_id')
+                .values_list('job_id', 'score')
+            )
+
+        best = self.create_job('Senior Python Developer', ['Python', 'Django'])
+        second = self.create_job('Developer', ['Python', 'Go'])
+        third = self.create_job('Developer', ['Python', 'Rust'], location='Jeddah')
+        self.assertEqual(stored(), [(best.pk, 130), (second.pk, 80)])
+
+        # Beats the last row, which is dropped
+        newest = self.create_job('Developer', ['Django'])
+        self.assertEqual(stored(), [(newest.pk, 130), (best.pk, 130)])
+        # A full feed losing a row takes the next best job
+        best.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            best.save(update_fields=['is_active'])
+        self.assertEqual(stored(), [(newest.pk, 130), (second.pk, 80)])
+
+        self.assertEqual(feed.refresh_jobs([third.pk], chunk_size=1), 1)
+        self.assertEqual(stored(), [(newest.pk, 130), (second.pk, 80)])
+        self.assertEqual(feed.rebuild(), 2)
+        self.assertEqual(stored(), [(newest.pk, 130), (second.pk, 80)])
+
+    @override_settings(JOB_FEED={'ASYNC': True, 'MAX_QUEUE_SIZE': 1})
+    @mock.patch('candidates.feed.JobRefresher._run')
+    def test_job_refresh_runs_off_the_request(self, _run):
+        """Test job changes are queued for the refresher thread, bounded"""
+        with mock.patch.object(feed, 'refresher', feed.JobRefresher()) as refresher:
+            first = self.create_job('Developer', ['Python'])
+            self.assertFalse(JobRecommendation.objects.exists())
+            # The queue is full: this writer refreshes its own job
+            second = self.create_job('Developer', ['Django'])
+            self.assertEqual(
+                list(JobRecommendation.objects.values_list('job_id', flat=True)), [second.pk]
+            )
+            refresher.flush()
+        self.assertEqual(
+            set(JobRecommendation.objects.values_list('job_id', flat=True)), {first.pk, second.pk}
+        )
+
+    def test_refresh_waits_for_commit(self):
+        """Test a write is scored after it commits, only against shared skills"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            job = Job.objects.create(
+                company=self.company, title='Developer', description='D', requirements='R',
+                required_skills=['Django'], location='Riyadh'
+            )
+        self.assertFalse(JobRecommendation.objects.exists())
+        for callback in callbacks:
+            callback()
+        self.assertEqual(JobRecommendation.objects.get().job, job)
+        self.assertEqual(
+            set(JobSkill.objects.values_list('job_id', 'skill')), {(job.pk, 'django')}
+        )
+
+        # No candidate knows Figma: nobody is scored against the job
+        designer = self.create_job('Designer', ['Figma'])
+        self.assertFalse(JobRecommendation.objects.filter(job=designer).exists())
+
+    def test_keyset_pagination_in_one_query(self):
+        """Test pages follow next_cursor and each is a single query after auth"""
+        jobs = [self.create_job(f'Developer {n}', ['Python']) for n in range(5)]
+        self.client.force_authenticate(user=None)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        seen = []
+        params = {'limit': 2}
+        while True:
+            with query_budget.for_view(CandidateViewSet, 'feed') as recorder:
+                page = self.feed(**params)
+            # The token's user, then the page
+            self.assertEqual(len(recorder.queries), 2)
+            seen += [entry['job']['id'] for entry in page['results']]
+            if page['next_cursor'] is None:
+                break
+            params['cursor'] = page['next_cursor']
+        self.assertEqual(seen, sorted((job.pk for job in jobs), reverse=True))
+
+    def test_invalid_requests(self):
+        """Test bad cursors and users without a profile are rejected"""
+        response = self.client.get(self.url, {'cursor': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(user=self.company.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_rebuild_command(self):
+        """Test rebuild_job_feed recomputes the stored rows"""
+        self.create_job('Developer', ['Django'])
+        JobRecommendation.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_job_feed', stdout=out)
+        self.assertIn('1 recommendations written', out.getvalue())
+        self.assertEqual(JobRecommendation.objects.get().score, 130)
+
+    def test_rebuild_in_chunks(self):
+        """Test rebuild() commits each chunk and drops stale rows"""
+        jobs = [self.create_job(f'Developer {n}', ['Python']) for n in range(3)]
+        for index in range(4):
+            user = User.objects.create_user(
+                phone=f'051000000{index}', password='testpass123', role=UserRole.CANDIDATE
+            )
+            Candidate.objects.create(user=user, full_name=f'Candidate {index}', skills=['python'])
+        Job.objects.filter(pk=jobs[0].pk).update(is_active=False)
+        CandidateSkill.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(feed.rebuild(chunk_size=2), 10)
+        # One transaction (a savepoint here) per chunk: 1 of jobs, 3 of candidates
+        savepoints = [q for q in queries.captured_queries if q['sql'].startswith('SAVEPOINT')]
+        self.assertEqual(len(savepoints), 4)
+        self.assertEqual(JobRecommendation.objects.count(), 10)
+        self.assertFalse(JobRecommendation.objects.filter(job=jobs[0]).exists())
+        self.assertEqual(CandidateSkill.objects.count(), 6)
+
+
+# Writes here run their on-commit hooks: keep the audit log and the feed
+# refresher thread out of them
+@override_settings(AUDIT_LOG={'ENABLED': False}, JOB_FEED={'ASYNC': False})
+class SavedSearchAlertTests(APITestCase):
+    """Tests for saved searches and the job alert percolator"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            phone='0503333333', password='testpass123', role=UserRole.CANDIDATE
+        )
+        self.candidate = Candidate.objects.create(user=self.user, full_name='Ahmed Ali')
+        owner = User.objects.create_user(
+            phone='0502222222', password='testpass123', role=UserRole.COMPANY
+        )
+        self.company = Company.objects.create(user=owner, name='TechCorp', location='Riyadh')
+        self.client.force_authenticate(user=self.user)
+
+    def save_search(self, **criteria):
+        response = self.client.post(reverse('saved-search-list'), criteria, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return SavedSearch.objects.get(pk=response.data['id'])
+
+    def create_job(self, title='Senior Python Engineer', **fields):
+        fields = {
+            'required_skills': ['Python', 'Django'], 'location': 'Riyadh, KSA',
+            'salary_min': 12000, **fields,
+        }
+        # Percolation runs once the write commits
+        with self.captureOnCommitCallbacks(execute=True):
+            return Job.objects.create(
+                company=self.company, title=title, description='D', requirements='R', **fields
+            )
+
+    def alerted(self, search):
+        return set(search.alerts.values_list('job_id', flat=True))
+
+    def test_anchor_is_most_selective_criterion(self):
+        """Test searches are indexed under a skill, then title, location, type"""
+        self.assertEqual(self.save_search(skills=['SQL', 'Python'], title='dev').anchor, 'skill:python')
+        self.create_job(required_skills=['Python', 'SQL'])
+        self.create_job(required_skills=['Python', 'Django'])
+        # The skill the fewest public jobs require
+        self.assertEqual(self.save_search(skills=['SQL', 'Python']).anchor, 'skill:sql')
+        self.assertEqual(self.save_search(skills=['Python', 'Go']).anchor, 'skill:go')
+        self.assertEqual(self.save_search(title='senior data engineer').anchor, 'title:engineer')
+        self.assertEqual(self.save_search(location='Riyadh').anchor, 'location:riyadh')
+        self.assertEqual(self.save_search(employment_type='CONTRACT').anchor, 'type:CONTRACT')
+        self.assertEqual(self.save_search(min_salary='5000').anchor, 'any:')
+
+    def test_new_jobs_alert_matching_searches(self):
+        """Test every criterion is applied to the searches a job's anchors find"""
+        searches = {
+            'skills': self.save_search(skills=['python']),
+            'title': self.save_search(title='pyth eng'),
+            'location': self.save_search(location='ksa', employment_type='FULL_TIME'),
+            'salary': self.save_search(min_salary='10000'),
+            'missing_skill': self.save_search(skills=['Python', 'Go']),
+            'other_title': self.save_search(title='python manager'),
+            'other_type': self.save_search(employment_type='CONTRACT'),
+            'high_salary': self.save_search(min_salary='20000'),
+        }
+        job = self.create_job()
+        self.assertEqual(
+            {name for name, search in searches.items() if self.alerted(search) == {job.pk}},
+            {'skills', 'title', 'location', 'salary'}
+        )
+        self.assertEqual(JobAlert.objects.count(), 4)
+
+    def test_alerted_when_public_and_only_once(self):
+        """Test inactive jobs wait for activation and re-activation does not repeat alerts"""
+        search = self.save_search(skills=['Django'])
+        job = self.create_job(is_active=False)
+        self.assertEqual(self.alerted(search), set())
+        with self.captureOnCommitCallbacks(execute=True):
+            for is_active in (True, False, True):
+                job.is_active = is_active
+                job.save(update_fields=['is_active'])
+            Job.objects.filter(pk=job.pk).soft_delete()
+            Job.all_objects.filter(pk=job.pk).restore()
+        self.assertEqual(search.alerts.count(), 1)
+
+    def test_percolation_waits_for_commit(self):
+        """Test no alert is written inside the job's transaction"""
+        search = self.save_search(skills=['Django'])
+        with self.captureOnCommitCallbacks() as callbacks:
+            job = Job.objects.create(
+                company=self.company, title='Developer', description='D', requirements='R',
+                required_skills=['Django']
+            )
+            self.assertEqual(self.alerted(search), set())
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.alerted(search), {job.pk})
+
+        search.soft_delete()
+        self.create_job()
+        self.assertEqual(search.alerts.count(), 1)
+
+    def test_alerts_endpoint(self):
+        """Test candidates list the alerts of their own searches"""
+        self.save_search(skills=['Python'])
+        job = self.create_job()
+        response = self.client.get(reverse('saved-search-alerts'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([alert['job']['id'] for alert in response.data['results']], [job.pk])
+
+        self.client.force_authenticate(user=self.company.user)
+        response = self.client.get(reverse('saved-search-alerts'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_matches(self):
+        """Test title and location words must start words of the job's"""
+        job = self.create_job()
+        search = SavedSearch(title='ngineer', skills=[])
+        self.assertFalse(alerts.matches(search, job))
+        search.title = 'SENIOR python'
+        self.assertTrue(alerts.matches(search, job))
+
+
+class CandidateCVArchiveTests(APITestCase):
+    """Tests for the streamed ZIP of candidate CVs"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        media = override_settings(MEDIA_ROOT=self.directory.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        os.makedirs(os.path.join(self.directory.name, 'cvs'))
+
+        self.company_user = User.objects.create_user(phone='0502222222', role=UserRole.COMPANY)
+        self.candidates = []
+        for index, (name, cv) in enumerate([
+            ('Ahmed Ali', 'cvs/ahmed.pdf'), ('Fatima Hassan', 'cvs/fatima.txt'), ('Omar Khalid', '')
+        ]):
+            if cv:
+                with open(os.path.join(self.directory.name, cv), 'wb') as f:
+                    f.write(f'CV of {name} '.encode() * 100)
+            user = User.objects.create_user(phone=f'051000000{index}', role=UserRole.CANDIDATE)
+            self.candidates.append(
+                Candidate.objects.create(user=user, full_name=name, location='Riyadh', cv_file=cv)
+            )
+        self.client.force_authenticate(user=self.company_user)
+
+    def download(self, params):
+        response = self.client.get(reverse('candidate-cvs'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertTrue(response.streaming)
+        return zipfile.ZipFile(io.BytesIO(response.getvalue()))
+
+    def test_archive_of_selected_ids(self):
+        """Test the ZIP holds the CVs of ?ids=, PDFs stored and text deflated"""
+        ids = ','.join(str(candidate.pk) for candidate in self.candidates)
+        archive = self.download({'ids': ids})
+        self.assertIsNone(archive.testzip())
+        members = {info.filename: info for info in archive.infolist()}
+        pdf = f'{self.candidates[0].pk}-ahmed-ali.pdf'
+        text = f'{self.candidates[1].pk}-fatima-hassan.txt'
+        self.assertEqual(set(members), {pdf, text})
+        self.assertEqual(members[pdf].compress_type, zipfile.ZIP_STORED)
+        self.assertEqual(members[text].compress_type, zipfile.ZIP_DEFLATED)
+        self.assertEqual(archive.read(pdf), b'CV of Ahmed Ali ' * 100)
+
+        archive = self.download({'ids': str(self.candidates[1].pk)})
+        self.assertEqual(archive.namelist(), [text])
+
+    def test_archive_of_filtered_candidates(self):
+        """Test the list filters select the candidates too"""
+        archive = self.download({'fuzzy': 'Ahmad Ali'})
+        self.assertEqual(archive.namelist(), [f'{self.candidates[0].pk}-ahmed-ali.pdf'])
+
+    def test_limits_and_permissions(self):
+        """Test oversized selections are refused up front, and candidates cannot download"""
+        url = reverse('candidate-cvs')
+        with override_settings(CV_ARCHIVES={'MAX_FILES': 1}):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(CV_ARCHIVES={'MAX_BYTES': 2000}):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'ids': 'a,b'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=self.candidates[0].user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
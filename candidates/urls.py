@@ -1,9 +1,11 @@
 # candidates/urls.py
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CandidateViewSet
+from .views import CandidateViewSet, SavedSearchViewSet
 
 router = DefaultRouter()
+# Before '': its detail route would take 'saved-searches' as an id
+router.register('saved-searches', SavedSearchViewSet, basename='saved-search')
 router.register('', CandidateViewSet, basename='candidate')
 
 urlpatterns = [
@@ -1,12 +1,32 @@
+from django.db.models import Q
+from django.http import StreamingHttpResponse
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Candidate
-from .serializers import CandidateReadSerializer, CandidateWriteSerializer
+from libs.db_router import ReplicaReadMixin
+from libs.zipstream import stream_zip
+from .cv_archive import ArchiveTooLarge, cv_entries
+from .models import Candidate, JobAlert, JobRecommendation, SavedSearch
+from .serializers import (
+    CandidateReadSerializer,
+    CandidateWriteSerializer,
+    JobAlertSerializer,
+    JobRecommendationSerializer,
+    SavedSearchSerializer
+)
 from .filters import CandidateFilter
 
 
-class CandidateViewSet(viewsets.ModelViewSet):
+class IsCompany(permissions.BasePermission):
+    """The user is a company (or an admin)"""
+    message = 'Only companies can download CVs'
+
+    def has_permission(self, request, view):
+        user = request.user
+        return user.is_staff or user.is_admin_user() or user.is_company_user()
+
+
+class CandidateViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for Candidate CRUD operations.
 
@@ -16,8 +36,16 @@ class CandidateViewSet(viewsets.ModelViewSet):
     update: PUT /api/candidates/{id}/    - Update profile
     delete: DELETE /api/candidates/{id}/ - Soft delete
     me:     GET /api/candidates/me/      - Get current user's profile
+    feed:   GET /api/candidates/me/feed/ - Jobs recommended to the current user
+    cvs:    GET /api/candidates/cvs/     - ZIP of the CVs of ?ids= / filtered candidates
     """
-    queryset = Candidate.objects.all()
+    queryset = Candidate.objects.select_related('user')
+    replica_actions = ['list', 'retrieve', 'feed', 'cvs']
+    # Max queries per action, checked by tests and QueryBudgetMiddleware.
+    # Includes the JWT user lookup; an empty feed also checks the profile
+    query_budgets = {'list': 3, 'retrieve': 2, 'feed': 3}
+    feed_page_size = 20
+    feed_max_page_size = 100
     filterset_class = CandidateFilter
     search_fields = ['full_name', 'bio', 'skills']
     ordering_fields = ['full_name', 'experience_years', 'created_at']
@@ -31,6 +59,8 @@ class CandidateViewSet(viewsets.ModelViewSet):
         if self.action in ['list', 'retrieve']:
             # Companies can view candidates
             return [permissions.IsAuthenticated()]
+        if self.action == 'cvs':
+            return [permissions.IsAuthenticated(), IsCompany()]
         return [permissions.IsAuthenticated()]
 
     @action(detail=False, methods=['get'])
@@ -46,6 +76,120 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+    @action(detail=False, methods=['get'], url_path='me/feed')
+    def feed(self, request):
+        """
+        Recommended jobs, best first (see candidates/feed.py).
+        Pass back next_cursor to get the following page; null on the last.
+        """
+        try:
+            limit = int(request.query_params.get('limit', self.feed_page_size))
+            cursor = request.query_params.get('cursor')
+            if cursor is not None:
+                score, job_id = (int(part) for part in cursor.split(':'))
+        except ValueError:
+            return Response(
+                {'error': 'limit must be an integer and cursor a next_cursor value'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if limit < 1:
+            return Response(
+                {'error': 'limit must be >= 1'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = min(limit, self.feed_max_page_size)
+
+        # One range scan of candidate_feed_idx, keyset paginated
+        entries = JobRecommendation.objects.filter(
+            candidate__user=request.user
+        ).select_related('job__company').order_by('-score', '-job_id')
+        if cursor is not None:
+            entries = entries.filter(
+                Q(score__lt=score) | Q(score=score, job_id__lt=job_id)
+            )
+        # One extra row tells us whether another page follows
+        entries = list(entries[:limit + 1])
+        if not entries and cursor is None and not hasattr(request.user, 'candidate'):
+            return Response(
+                {'error': 'No candidate profile found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        next_cursor = None
+        if len(entries) > limit:
+            entries = entries[:limit]
+            next_cursor = f'{entries[-1].score}:{entries[-1].job_id}'
+        return Response({
+            'results': JobRecommendationSerializer(entries, many=True).data,
+            'next_cursor': next_cursor,
+        })
+
+    @action(detail=False, methods=['get'])
+    def cvs(self, request):
+        """
+        ZIP of the CVs of the candidates in ?ids=1,2,3 and/or matching the
+        list filters, streamed as it is built (see candidates/cv_archive.py).
+        """
+        candidates = self.filter_queryset(self.get_queryset())
+        if 'ids' in request.query_params:
+            try:
+                ids = [int(pk) for pk in request.query_params['ids'].split(',') if pk.strip()]
+            except ValueError:
+                return Response(
+                    {'error': 'ids must be comma-separated candidate ids'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            candidates = candidates.filter(pk__in=ids)
+        try:
+            entries = cv_entries(candidates)
+        except ArchiveTooLarge as exc:
+            return Response(
+                {'error': f'{exc}, narrow the selection'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        response = StreamingHttpResponse(stream_zip(entries), content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="cvs.zip"'
+        return response
+
+    def perform_destroy(self, instance):
+        """Soft delete instead of hard delete"""
+        instance.soft_delete(user=self.request.user)
+
+
+class IsCandidate(permissions.BasePermission):
+    """The user has a candidate profile"""
+    message = 'No candidate profile found'
+
+    def has_permission(self, request, view):
+        return hasattr(request.user, 'candidate')
+
+
+class SavedSearchViewSet(viewsets.ModelViewSet):
+    """
+    Saved job searches of the current candidate, alerted about new jobs
+    (see candidates/alerts.py).
+
+    list:   GET /api/candidates/saved-searches/          - My saved searches
+    create: POST /api/candidates/saved-searches/         - Save a search
+    read:   GET /api/candidates/saved-searches/{id}/     - Get saved search
+    update: PUT /api/candidates/saved-searches/{id}/     - Update saved search
+    delete: DELETE /api/candidates/saved-searches/{id}/  - Soft delete
+    alerts: GET /api/candidates/saved-searches/alerts/   - New jobs matching my searches
+    """
+    serializer_class = SavedSearchSerializer
+    permission_classes = [permissions.IsAuthenticated, IsCandidate]
+
+    def get_queryset(self):
+        return SavedSearch.objects.filter(candidate__user=self.request.user).order_by('-id')
+
+    @action(detail=False, methods=['get'])
+    def alerts(self, request):
+        """Alerts of all my saved searches, newest first"""
+        alerts = JobAlert.objects.filter(
+            search__candidate__user=request.user, search__deleted_at__isnull=True
+        ).select_related('job__company')
+        page = self.paginate_queryset(alerts)
+        return self.get_paginated_response(JobAlertSerializer(page, many=True).data)
+
     def perform_destroy(self, instance):
         """Soft delete instead of hard delete"""
-        instance.soft_delete(user=self.request.user)
\ No newline at end of file
+        instance.soft_delete(user=self.request.user)
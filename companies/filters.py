@@ -1,4 +1,5 @@
 import django_filters
+from libs.trigrams import FuzzyFilter
 from .models import Company, Industry
 
 
@@ -6,6 +7,8 @@ class CompanyFilter(django_filters.FilterSet):
     """Filter for companies list"""
 
     name = django_filters.CharFilter(lookup_expr='icontains')
+    # Typo-tolerant name match, most similar first
+    fuzzy = FuzzyFilter(index=Company.name_index)
     industry = django_filters.ChoiceFilter(choices=Industry.choices)
     location = django_filters.CharFilter(lookup_expr='icontains')
 
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-19 01:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("companies", "0002_companynametrigram"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="company",
+            name="logo",
+            field=models.ImageField(
+                blank=True, db_index=True, null=True, upload_to="logos/"
+            ),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from libs.base_models import BaseModel
 from libs.managers import SoftDeleteManager, AllObjectsManager
+from libs.trigrams import AbstractTrigram, TrigramIndex
 
 
 class Industry(models.TextChoices):
@@ -29,7 +30,8 @@ class Company(BaseModel):
     logo = models.ImageField(
         upload_to='logos/',
         blank=True,
-        null=True
+        null=True,
+        db_index=True  # libs/media.py finds the owner of a file by name
     )
     industry = models.CharField(
         max_length=50,
@@ -44,8 +46,43 @@ class Company(BaseModel):
     objects = SoftDeleteManager()      # Default: only active
     all_objects = AllObjectsManager()  # Include deleted
 
+    # Soft-deleting a company also soft-deletes its jobs
+    soft_cascade = ['jobs']
+
+    # Trigram rows are written in the same transaction as the company
+    atomic_save = True
+
+    # ?fuzzy= name search (see libs/trigrams.py)
+    name_index = TrigramIndex('companies.CompanyNameTrigram', 'name')
+
     def __str__(self):
         return self.name
 
+    def after_save(self, adding, changes):
+        super().after_save(adding, changes)
+        if adding or 'name' in changes:
+            self.name_index.update(self)
+
+    class Meta:
+        verbose_name_plural = 'companies'
+
+
+class CompanyNameTrigram(AbstractTrigram):
+    """One trigram of a company's name, for Company.name_index"""
+
+    owner = models.ForeignKey(
+        Company,
+        on_delete=models.CASCADE,
+        related_name='name_trigrams'
+    )
+
+    def __str__(self):
+        return f"{self.trigram!r} of company #{self.owner_id}"
+
     class Meta:
-        verbose_name_plural = 'companies'
\ No newline at end of file
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'trigram'], name='unique_company_trigram'),
+        ]
+        indexes = [
+            models.Index(fields=['trigram', 'owner'], name='company_trigram_idx'),
+        ]
@@ -1,14 +1,16 @@
 from rest_framework import serializers
+from libs.representation_cache import CachedListSerializer, CachedRepresentationMixin
 from .models import Company
 from users.serializers import UserReadSerializer
 
 
-class CompanyReadSerializer(serializers.ModelSerializer):
-    """Serializer for reading company data"""
+class CompanyReadSerializer(CachedRepresentationMixin, serializers.ModelSerializer):
+    """Serializer for reading company data (cached per updated_at)"""
     user = UserReadSerializer(read_only=True)
 
     class Meta:
         model = Company
+        list_serializer_class = CachedListSerializer
         fields = [
             'id', 'user', 'name', 'logo', 'industry',
             'description', 'website', 'location',
@@ -1,9 +1,14 @@
-from django.test import TestCase
+import json
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.test import AsyncRequestFactory, TestCase
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
+from libs.query_budget import query_budget
 from users.models import User, UserRole
 from .models import Company, Industry
+from .views import CompanyAsyncReadView, CompanyViewSet
 
 
 class CompanyModelTests(TestCase):
@@ -56,6 +61,17 @@ class CompanyModelTests(TestCase):
         # Should have deleted_by set
         self.assertEqual(Company.all_objects.first().deleted_by, self.user)
 
+    def test_rename_rolls_back_with_name_index(self):
+        """Test a failed trigram update leaves the old name and its index"""
+        company = Company.objects.create(user=self.user, name='TechCorp', location='Riyadh')
+        company.name = 'Najm Logistics'
+        with mock.patch.object(Company.name_index, 'update', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                company.save()
+        company.refresh_from_db()
+        self.assertEqual(company.name, 'TechCorp')
+        self.assertEqual(list(Company.name_index.search(Company.objects.all(), 'Tek Corp')), [company])
+
 
 class CompanyAPITests(APITestCase):
     """Tests for Company API endpoints"""
@@ -101,6 +117,19 @@ class CompanyAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['name'], 'TechCorp')
 
+    def test_list_within_query_budget(self):
+        """Test the company list loads owners without a query per company"""
+        for index in range(4):
+            owner = User.objects.create_user(
+                phone=f'051000000{index}',
+                password='testpass123',
+                role=UserRole.COMPANY
+            )
+            Company.objects.create(user=owner, name=f'Company {index}', location='Riyadh')
+        with query_budget.for_view(CompanyViewSet, 'list'):
+            response = self.client.get(reverse('company-list'))
+        self.assertEqual(len(response.data['results']), 5)
+
     def test_create_company_authenticated(self):
         """Test creating a company when authenticated"""
         new_user = User.objects.create_user(
@@ -188,3 +217,56 @@ class CompanyAPITests(APITestCase):
         response = self.client.get(url, {'location': 'Riyadh'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
+
+    def test_fuzzy_name_filter(self):
+        """Test ?fuzzy= finds misspelt and renamed company names"""
+        url = reverse('company-list')
+        response = self.client.get(url, {'fuzzy': 'Tek Corp'})
+        self.assertEqual([company['name'] for company in response.data['results']], ['TechCorp'])
+
+        self.company.name = 'Najm Logistics'
+        self.company.save()
+        response = self.client.get(url, {'fuzzy': 'Tek Corp'})
+        self.assertEqual(len(response.data['results']), 0)
+        response = self.client.get(url, {'fuzzy': 'najim logistic'})
+        self.assertEqual(len(response.data['results']), 1)
+
+
+class CompanyAsyncReadTests(TestCase):
+    """Tests for the async list/retrieve views served under ASGI"""
+
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        for index in range(3):
+            user = User.objects.create_user(
+                phone=f'050222222{index}',
+                password='testpass123',
+                role=UserRole.COMPANY
+            )
+            self.company = Company.objects.create(
+                user=user, name=f'Company {index}', industry=Industry.TECH, location='Riyadh'
+            )
+
+    async def test_list_and_retrieve_match_sync_views(self):
+        """Test async responses equal the CompanyViewSet ones"""
+        list_view = CompanyAsyncReadView.as_view(action='list')
+        detail_view = CompanyAsyncReadView.as_view(action='retrieve')
+        url = reverse('company-list')
+        expected = await sync_to_async(self.client.get)(url, {'search': 'Company'})
+        response = await list_view(self.factory.get(url, {'search': 'Company'}))
+        self.assertEqual(json.loads(response.content), expected.json())
+
+        url = reverse('company-detail', kwargs={'pk': self.company.pk})
+        expected = await sync_to_async(self.client.get)(url)
+        response = await detail_view(self.factory.get(url), pk=self.company.pk)
+        self.assertEqual(json.loads(response.content), expected.json())
+        self.assertEqual(json.loads(response.content)['user']['phone'], '0502222222')
+
+    async def test_fuzzy_list_matches_sync_view(self):
+        """Test the async list runs the ?fuzzy= filter without sync queries"""
+        list_view = CompanyAsyncReadView.as_view(action='list')
+        url = reverse('company-list')
+        expected = await sync_to_async(self.client.get)(url, {'fuzzy': 'Compny 1'})
+        response = await list_view(self.factory.get(url, {'fuzzy': 'Compny 1'}))
+        self.assertEqual(json.loads(response.content), expected.json())
+        self.assertEqual(expected.json()['results'][0]['name'], 'Company 1')
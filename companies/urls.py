@@ -1,11 +1,19 @@
 # companies/urls.py
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CompanyViewSet
+from .views import CompanyViewSet, CompanyAsyncReadView
 
 router = DefaultRouter()
 router.register('', CompanyViewSet, basename='company')
 
 urlpatterns = [
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
+
+# Under ASGI, GET list/retrieve take the async read path
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = [
+        path('', CompanyAsyncReadView.as_view(action='list')),
+        path('<int:pk>/', CompanyAsyncReadView.as_view(action='retrieve')),
+    ] + urlpatterns
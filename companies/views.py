@@ -1,12 +1,14 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from libs.async_views import AsyncReadView
+from libs.db_router import ReplicaReadMixin
 from .models import Company
 from .serializers import CompanyReadSerializer, CompanyWriteSerializer
 from .filters import CompanyFilter
 
 
-class CompanyViewSet(viewsets.ModelViewSet):
+class CompanyViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for Company CRUD operations.
 
@@ -17,7 +19,12 @@ class CompanyViewSet(viewsets.ModelViewSet):
     delete: DELETE /api/companies/{id}/ - Soft delete company
     me:     GET /api/companies/me/      - Get current user's company
     """
-    queryset = Company.objects.all()
+    queryset = Company.objects.select_related('user')
+    # Rate limited per user / IP, see RATE_LIMITS
+    throttle_scope = 'public_read'
+    # Max queries per action, checked by tests and QueryBudgetMiddleware.
+    # Includes a JWT caller's user lookup
+    query_budgets = {'list': 3, 'retrieve': 2}
     filterset_class = CompanyFilter
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'created_at']
@@ -47,4 +54,12 @@ class CompanyViewSet(viewsets.ModelViewSet):
 
     def perform_destroy(self, instance):
         """Soft delete instead of hard delete"""
-        instance.soft_delete(user=self.request.user)
\ No newline at end of file
+        instance.soft_delete(user=self.request.user)
+
+
+class CompanyAsyncReadView(AsyncReadView):
+    """
+    Async list/retrieve for the ASGI app (see libs/async_views.py).
+    Other methods are served by CompanyViewSet.
+    """
+    viewset_class = CompanyViewSet
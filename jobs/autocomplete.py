@@ -0,0 +1,196 @@
+# jobs/autocomplete.py
+"""
+Autocomplete for job titles, skills, locations and company names.
+
+Each field is a PrefixIndex (libs/prefix_index.py) held by the worker
+process and ranked by how many public jobs use a term (company names:
+how many public jobs the company has). The index is built on first use
+and then kept current without rescanning:
+
+- jobs: the JobChange outbox is read after the last seen id, so saves,
+  set-based soft delete/restore and writes from other processes are all
+  picked up. Only the changed jobs are re-applied.
+- companies: rows with updated_at since the last sync are re-read.
+
+Syncs run at most every SYNC_INTERVAL seconds, before answering a query;
+every other query is served from memory. A full rebuild every
+REBUILD_INTERVAL seconds drops anything missed (e.g. a set-based company
+soft delete, which does not touch updated_at). It runs in the background
+while the current index keeps answering (libs/live_index.py), and loads
+each PrefixIndex in one sort.
+
+    AUTOCOMPLETE = {
+        'SYNC_INTERVAL': 1.0,
+        'REBUILD_INTERVAL': 3600,
+    }
+"""
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Max
+
+from companies.models import Company
+from libs.live_index import LiveIndex
+from libs.prefix_index import PrefixIndex
+
+from .models import Job, JobChange
+
+DEFAULTS = {
+    'SYNC_INTERVAL': 1.0,
+    'REBUILD_INTERVAL': 3600,
+}
+
+FIELDS = ('title', 'skill', 'location', 'company')
+
+# Outbox rows read per query while catching up
+SYNC_BATCH = 1000
+
+
+def autocomplete_settings():
+    return {**DEFAULTS, **getattr(settings, 'AUTOCOMPLETE', {})}
+
+
+def job_terms(title, location, skills):
+    """[(field, term)] a public job counts once each"""
+    # A skill listed twice counts once per job
+    skills = {skill.casefold(): skill for skill in skills}.values()
+    return [('title', title), ('location', location)] + [('skill', skill) for skill in skills]
+
+
+class JobAutocomplete:
+    """Prefix indexes over the public jobs and the companies"""
+
+    def __init__(self):
+        self.indexes = {field: PrefixIndex() for field in FIELDS}
+        self.jobs = {}                 # job id -> (company_id, title, location, skills)
+        self.companies = {}            # company id -> name, live companies only
+        self.company_jobs = Counter()  # company id -> public jobs in the index
+        self.cursor = 0                # last JobChange id applied
+        self.companies_seen = None     # latest Company.updated_at applied
+        self.built_at = self.synced_at = time.monotonic()
+
+    @classmethod
+    def build(cls):
+        index = cls()
+        # Read the cursors first: changes racing the load are applied again
+        index.cursor = JobChange.objects.aggregate(last=Max('id'))['last'] or 0
+        index.companies_seen = Company.all_objects.aggregate(last=Max('updated_at'))['last']
+        terms = {field: Counter() for field in FIELDS}
+        # Oldest first: the first spelling seen of a term is kept
+        for job_id, company_id, title, location, skills in (
+            Job.objects.filter(is_active=True).order_by('id').values_list(
+                'id', 'company_id', 'title', 'location', 'required_skills'
+            ).iterator(chunk_size=2000)
+        ):
+            values = index.jobs[job_id] = (company_id, title, location, tuple(skills or ()))
+            for field, term in job_terms(*values[1:]):
+                terms[field][term] += 1
+            index.company_jobs[company_id] += 1
+        for company_id, name in Company.objects.values_list('id', 'name'):
+            index.companies[company_id] = name
+            # Weight 1 keeps companies without public jobs searchable
+            terms['company'][name] += 1 + index.company_jobs[company_id]
+        for field in FIELDS:
+            index.indexes[field].add_many(terms[field])
+        return index
+
+    def sync(self):
+        self.sync_jobs()
+        self.sync_companies()
+        self.synced_at = time.monotonic()
+
+    def sync_jobs(self):
+        while True:
+            changes = list(
+                JobChange.objects.filter(id__gt=self.cursor).order_by('id')
+                .values_list('id', 'job_id', 'payload')[:SYNC_BATCH]
+            )
+            if not changes:
+                return
+            latest = {job_id: payload for _, job_id, payload in changes}
+            # No payload: not public when written, or a set-based
+            # delete/restore. The job's current row decides.
+            lookup = [job_id for job_id, payload in latest.items() if payload is None]
+            public = {}
+            if lookup:
+                public = {
+                    job_id: values for job_id, *values in
+                    Job.objects.filter(pk__in=lookup, is_active=True).values_list(
+                        'id', 'company_id', 'title', 'location', 'required_skills'
+                    )
+                }
+            for job_id, payload in latest.items():
+                if payload is not None:
+                    self.set_job(job_id, (
+                        payload['company_id'], payload['title'],
+                        payload['location'], payload['required_skills'],
+                    ))
+                else:
+                    self.set_job(job_id, public.get(job_id))
+            self.cursor = changes[-1][0]
+            if len(changes) < SYNC_BATCH:
+                return
+
+    def sync_companies(self):
+        companies = Company.all_objects.order_by('updated_at')
+        if self.companies_seen is not None:
+            # >=: another row may share the last timestamp
+            companies = companies.filter(updated_at__gte=self.companies_seen)
+        for company_id, name, deleted_at, updated_at in companies.values_list(
+            'id', 'name', 'deleted_at', 'updated_at'
+        ):
+            self.set_company(company_id, name if deleted_at is None else None)
+            self.companies_seen = updated_at
+
+    def set_job(self, job_id, values):
+        """Replace the job's terms with `values`, or remove them (None)"""
+        old = self.jobs.pop(job_id, None)
+        if old is not None:
+            self._count_job(*old, delta=-1)
+        if values is not None:
+            company_id, title, location, skills = values
+            values = (company_id, title, location, tuple(skills or ()))
+            self.jobs[job_id] = values
+            self._count_job(*values, delta=1)
+
+    def _count_job(self, company_id, title, location, skills, delta):
+        update = PrefixIndex.add if delta > 0 else PrefixIndex.discard
+        for field, term in job_terms(title, location, skills):
+            update(self.indexes[field], term)
+        self.company_jobs[company_id] += delta
+        if company_id in self.companies:
+            update(self.indexes['company'], self.companies[company_id])
+
+    def set_company(self, company_id, name):
+        """Rename the company, or remove it (None)"""
+        old = self.companies.get(company_id)
+        if old == name:
+            return
+        # Weight 1 keeps companies without public jobs searchable
+        weight = 1 + self.company_jobs[company_id]
+        if old is not None:
+            self.indexes['company'].discard(old, weight)
+            del self.companies[company_id]
+        if name is not None:
+            self.indexes['company'].add(name, weight)
+            self.companies[company_id] = name
+
+    def complete(self, field, prefix, limit):
+        results = self.indexes[field].complete(prefix, limit)
+        if field == 'company':
+            return [(name, weight - 1) for name, weight in results]
+        return results
+
+
+_live = LiveIndex(JobAutocomplete, autocomplete_settings)
+
+
+def complete(field, prefix, limit=10):
+    """[(term, public jobs)] for `field`, most used first"""
+    return _live.read(lambda index: index.complete(field, prefix, limit))
+
+
+def reset():
+    """Drop the index; the next query rebuilds it"""
+    _live.reset()
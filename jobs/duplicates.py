@@ -0,0 +1,150 @@
+# jobs/duplicates.py
+"""
+Near-duplicate job postings, found with MinHash/LSH (libs/minhash.py).
+
+Every job's description + requirements get a MinHash signature when the
+job is created or that text changes; its BANDS band keys are stored in
+JobBand. A new posting's duplicates are then one indexed lookup
+(`key IN (its keys)`) whatever the size of the table, followed by an
+exact Jaccard check of the few candidates found.
+
+JobWriteSerializer checks the company's own live jobs (active or not):
+
+    JOB_DUPLICATES = {
+        'ON_WRITE': 'warn',   # 'warn': list them in the response,
+                              # 'reject': 409, 'off': no check
+        'THRESHOLD': 0.8,     # Jaccard similarity of word shingles
+    }
+
+`python manage.py find_duplicate_jobs` clusters the duplicates already
+in the table (and indexes jobs inserted in bulk, e.g. by seed_data).
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from libs import minhash
+
+from .models import Job, JobBand
+
+DEFAULTS = {
+    'ON_WRITE': 'warn',
+    'THRESHOLD': 0.8,
+}
+
+# Candidates checked per lookup; more means a heavily reposted text
+MAX_CANDIDATES = 50
+
+
+def duplicate_settings():
+    return {**DEFAULTS, **getattr(settings, 'JOB_DUPLICATES', {})}
+
+
+def job_text(description, requirements):
+    return f'{description or ""}\n{requirements or ""}'
+
+
+@lru_cache(maxsize=256)
+def text_keys(text):
+    """Band keys of `text` (cached: the serializer and the save both need them)"""
+    shingles = minhash.shingles(text)
+    if not shingles:
+        return ()
+    return tuple(minhash.band_keys(minhash.signature(shingles)))
+
+
+def index_jobs(jobs):
+    """(Re)write the band keys of `jobs`"""
+    with transaction.atomic():
+        JobBand.objects.filter(job__in=[job.pk for job in jobs]).delete()
+        JobBand.objects.bulk_create([
+            JobBand(job_id=job.pk, key=key)
+            for job in jobs
+            for key in text_keys(job_text(job.description, job.requirements))
+        ], batch_size=1000)
+
+
+def find_duplicates(description, requirements, company_id=None, exclude=None, threshold=None):
+    """[(job id, similarity)] of live jobs near-duplicating the text, most similar first"""
+    if threshold is None:
+        threshold = duplicate_settings()['THRESHOLD']
+    text = job_text(description, requirements)
+    keys = text_keys(text)
+    if not keys:
+        return []
+    candidates = Job.objects.filter(
+        pk__in=JobBand.objects.filter(key__in=keys).values('job_id')
+    )
+    if company_id is not None:
+        candidates = candidates.filter(company_id=company_id)
+    if exclude is not None:
+        candidates = candidates.exclude(pk=exclude)
+    shingles = minhash.shingles(text)
+    found = []
+    for pk, other_description, other_requirements in candidates.order_by('-id').values_list(
+        'id', 'description', 'requirements'
+    )[:MAX_CANDIDATES]:
+        similarity = minhash.jaccard(
+            shingles, minhash.shingles(job_text(other_description, other_requirements))
+        )
+        if similarity >= threshold:
+            found.append((pk, similarity))
+    return sorted(found, key=lambda item: -item[1])
+
+
+def index_missing(batch_size=1000):
+    """Index live jobs without band keys (bulk inserts skip after_save), return how many"""
+    indexed = last = 0
+    while True:
+        # By id: jobs without text get no keys and stay unindexed
+        jobs = list(
+            Job.objects.filter(bands__isnull=True, id__gt=last)
+            .only('id', 'description', 'requirements').order_by('id')[:batch_size]
+        )
+        if not jobs:
+            return indexed
+        index_jobs(jobs)
+        indexed += len(jobs)
+        last = jobs[-1].pk
+
+
+def clusters(threshold=None):
+    """Groups (sets of ids) of live jobs that near-duplicate each other, largest first"""
+    if threshold is None:
+        threshold = duplicate_settings()['THRESHOLD']
+    live = JobBand.objects.filter(job__deleted_at__isnull=True)
+    shared = live.values('key').annotate(jobs=Count('id')).filter(jobs__gt=1).values('key')
+    buckets = {}
+    for key, job_id in live.filter(key__in=shared).values_list('key', 'job_id').iterator():
+        buckets.setdefault(key, []).append(job_id)
+
+    texts = {}
+    ids = sorted({job_id for members in buckets.values() for job_id in members})
+    for start in range(0, len(ids), 1000):
+        for pk, description, requirements in Job.objects.filter(
+            pk__in=ids[start:start + 1000]
+        ).values_list('id', 'description', 'requirements'):
+            texts[pk] = minhash.shingles(job_text(description, requirements))
+
+    # Union-find; each bucket is checked against its first member only
+    parent = {}
+
+    def find(job_id):
+        parent.setdefault(job_id, job_id)
+        while parent[job_id] != job_id:
+            parent[job_id] = parent[parent[job_id]]
+            job_id = parent[job_id]
+        return job_id
+
+    for members in buckets.values():
+        first = members[0]
+        for other in members[1:]:
+            if find(first) != find(other) and minhash.jaccard(texts[first], texts[other]) >= threshold:
+                parent[find(other)] = find(first)
+
+    groups = {}
+    for job_id in parent:
+        groups.setdefault(find(job_id), set()).add(job_id)
+    return sorted((group for group in groups.values() if len(group) > 1), key=len, reverse=True)
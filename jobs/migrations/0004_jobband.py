@@ -0,0 +1,37 @@
+# Generated by Django 5.0.1 on 2026-10-19 00:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0003_jobchange"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobBand",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.BigIntegerField(db_index=True)),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="bands",
+                        to="jobs.job",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -1,6 +1,8 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from libs import audit
 from libs.base_models import BaseModel
-from libs.managers import SoftDeleteManager, AllObjectsManager
+from libs.managers import SoftDeleteManager, AllObjectsManager, ArchivedObjectsManager
 
 
 class EmploymentType(models.TextChoices):
@@ -11,11 +13,8 @@ class EmploymentType(models.TextChoices):
     INTERNSHIP = 'INTERNSHIP', 'Internship'
 
 
-class Job(BaseModel):
-    """
-    Job posting linked to a Company.
-    Inherits audit fields and soft delete from BaseModel.
-    """
+class AbstractJob(BaseModel):
+    """Job columns, shared by Job and its archive table"""
 
     company = models.ForeignKey(
         'companies.Company',
@@ -49,12 +48,197 @@ class Job(BaseModel):
     )
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        abstract = True
+
+
+class Job(AbstractJob):
+    """
+    Job posting linked to a Company.
+    Inherits audit fields and soft delete from BaseModel.
+    """
+
     # Managers
     objects = SoftDeleteManager()
     all_objects = AllObjectsManager()
+    archived_objects = ArchivedObjectsManager('jobs.ArchivedJob')
+
+    # Outbox row is written in the same transaction as the job
+    atomic_save = True
+
+    # Derived rows dropped, not archived, by archive_soft_deleted
+    archive_discard = ['recommendations', 'feed_skills', 'alerts', 'bands']
 
     def __str__(self):
         return f"{self.title} at {self.company.name}"
 
+    def after_save(self, adding, changes):
+        super().after_save(adding, changes)
+        change = JobChange.record(self, adding, changes)
+        # Imported here: candidates depends on jobs
+        from candidates.alerts import percolate_on_commit
+        from candidates.feed import JOB_FIELDS, refresh_jobs_on_commit
+        if adding or set(changes) & JOB_FIELDS:
+            refresh_jobs_on_commit([self.pk])
+        if change is not None and change.action in JobChange.PUBLISH_ACTIONS and self.is_public:
+            percolate_on_commit([self.pk])
+        if adding or {'description', 'requirements'} & set(changes):
+            # Imported here: jobs/duplicates.py imports this module
+            from .duplicates import index_jobs
+            index_jobs([self])
+
+    @classmethod
+    def rows_changed(cls, ids, action, user=None):
+        super().rows_changed(ids, action, user)
+        JobChange.record_rows(ids, action)
+        from candidates.alerts import percolate_on_commit
+        from candidates.feed import refresh_jobs_on_commit
+        refresh_jobs_on_commit(ids)
+        if JobChange.BULK_ACTIONS[action] in JobChange.PUBLISH_ACTIONS:
+            percolate_on_commit(ids)
+
+    @property
+    def is_public(self):
+        return self.is_active and self.deleted_at is None
+
+    class Meta:
+        ordering = ['-created_at']
+
+
+class ArchivedJob(AbstractJob):
+    """
+    Soft-deleted job moved out of jobs_job by archive_soft_deleted.
+    Keeps the original id and timestamps. Read via Job.archived_objects.
+    """
+
+    # No FK constraint: the company may be archived or gone as well
+    company = models.ForeignKey(
+        'companies.Company',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='archived_jobs'
+    )
+    # Copied from the live row, not reset on insert
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.title} (archived)"
+
+    class Meta:
+        ordering = ['-deleted_at']
+
+
+class JobBand(models.Model):
+    """
+    One LSH band key of a job's MinHash signature: jobs sharing a key are
+    near-duplicate candidates (see jobs/duplicates.py).
+    """
+
+    job = models.ForeignKey(
+        Job,
+        on_delete=models.CASCADE,
+        related_name='bands'
+    )
+    key = models.BigIntegerField(db_index=True)
+
+    def __str__(self):
+        return f"Band {self.key} of job #{self.job_id}"
+
+
+class JobChangeAction(models.TextChoices):
+    """Kinds of job change published in the changes feed"""
+    CREATED = 'CREATED', 'Created'
+    UPDATED = 'UPDATED', 'Updated'
+    ACTIVATED = 'ACTIVATED', 'Activated'
+    DEACTIVATED = 'DEACTIVATED', 'Deactivated'
+    DELETED = 'DELETED', 'Deleted'
+    RESTORED = 'RESTORED', 'Restored'
+
+
+class JobChange(models.Model):
+    """
+    Transactional outbox for jobs, read by GET /api/jobs/changes/.
+    The id is the feed cursor. Written by Job.save() and the set-based
+    soft delete/restore, in the same transaction as the job itself.
+    """
+
+    # Payload fields: public job data, only stored while the job is public
+    PAYLOAD_FIELDS = [
+        'company_id', 'title', 'employment_type', 'location',
+        'required_skills', 'salary_min', 'salary_max',
+    ]
+
+    BULK_ACTIONS = {
+        audit.SOFT_DELETE: JobChangeAction.DELETED,
+        audit.RESTORE: JobChangeAction.RESTORED,
+    }
+
+    # Actions that can make a job public (and alert saved searches)
+    PUBLISH_ACTIONS = {
+        JobChangeAction.CREATED,
+        JobChangeAction.ACTIVATED,
+        JobChangeAction.RESTORED,
+    }
+
+    # No FK constraint: archived jobs leave jobs_job, their history stays
+    job = models.ForeignKey(
+        Job,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='changes'
+    )
+    action = models.CharField(max_length=20, choices=JobChangeAction.choices)
+    payload = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.action} job #{self.job_id}"
+
+    @classmethod
+    def record(cls, job, adding, changes):
+        """Write the outbox row for one Job.save(), if anything changed"""
+        action = cls.action_for(adding, changes)
+        if action is None:
+            return None
+        payload = None
+        if job.is_public:
+            payload = {name: getattr(job, name) for name in cls.PAYLOAD_FIELDS}
+        return cls.objects.create(job=job, action=action, payload=payload)
+
+    @classmethod
+    def record_rows(cls, ids, action):
+        """Write the outbox rows of a set-based soft delete/restore of jobs `ids`"""
+        action = cls.BULK_ACTIONS[action]
+        payloads = {}
+        if action == JobChangeAction.RESTORED:
+            # Restored jobs that are public again, as record() would store them
+            payloads = {
+                row.pop('id'): row
+                for row in Job.objects.filter(pk__in=ids, is_active=True)
+                .values('id', *cls.PAYLOAD_FIELDS)
+            }
+        return cls.objects.bulk_create([
+            cls(job_id=pk, action=action, payload=payloads.get(pk))
+            for pk in ids
+        ])
+
+    @staticmethod
+    def action_for(adding, changes):
+        if adding:
+            return JobChangeAction.CREATED
+        if 'deleted_at' in changes:
+            if changes['deleted_at'][1] is None:
+                return JobChangeAction.RESTORED
+            return JobChangeAction.DELETED
+        if 'is_active' in changes:
+            if changes['is_active'][1]:
+                return JobChangeAction.ACTIVATED
+            return JobChangeAction.DEACTIVATED
+        if set(changes) - audit.IGNORED_FIELDS:
+            return JobChangeAction.UPDATED
+        return None
+
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['id']
@@ -1,14 +1,18 @@
-from rest_framework import serializers
-from .models import Job
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+from libs.representation_cache import CachedListSerializer, CachedRepresentationMixin
+from . import duplicates
+from .models import Job, JobChange
 from companies.serializers import CompanyReadSerializer
 
 
-class JobReadSerializer(serializers.ModelSerializer):
-    """Serializer for reading job data"""
+class JobReadSerializer(CachedRepresentationMixin, serializers.ModelSerializer):
+    """Serializer for reading job data (cached per updated_at)"""
     company = CompanyReadSerializer(read_only=True)
 
     class Meta:
         model = Job
+        list_serializer_class = CachedListSerializer
         fields = [
             'id', 'company', 'title', 'description',
             'requirements', 'required_skills', 'employment_type',
@@ -31,8 +35,24 @@ class JobListSerializer(serializers.ModelSerializer):
         ]
 
 
+class DuplicateJob(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'This job duplicates one of your existing jobs.'
+    default_code = 'duplicate_job'
+
+    def __init__(self, duplicates):
+        super().__init__({
+            'detail': self.default_detail,
+            'duplicates': [{'id': pk, 'similarity': round(similarity, 3)} for pk, similarity in duplicates],
+        })
+
+
 class JobWriteSerializer(serializers.ModelSerializer):
-    """Serializer for creating/updating jobs"""
+    """
+    Serializer for creating/updating jobs.
+    Near-duplicates of the company's jobs are listed in `duplicates` or
+    rejected with 409, per JOB_DUPLICATES['ON_WRITE'] (see jobs/duplicates.py).
+    """
 
     class Meta:
         model = Job
@@ -42,6 +62,36 @@ class JobWriteSerializer(serializers.ModelSerializer):
             'salary_min', 'salary_max', 'is_active'
         ]
 
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        mode = duplicates.duplicate_settings()['ON_WRITE']
+        self.duplicates = []
+        if mode == 'off' or not {'description', 'requirements'} & set(attrs):
+            return attrs
+        instance = self.instance
+        if instance is not None:
+            company_id = instance.company_id
+        else:
+            company = getattr(self.context['request'].user, 'company', None)
+            company_id = company.pk if company is not None else None
+        self.duplicates = duplicates.find_duplicates(
+            attrs.get('description', getattr(instance, 'description', '')),
+            attrs.get('requirements', getattr(instance, 'requirements', '')),
+            company_id=company_id,
+            exclude=instance.pk if instance is not None else None,
+        )
+        if self.duplicates and mode == 'reject':
+            raise DuplicateJob(self.duplicates)
+        return attrs
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if getattr(self, 'duplicates', None):
+            data['duplicates'] = [
+                {'id': pk, 'similarity': round(similarity, 3)} for pk, similarity in self.duplicates
+            ]
+        return data
+
     def create(self, validated_data):
         user = self.context['request'].user
         # Get the user's company
@@ -51,4 +101,15 @@ class JobWriteSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         validated_data['updated_by'] = self.context['request'].user
-        return super().update(instance, validated_data)
\ No newline at end of file
+        return super().update(instance, validated_data)
+
+
+class JobChangeSerializer(serializers.ModelSerializer):
+    """Serializer for entries of the jobs changes feed"""
+    cursor = serializers.IntegerField(source='id', read_only=True)
+    job = serializers.JSONField(source='payload', read_only=True)
+
+    class Meta:
+        model = JobChange
+        fields = ['cursor', 'job_id', 'action', 'job', 'created_at']
+        read_only_fields = fields
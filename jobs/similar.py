@@ -0,0 +1,226 @@
+# jobs/similar.py
+"""
+"Similar jobs": nearest neighbours in a TF-IDF model of the public jobs.
+
+Each public job is a sparse TF-IDF vector over the words of its title,
+required_skills, requirements and description (title and skills count
+TITLE_WEIGHT times), cut to its MAX_TERMS strongest terms and
+L2-normalized. Similarity is the cosine (dot product). An inverted index
+(term -> jobs) means only jobs sharing a term are scored, and terms in
+more than MAX_DF of the jobs are ignored as stop words.
+
+Terms are numbered once per model and a vector is two arrays, sorted
+term ids and their float32 weights: about 600 bytes per job at
+MAX_TERMS, a quarter of a {term: weight} dict.
+
+The model lives in the worker process, like the autocomplete index
+(jobs/autocomplete.py): built on first use, then synced from the
+JobChange outbox at most every SYNC_INTERVAL seconds. A job's top
+neighbours are computed on the first request and cached. When a job is
+created, edited or leaves the catalog, only the cached lists it enters
+or leaves are dropped. IDF weights are fixed when the model is built;
+the full rebuild every REBUILD_INTERVAL seconds refreshes them. It runs
+in the background while the current model keeps answering, then is
+swapped in (libs/live_index.py).
+
+    SIMILAR_JOBS = {
+        'SYNC_INTERVAL': 1.0,
+        'REBUILD_INTERVAL': 3600,
+    }
+"""
+import heapq
+import math
+import re
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from operator import itemgetter
+
+from django.conf import settings
+from django.db.models import Max
+
+from libs.live_index import LiveIndex
+
+from .models import Job, JobChange
+
+DEFAULTS = {
+    'SYNC_INTERVAL': 1.0,
+    'REBUILD_INTERVAL': 3600,
+}
+
+# Neighbours kept per job (the most a request can ask for)
+TOP_K = 50
+MAX_TERMS = 50
+TITLE_WEIGHT = 3
+# Terms in a larger share of the jobs carry no signal
+MAX_DF = 0.5
+
+TEXT_FIELDS = ['id', 'title', 'required_skills', 'requirements', 'description']
+
+SYNC_BATCH = 1000
+
+STOP_WORDS = frozenset('''
+    a an and are as at be by for from has have in is it its of on or our
+    the to we will with you your
+'''.split())
+
+_WORD = re.compile(r'\w[\w+#]*')
+
+
+def similar_settings():
+    return {**DEFAULTS, **getattr(settings, 'SIMILAR_JOBS', {})}
+
+
+def words(text):
+    return [
+        word for word in _WORD.findall(text.casefold())
+        if len(word) > 1 and word not in STOP_WORDS and not word.isdigit()
+    ]
+
+
+def term_counts(title, required_skills, requirements, description):
+    """Weighted term frequencies of one job"""
+    counts = Counter(words(requirements or '') + words(description or ''))
+    for word in words(' '.join([title or '', *(required_skills or ())])):
+        counts[word] += TITLE_WEIGHT
+    return counts
+
+
+class SimilarJobs:
+    """TF-IDF vectors, inverted index and cached neighbours of the public jobs"""
+
+    def __init__(self, idf=None, documents=0):
+        self.idf = idf or {}
+        self.documents = documents
+        self.term_ids = {}                 # term -> id
+        self.vectors = {}                  # job id -> (array of term ids, array of weights)
+        self.postings = defaultdict(set)   # term id -> job ids
+        self.neighbours = {}               # job id -> [(job id, score)], best first
+        self.cited_by = defaultdict(set)   # job id -> jobs whose neighbours list it
+        self.cursor = 0
+        self.built_at = self.synced_at = time.monotonic()
+
+    @classmethod
+    def build(cls):
+        cursor = JobChange.objects.aggregate(last=Max('id'))['last'] or 0
+        counts = {
+            job_id: term_counts(*values) for job_id, *values in
+            Job.objects.filter(is_active=True).values_list(*TEXT_FIELDS).iterator(chunk_size=2000)
+        }
+        frequencies = Counter(term for terms in counts.values() for term in terms)
+        documents = len(counts)
+        # Smoothed IDF; None marks a stop word
+        idf = {
+            term: math.log((1 + documents) / (1 + df)) + 1 if df <= MAX_DF * documents else None
+            for term, df in frequencies.items()
+        }
+        model = cls(idf, documents)
+        model.cursor = cursor
+        for job_id, terms in counts.items():
+            model.add(job_id, terms)
+        return model
+
+    def vector(self, counts):
+        # Terms new since the build are as rare as can be
+        unseen = math.log(1 + self.documents) + 1
+        weights = {}
+        for term, count in counts.items():
+            idf = self.idf.get(term, unseen)
+            if idf is not None:
+                weights[term] = (1 + math.log(count)) * idf
+        weights = heapq.nlargest(MAX_TERMS, weights.items(), key=itemgetter(1))
+        norm = math.sqrt(sum(weight * weight for _, weight in weights)) or 1
+        term_ids = self.term_ids
+        weights = sorted(
+            (term_ids.setdefault(term, len(term_ids)), weight / norm) for term, weight in weights
+        )
+        return array('I', [term for term, _ in weights]), array('f', [weight for _, weight in weights])
+
+    def scores(self, vector, exclude=None):
+        """{job id: cosine} of every job sharing a term with `vector`"""
+        scores = defaultdict(float)
+        vectors = self.vectors
+        for term, weight in zip(*vector):
+            for job_id in self.postings.get(term, ()):
+                terms, weights = vectors[job_id]
+                scores[job_id] += weight * weights[bisect_left(terms, term)]
+        scores.pop(exclude, None)
+        return scores
+
+    def add(self, job_id, counts):
+        vector = self.vector(counts)
+        # Drop cached lists the new job would enter
+        if self.neighbours:
+            for other, score in self.scores(vector).items():
+                cached = self.neighbours.get(other)
+                if cached is not None and (len(cached) < TOP_K or score > cached[-1][1]):
+                    self.forget(other)
+        self.vectors[job_id] = vector
+        for term in vector[0]:
+            self.postings[term].add(job_id)
+
+    def remove(self, job_id):
+        vector = self.vectors.pop(job_id, None)
+        if vector is None:
+            return
+        for term in vector[0]:
+            self.postings[term].discard(job_id)
+            if not self.postings[term]:
+                del self.postings[term]
+        self.forget(job_id)
+        # Lists it was in get a free slot
+        for other in self.cited_by.pop(job_id, set()):
+            self.forget(other)
+
+    def forget(self, job_id):
+        """Drop the cached neighbours of `job_id`"""
+        for neighbour, _ in self.neighbours.pop(job_id, ()):
+            self.cited_by[neighbour].discard(job_id)
+
+    def similar(self, job_id, limit):
+        """[(job id, score)] most similar to `job_id`, None if it is not public"""
+        if job_id not in self.vectors:
+            return None
+        if job_id not in self.neighbours:
+            scores = self.scores(self.vectors[job_id], exclude=job_id)
+            best = heapq.nlargest(TOP_K, scores.items(), key=itemgetter(1))
+            self.neighbours[job_id] = best
+            for neighbour, _ in best:
+                self.cited_by[neighbour].add(job_id)
+        return self.neighbours[job_id][:limit]
+
+    def sync(self):
+        while True:
+            changes = list(
+                JobChange.objects.filter(id__gt=self.cursor).order_by('id')
+                .values_list('id', 'job_id')[:SYNC_BATCH]
+            )
+            if not changes:
+                break
+            ids = {job_id for _, job_id in changes}
+            public = {
+                job_id: term_counts(*values) for job_id, *values in
+                Job.objects.filter(pk__in=ids, is_active=True).values_list(*TEXT_FIELDS)
+            }
+            for job_id in ids:
+                self.remove(job_id)
+                if job_id in public:
+                    self.add(job_id, public[job_id])
+            self.cursor = changes[-1][0]
+            if len(changes) < SYNC_BATCH:
+                break
+        self.synced_at = time.monotonic()
+
+
+_live = LiveIndex(SimilarJobs, similar_settings)
+
+
+def similar(job_id, limit=10):
+    """[(job id, score)] of the public jobs most like `job_id`, None if it is not public"""
+    return _live.read(lambda model: model.similar(job_id, limit))
+
+
+def reset():
+    """Drop the model; the next request rebuilds it"""
+    _live.reset()
@@ -1,10 +1,43 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection, connections, transaction
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.asgi import ASGIHandler
+from django.http import HttpResponse
+from django.test import (
+    AsyncClient, AsyncRequestFactory, Client, RequestFactory, TestCase, override_settings
+)
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from rest_framework.test import APITestCase
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from libs import db_router
+from libs.live_index import LiveIndex
+from libs.load_shedding import LoadSheddingMiddleware
+from libs import minhash, representation_cache
+from libs.metrics import registry
+from libs.prefix_index import PrefixIndex
+from libs.query_budget import QueryBudgetExceeded, QueryBudgetMiddleware, query_budget
+from libs.sqlite_backend.base import DatabaseWrapper, write_lock
 from users.models import User, UserRole
+from users.serializers import UserReadSerializer
 from companies.models import Company, Industry
-from .models import Job, EmploymentType
+from . import autocomplete, similar
+from .models import Job, JobBand, JobChange, JobChangeAction, EmploymentType
+from .serializers import JobListSerializer, JobReadSerializer
+from .views import JobAsyncReadView, JobViewSet
 
 
 class JobModelTests(TestCase):
@@ -373,3 +406,1356 @@ class JobAPITests(APITestCase):
         response = self.client.get(url)
         # Company should see both active and inactive jobs
         self.assertEqual(len(response.data['results']), 2)
+
+
+class JobSoftCascadeTests(TestCase):
+    """Tests for set-based soft delete/restore and Company -> Job cascade"""
+
+    def setUp(self):
+        self.users = User.objects.bulk_create([
+            User(phone=f'05100000{i:02d}', role=UserRole.COMPANY)
+            for i in range(20)
+        ])
+        self.companies = Company.objects.bulk_create([
+            Company(user=user, name=f'Company {i}', location='Riyadh')
+            for i, user in enumerate(self.users)
+        ])
+        # 250 jobs per company, 5000 in total
+        Job.objects.bulk_create([
+            Job(
+                company=company,
+                title=f'Job {i}',
+                description='Description',
+                requirements='Requirements',
+                location='Riyadh'
+            )
+            for company in self.companies
+            for i in range(250)
+        ])
+
+    def updates(self, context):
+        """UPDATE statements captured (ignores savepoints)"""
+        return [q for q in context.captured_queries if q['sql'].startswith('UPDATE')]
+
+    def test_queryset_soft_delete_is_one_update(self):
+        """Test bulk soft delete runs a single UPDATE per model"""
+        with CaptureQueriesContext(connection) as queries:
+            count = Job.objects.filter(company=self.companies[0]).soft_delete(
+                user=self.users[0]
+            )
+        self.assertEqual(len(self.updates(queries)), 1)
+        self.assertEqual(count, 250)
+        self.assertEqual(Job.objects.count(), 4750)
+        self.assertEqual(
+            Job.all_objects.filter(deleted_by=self.users[0]).count(), 250
+        )
+
+    def test_queryset_restore(self):
+        """Test bulk restore brings back all rows in one UPDATE"""
+        Job.objects.all().soft_delete()
+        with CaptureQueriesContext(connection) as queries:
+            count = Job.all_objects.all().restore()
+        self.assertEqual(len(self.updates(queries)), 1)
+        self.assertEqual(count, 5000)
+        self.assertEqual(Job.objects.count(), 5000)
+
+    def test_soft_delete_companies_cascades_to_jobs(self):
+        """Test soft-deleting companies soft-deletes their jobs"""
+        doomed = Company.objects.filter(pk__in=[c.pk for c in self.companies[:10]])
+        with CaptureQueriesContext(connection) as queries:
+            count = doomed.soft_delete(user=self.users[0])
+        # One UPDATE for jobs, one for companies
+        self.assertEqual(len(self.updates(queries)), 2)
+        self.assertEqual(count, 10)
+        self.assertEqual(Company.objects.count(), 10)
+        self.assertEqual(Job.objects.count(), 2500)
+        self.assertFalse(Job.objects.filter(company__deleted_at__isnull=False).exists())
+
+    def test_restore_companies_restores_only_cascaded_jobs(self):
+        """Test restore skips jobs that were deleted on their own earlier"""
+        company = self.companies[0]
+        Job.objects.filter(company=company, title='Job 0').soft_delete()
+        Company.objects.filter(pk=company.pk).soft_delete()
+        self.assertEqual(Job.objects.filter(company=company).count(), 0)
+
+        Company.all_objects.filter(pk=company.pk).restore()
+        self.assertEqual(Job.objects.filter(company=company).count(), 249)
+        self.assertTrue(
+            Job.all_objects.get(company=company, title='Job 0').deleted_at
+        )
+
+    def test_instance_soft_delete_cascades(self):
+        """Test Company.soft_delete() cascades and restore() reverts it"""
+        company = self.companies[0]
+        company.soft_delete(user=self.users[0])
+        self.assertEqual(Job.objects.filter(company=company).count(), 0)
+
+        company.restore()
+        self.assertEqual(Job.objects.filter(company=company).count(), 250)
+        self.assertIsNone(company.deleted_at)
+
+    def test_soft_delete_on_manager(self):
+        """Test soft_delete/restore are available on the managers"""
+        with CaptureQueriesContext(connection) as queries:
+            count = Company.objects.soft_delete(user=self.users[0])
+        self.assertEqual(len(self.updates(queries)), 2)
+        self.assertEqual(count, 20)
+        self.assertEqual(Job.objects.count(), 0)
+
+        self.assertEqual(Company.all_objects.restore(), 20)
+        self.assertEqual(Job.objects.count(), 5000)
+
+
+class JobArchiveTests(TestCase):
+    """Tests for the archive_soft_deleted command on jobs"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            phone='0502222222',
+            password='testpass123',
+            role=UserRole.COMPANY
+        )
+        self.company = Company.objects.create(
+            user=self.user,
+            name='TechCorp',
+            location='Riyadh'
+        )
+        Job.objects.bulk_create([
+            Job(
+                company=self.company,
+                title=f'Job {i}',
+                description='Description',
+                requirements='Requirements',
+                location='Riyadh'
+            )
+            for i in range(30)
+        ])
+        self.old = timezone.now() - timedelta(days=200)
+        self.recent = timezone.now() - timedelta(days=5)
+
+    def archive(self, **options):
+        call_command('archive_soft_deleted', stdout=StringIO(), **options)
+
+    def test_archives_only_rows_past_retention(self):
+        """Test old soft-deleted jobs move to the archive table"""
+        ids = list(Job.objects.order_by('pk').values_list('pk', flat=True))
+        Job.objects.filter(pk__in=ids[:10]).update(deleted_at=self.old)
+        Job.objects.filter(pk__in=ids[10:15]).update(deleted_at=self.recent)
+
+        self.archive(days=90, batch_size=3, model=['jobs.Job'])
+
+        self.assertEqual(Job.all_objects.count(), 20)
+        self.assertEqual(Job.objects.count(), 15)
+        self.assertEqual(Job.archived_objects.count(), 10)
+        self.assertEqual(
+            set(Job.archived_objects.values_list('pk', flat=True)), set(ids[:10])
+        )
+
+    def test_archived_row_keeps_original_data(self):
+        """Test archived rows keep id, timestamps and audit fields"""
+        job = Job.objects.first()
+        Job.objects.filter(pk=job.pk).update(deleted_at=self.old, deleted_by=self.user)
+
+        self.archive()
+
+        archived = Job.archived_objects.get(pk=job.pk)
+        self.assertEqual(archived.title, job.title)
+        self.assertEqual(archived.company, self.company)
+        self.assertEqual(archived.created_at, job.created_at)
+        self.assertEqual(archived.deleted_by, self.user)
+        self.assertIsNotNone(archived.archived_at)
+
+    def test_rerun_is_a_no_op(self):
+        """Test the command is resumable: a second run moves nothing"""
+        Job.objects.all().update(deleted_at=self.old)
+        self.archive()
+        self.archive()
+        self.assertEqual(Job.all_objects.count(), 0)
+        self.assertEqual(Job.archived_objects.count(), 30)
+
+    def test_derived_rows_are_dropped(self):
+        """Test rows listed in archive_discard go with the job"""
+        job = Job.objects.first()
+        JobBand.objects.create(job=job, key=42)
+        Job.objects.filter(pk=job.pk).update(deleted_at=self.old)
+
+        self.archive()
+
+        self.assertTrue(Job.archived_objects.filter(pk=job.pk).exists())
+        self.assertFalse(JobBand.objects.exists())
+
+    def test_conflict_fails_the_batch(self):
+        """Test a row already in the archive is an error, not skipped"""
+        job = Job.objects.first()
+        Job.objects.filter(pk=job.pk).update(deleted_at=self.old)
+        self.archive()
+        Job.archived_objects.update(title='Archived earlier')
+        Job.objects.bulk_create([Job(
+            pk=job.pk, company=self.company, title='Again', description='Description',
+            requirements='Requirements', location='Riyadh', deleted_at=self.old
+        )])
+
+        with self.assertRaises(CommandError):
+            self.archive()
+        self.assertTrue(Job.all_objects.filter(pk=job.pk).exists())
+        self.assertEqual(Job.archived_objects.get(pk=job.pk).title, 'Archived earlier')
+
+    def test_dry_run_moves_nothing(self):
+        """Test --dry-run only reports"""
+        Job.objects.all().update(deleted_at=self.old)
+        self.archive(dry_run=True)
+        self.assertEqual(Job.all_objects.count(), 30)
+        self.assertEqual(Job.archived_objects.count(), 0)
+
+
+class JobChangesFeedTests(APITestCase):
+    """Tests for the jobs outbox and /api/jobs/changes/ feed"""
+
+    def setUp(self):
+        self.company_user = User.objects.create_user(
+            phone='0502222222',
+            password='testpass123',
+            role=UserRole.COMPANY
+        )
+        self.company = Company.objects.create(
+            user=self.company_user,
+            name='TechCorp',
+            location='Riyadh',
+            created_by=self.company_user
+        )
+        self.job = Job.objects.create(
+            company=self.company,
+            title='Software Engineer',
+            description='Description',
+            requirements='Requirements',
+            location='Riyadh',
+            salary_min=15000,
+            created_by=self.company_user
+        )
+        self.url = reverse('job-changes')
+
+    def actions(self):
+        return list(JobChange.objects.values_list('action', flat=True))
+
+    def test_create_writes_outbox_row(self):
+        """Test creating a job writes a CREATED change with public data"""
+        change = JobChange.objects.get()
+        self.assertEqual(change.action, JobChangeAction.CREATED)
+        self.assertEqual(change.job, self.job)
+        self.assertEqual(change.payload['title'], 'Software Engineer')
+
+    def test_lifecycle_actions(self):
+        """Test update, deactivate, activate and delete are all recorded"""
+        self.client.force_authenticate(user=self.company_user)
+        detail = reverse('job-detail', kwargs={'pk': self.job.pk})
+        self.client.patch(detail, {'title': 'Senior Engineer'})
+        self.client.post(reverse('job-deactivate', kwargs={'pk': self.job.pk}))
+        self.client.post(reverse('job-activate', kwargs={'pk': self.job.pk}))
+        self.client.delete(detail)
+        self.assertEqual(self.actions(), [
+            JobChangeAction.CREATED,
+            JobChangeAction.UPDATED,
+            JobChangeAction.DEACTIVATED,
+            JobChangeAction.ACTIVATED,
+            JobChangeAction.DELETED,
+        ])
+        # Non-public states carry no job data
+        deactivated = JobChange.objects.get(action=JobChangeAction.DEACTIVATED)
+        self.assertIsNone(deactivated.payload)
+
+    def test_company_cascade_records_deletes(self):
+        """Test jobs soft-deleted through their company appear in the feed"""
+        self.company.soft_delete(user=self.company_user)
+        self.assertEqual(self.actions()[-1], JobChangeAction.DELETED)
+
+    def test_company_cascade_restore_records_payload(self):
+        """Test jobs restored through their company are published with their data"""
+        inactive = Job.objects.create(
+            company=self.company, title='Closed', description='Description',
+            requirements='Requirements', location='Riyadh', is_active=False
+        )
+        self.company.soft_delete(user=self.company_user)
+        Company.all_objects.get(pk=self.company.pk).restore()
+        restored = {
+            change.job_id: change.payload
+            for change in JobChange.objects.filter(action=JobChangeAction.RESTORED)
+        }
+        self.assertEqual(restored[self.job.pk]['title'], 'Software Engineer')
+        self.assertEqual(restored[self.job.pk]['company_id'], self.company.pk)
+        self.assertEqual(restored[self.job.pk]['salary_min'], '15000.00')
+        self.assertIsNone(restored[inactive.pk])
+
+        response = self.client.get(self.url, {'since': 0})
+        [entry] = [
+            entry for entry in response.data['results']
+            if entry['action'] == JobChangeAction.RESTORED and entry['job_id'] == self.job.pk
+        ]
+        self.assertEqual(entry['job']['title'], 'Software Engineer')
+
+    def test_unchanged_save_writes_nothing(self):
+        """Test saving an unchanged job adds no outbox row"""
+        job = Job.objects.get(pk=self.job.pk)
+        job.save()
+        self.assertEqual(JobChange.objects.count(), 1)
+
+    def test_rolled_back_write_leaves_no_change(self):
+        """Test outbox rows share the job's transaction"""
+        job = Job.objects.get(pk=self.job.pk)
+        job.title = 'Rolled back'
+        try:
+            with transaction.atomic():
+                job.save()
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(JobChange.objects.count(), 1)
+
+    def test_feed_pages_with_cursor(self):
+        """Test consumers can page through the feed with next_cursor"""
+        for i in range(4):
+            Job.objects.create(
+                company=self.company, title=f'Job {i}', description='Description',
+                requirements='Requirements', location='Riyadh'
+            )
+        response = self.client.get(self.url, {'since': 0, 'limit': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertTrue(response.data['has_more'])
+
+        cursor = response.data['next_cursor']
+        response = self.client.get(self.url, {'since': cursor, 'limit': 3})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertFalse(response.data['has_more'])
+        cursors = [entry['cursor'] for entry in response.data['results']]
+        self.assertEqual(cursors, sorted(cursors))
+        self.assertTrue(all(c > cursor for c in cursors))
+
+        # Nothing new: cursor stays put
+        last = response.data['next_cursor']
+        response = self.client.get(self.url, {'since': last})
+        self.assertEqual(response.data['results'], [])
+        self.assertEqual(response.data['next_cursor'], last)
+
+    def test_feed_rejects_bad_cursor(self):
+        """Test invalid cursors return 400"""
+        response = self.client.get(self.url, {'since': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class JobDirtyFieldTests(TestCase):
+    """Tests for BaseModel writing only changed columns"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            phone='0502222222',
+            password='testpass123',
+            role=UserRole.COMPANY
+        )
+        self.company = Company.objects.create(
+            user=self.user,
+            name='TechCorp',
+            location='Riyadh'
+        )
+        self.job = Job.objects.create(
+            company=self.company,
+            title='Software Engineer',
+            description='A very long description ' * 100,
+            requirements='Requirements',
+            location='Riyadh'
+        )
+
+    def job_updates(self, context):
+        return [
+            q['sql'] for q in context.captured_queries
+            if q['sql'].startswith('UPDATE "jobs_job"')
+        ]
+
+    def test_update_writes_only_changed_columns(self):
+        """Test a one-field change does not rewrite description"""
+        job = Job.objects.get(pk=self.job.pk)
+        job.title = 'Senior Software Engineer'
+        with CaptureQueriesContext(connection) as queries:
+            job.save()
+        [sql] = self.job_updates(queries)
+        self.assertIn('"title"', sql)
+        self.assertIn('"updated_at"', sql)
+        self.assertIn('"updated_by_id"', sql)
+        self.assertNotIn('"description"', sql)
+        job.refresh_from_db()
+        self.assertEqual(job.title, 'Senior Software Engineer')
+
+    def test_unchanged_save_skips_write(self):
+        """Test saving an unchanged job runs no query at all"""
+        job = Job.objects.get(pk=self.job.pk)
+        with self.assertNumQueries(0):
+            job.save()
+
+    def test_updated_at_bumped_on_change(self):
+        """Test updated_at still moves forward on a tracked save"""
+        job = Job.objects.get(pk=self.job.pk)
+        before = job.updated_at
+        job.location = 'Jeddah'
+        job.save()
+        job.refresh_from_db()
+        self.assertGreater(job.updated_at, before)
+
+    def test_refresh_from_db_resets_snapshot(self):
+        """Test a value reverted after refresh is still written"""
+        job = Job.objects.get(pk=self.job.pk)
+        Job.objects.filter(pk=job.pk).update(title='Changed elsewhere')
+        job.refresh_from_db()
+        job.title = 'Software Engineer'
+        job.save()
+        self.assertEqual(Job.objects.get(pk=job.pk).title, 'Software Engineer')
+
+    def test_unsaved_fields_stay_dirty_after_update_fields(self):
+        """Test fields left out of update_fields are written later"""
+        job = Job.objects.get(pk=self.job.pk)
+        job.title = 'New title'
+        job.is_active = False
+        job.save(update_fields=['is_active'])
+        job.save()
+        job.refresh_from_db()
+        self.assertEqual(job.title, 'New title')
+        self.assertFalse(job.is_active)
+
+    def test_patch_via_api_writes_only_changed_columns(self):
+        """Test a PATCH through JobWriteSerializer is a narrow UPDATE"""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        url = reverse('job-detail', kwargs={'pk': self.job.pk})
+        with CaptureQueriesContext(connection) as queries:
+            response = client.patch(url, {'title': 'Lead Engineer'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [sql] = self.job_updates(queries)
+        self.assertNotIn('"description"', sql)
+
+
+@mock.patch('libs.db_router.choose_replica', return_value='replica1')
+class JobReplicaRoutingTests(APITestCase):
+    """Tests for replica reads and read-your-writes pinning"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            phone='0502222222',
+            password='testpass123',
+            role=UserRole.COMPANY
+        )
+        self.company = Company.objects.create(
+            user=self.user,
+            name='TechCorp',
+            location='Riyadh'
+        )
+        self.job = Job.objects.create(
+            company=self.company,
+            title='Software Engineer',
+            description='Description',
+            requirements='Requirements',
+            location='Riyadh'
+        )
+
+    def read_aliases(self, method, url, data=None):
+        """Run one request, return the aliases the router was asked to read from"""
+        aliases = []
+
+        def db_for_read(router, model, **hints):
+            aliases.append(db_router.current_read_alias())
+            return None  # Tests only have the primary
+
+        with mock.patch.object(
+            db_router.PrimaryReplicaRouter, 'db_for_read', autospec=True,
+            side_effect=db_for_read
+        ):
+            response = getattr(self.client, method)(url, data)
+        self.assertLess(response.status_code, 400)
+        return set(aliases)
+
+    def test_router_sends_writes_to_primary(self, _choose):
+        """Test writes go to default even inside read_from()"""
+        router = db_router.PrimaryReplicaRouter()
+        with db_router.read_from('replica1'):
+            self.assertEqual(router.db_for_read(Job), 'replica1')
+            self.assertEqual(router.db_for_write(Job), 'default')
+        self.assertIsNone(router.db_for_read(Job))
+
+    def test_list_and_retrieve_read_from_replica(self, _choose):
+        """Test public reads are served by a replica"""
+        self.assertEqual(self.read_aliases('get', reverse('job-list')), {'replica1'})
+        url = reverse('job-detail', kwargs={'pk': self.job.pk})
+        self.assertEqual(self.read_aliases('get', url), {'replica1'})
+
+    def test_other_actions_read_from_primary(self, _choose):
+        """Test reads made while writing stay on the primary"""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('job-deactivate', kwargs={'pk': self.job.pk})
+        self.assertEqual(self.read_aliases('post', url), {'default'})
+        self.assertEqual(db_router.current_read_alias(), 'default')
+
+    def test_writer_is_pinned_to_primary(self, _choose):
+        """Test a company reads its own writes from the primary"""
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.read_aliases('get', reverse('job-list')), {'replica1'})
+        self.client.post(reverse('job-list'), {
+            'title': 'Backend Developer',
+            'description': 'Description',
+            'requirements': 'Requirements',
+            'location': 'Jeddah',
+        }, format='json')
+        self.assertTrue(db_router.is_pinned(self.user))
+        self.assertEqual(self.read_aliases('get', reverse('job-list')), {'default'})
+
+    async def test_async_writer_is_pinned_to_primary(self, _choose):
+        """Test the pin is also set when the request ran under ASGI"""
+        url = reverse('job-deactivate', kwargs={'pk': self.job.pk})
+        response = await AsyncClient().post(
+            url, headers={'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(await sync_to_async(db_router.is_pinned)(self.user))
+
+    def test_pin_is_per_user(self, _choose):
+        """Test other users keep reading from replicas"""
+        db_router.pin_to_primary(self.user)
+        self.assertEqual(self.read_aliases('get', reverse('job-list')), {'replica1'})
+
+    @mock.patch('libs.db_router.cache')
+    def test_pin_expires(self, mock_cache, _choose):
+        """Test the pin uses REPLICA_STICKY_SECONDS as its timeout"""
+        with self.settings(REPLICA_STICKY_SECONDS=7):
+            db_router.pin_to_primary(self.user)
+        mock_cache.set.assert_called_once_with(
+            f'db-router:pinned:{self.user.pk}', True, 7
+        )
+
+
+class ProductionSQLiteTests(TestCase):
+    """Tests for the libs.sqlite_backend engine against a real file"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'prod.sqlite3')
+
+    def wrapper(self, **options):
+        settings_dict = {
+            **connections['default'].settings_dict,
+            'ENGINE': 'libs.sqlite_backend',
+            'NAME': self.path,
+            'OPTIONS': options,
+        }
+        wrapper = DatabaseWrapper(settings_dict, alias='sqlite_prod')
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        """Test every new connection gets the configured pragmas"""
+        db = self.wrapper(pragmas={
+            'journal_mode': 'WAL', 'synchronous': 'NORMAL',
+            'busy_timeout': 1234, 'temp_store': 'MEMORY',
+        })
+        self.assertEqual(self.pragma(db, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(db, 'synchronous'), 1)
+        self.assertEqual(self.pragma(db, 'busy_timeout'), 1234)
+        self.assertEqual(self.pragma(db, 'temp_store'), 2)
+        self.assertNotIn('pragmas', db.get_connection_params())
+
+    def test_serialized_writers_wait_for_each_other(self):
+        """Test a second write transaction starts only after the first commits"""
+        options = {'transaction_mode': 'IMMEDIATE', 'serialize_writes': True}
+        first = self.wrapper(**options)
+        first._start_transaction_under_autocommit()
+        self.assertTrue(write_lock(self.path).locked())
+
+        started = threading.Event()
+
+        def second_writer():
+            second = DatabaseWrapper(first.settings_dict, alias='sqlite_prod')
+            second._start_transaction_under_autocommit()
+            started.set()
+            second._rollback()
+            second.close()
+
+        thread = threading.Thread(target=second_writer)
+        thread.start()
+        self.assertFalse(started.wait(0.2))
+        first._commit()
+        thread.join(5)
+        self.assertTrue(started.is_set())
+        self.assertFalse(write_lock(self.path).locked())
+
+    @mock.patch('libs.sqlite_backend.base.time.sleep')
+    def test_busy_begin_is_retried_with_backoff(self, sleep):
+        """Test BEGIN retries while another connection holds the write lock"""
+        holder = self.wrapper(transaction_mode='IMMEDIATE')
+        holder._start_transaction_under_autocommit()
+        waiter = self.wrapper(
+            transaction_mode='IMMEDIATE', pragmas={'busy_timeout': 0},
+            begin_retries=2, begin_backoff=0.01
+        )
+        with self.assertRaises(OperationalError):
+            waiter._start_transaction_under_autocommit()
+        self.assertEqual(sleep.call_count, 2)
+        holder._rollback()
+        waiter._start_transaction_under_autocommit()
+        waiter._rollback()
+
+
+class JobAsyncReadTests(TestCase):
+    """Tests for the async list/retrieve views served under ASGI"""
+
+    list_view = staticmethod(JobAsyncReadView.as_view(action='list'))
+    detail_view = staticmethod(JobAsyncReadView.as_view(action='retrieve'))
+
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        self.user = User.objects.create_user(
+            phone='0502222222',
+            password='testpass123',
+            role=UserRole.COMPANY
+        )
+        self.company = Company.objects.create(
+            user=self.user,
+            name='TechCorp',
+            location='Riyadh'
+        )
+        for index in range(3):
+            Job.objects.create(
+                company=self.company,
+                title=f'Engineer {index}',
+                description='Description',
+                requirements='Requirements',
+                required_skills=['Python'],
+                location='Riyadh' if index else 'Jeddah',
+                salary_min=10000 + index
+            )
+        self.inactive = Job.objects.create(
+            company=self.company, title='Hidden', description='Description',
+            requirements='Requirements', location='Riyadh', is_active=False
+        )
+        self.auth = {'headers': {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}}
+
+    async def test_list_matches_sync_view(self):
+        """Test the async list returns what JobViewSet.list returns"""
+        params = {'location': 'Riyadh', 'ordering': 'salary_min'}
+        expected = await sync_to_async(self.client.get)(reverse('job-list'), params)
+        response = await self.list_view(self.factory.get('/api/jobs/', params))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content), expected.json())
+        self.assertEqual(json.loads(response.content)['count'], 2)
+
+    async def test_retrieve_matches_sync_view(self):
+        """Test the async retrieve returns what JobViewSet.retrieve returns"""
+        job = await Job.objects.filter(is_active=True).afirst()
+        url = reverse('job-detail', kwargs={'pk': job.pk})
+        expected = await sync_to_async(self.client.get)(url)
+        response = await self.detail_view(self.factory.get(url), pk=job.pk)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content), expected.json())
+
+    async def test_company_sees_own_inactive_job(self):
+        """Test JWT authentication and get_queryset() work async"""
+        url = reverse('job-detail', kwargs={'pk': self.inactive.pk})
+        response = await self.detail_view(self.factory.get(url), pk=self.inactive.pk)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = await self.detail_view(self.factory.get(url, **self.auth), pk=self.inactive.pk)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['title'], 'Hidden')
+
+    async def test_invalid_token(self):
+        """Test a bad token is rejected like on the sync path"""
+        request = self.factory.get('/api/jobs/', headers={'Authorization': 'Bearer nope'})
+        response = await self.list_view(request)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+
+    async def test_page_out_of_range(self):
+        """Test an invalid page is a 404"""
+        response = await self.list_view(self.factory.get('/api/jobs/', {'page': 5}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_writes_fall_back_to_viewset(self):
+        """Test POST on the async route is handled by JobViewSet.create"""
+        request = self.factory.post(
+            '/api/jobs/', {
+                'title': 'Backend Developer', 'description': 'Description',
+                'requirements': 'Requirements', 'location': 'Riyadh',
+            }, content_type='application/json', **self.auth
+        )
+        response = await self.list_view(request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(await Job.objects.filter(title='Backend Developer').aexists())
+
+
+@override_settings(METRICS={'ENABLED': True, 'TOKEN': 'scrape-token'})
+class RequestMetricsTests(APITestCase):
+    """Tests for Server-Timing and the /metrics endpoint"""
+
+    def setUp(self):
+        registry.reset()
+        self.user = User.objects.create_user(
+            phone='0502222222',
+            password='testpass123',
+            role=UserRole.COMPANY
+        )
+        self.company = Company.objects.create(
+            user=self.user,
+            name='TechCorp',
+            location='Riyadh'
+        )
+        for index in range(2):
+            Job.objects.create(
+                company=self.company,
+                title=f'Engineer {index}',
+                description='Description',
+                requirements='Requirements',
+                location='Riyadh'
+            )
+
+    def scrape(self, **headers):
+        return self.client.get(reverse('metrics'), **headers)
+
+    def test_server_timing_header(self):
+        """Test responses report db, serialize, render and total time"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('job-list'))
+        timing = response['Server-Timing']
+        for part in ('db;dur=', 'serialize;dur=', 'render;dur=', 'total;dur='):
+            self.assertIn(part, timing)
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+
+    def test_metrics_aggregated_per_view(self):
+        """Test requests are counted per resolved view and action"""
+        self.client.get(reverse('job-list'))
+        self.client.get(reverse('job-list'))
+        self.client.get(reverse('job-detail', kwargs={'pk': 0}))
+        body = self.scrape(HTTP_AUTHORIZATION='Bearer scrape-token').content.decode()
+        self.assertIn(
+            'http_requests_total{view="JobViewSet.list",method="GET",status="200"} 2', body
+        )
+        self.assertIn(
+            'http_requests_total{view="JobViewSet.retrieve",method="GET",status="404"} 1', body
+        )
+        self.assertIn(
+            'http_request_duration_seconds_count{view="JobViewSet.list",method="GET"} 2', body
+        )
+        self.assertIn(
+            'http_request_duration_seconds_bucket{view="JobViewSet.list",method="GET",le="+Inf"} 2',
+            body
+        )
+        self.assertIn('http_request_db_queries_total{view="JobViewSet.list",method="GET"}', body)
+
+    def test_metrics_requires_token(self):
+        """Test /metrics is not public"""
+        self.assertEqual(self.scrape().status_code, status.HTTP_403_FORBIDDEN)
+        response = self.scrape(HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.scrape(HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+
+    @override_settings(METRICS={'ENABLED': False})
+    def test_disabled(self):
+        """Test nothing is added or exposed when metrics are off"""
+        response = self.client.get(reverse('job-list'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(self.scrape().status_code, status.HTTP_404_NOT_FOUND)
+
+
+class JobQueryBudgetTests(APITestCase):
+    """Tests for per-endpoint query budgets and the N+1 detector"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            phone='0502222222',
+            password='testpass123',
+            role=UserRole.COMPANY
+        )
+        for index in range(4):
+            owner = User.objects.create_user(
+                phone=f'051000000{index}',
+                password='testpass123',
+                role=UserRole.COMPANY
+            )
+            company = Company.objects.create(
+                user=owner, name=f'Company {index}', location='Riyadh'
+            )
+            for number in range(3):
+                self.job = Job.objects.create(
+                    company=company,
+                    title=f'Engineer {number}',
+                    description='Description',
+                    requirements='Requirements',
+                    location='Riyadh'
+                )
+
+    def test_list_within_budget(self):
+        """Test the job list does not query per company"""
+        with query_budget.for_view(JobViewSet, 'list'):
+            response = self.client.get(reverse('job-list'))
+        self.assertEqual(len(response.data['results']), 12)
+        # A real token: budgets include the authentication queries
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        with query_budget.for_view(JobViewSet, 'list'):
+            self.client.get(reverse('job-list'))
+
+    def test_retrieve_within_budget(self):
+        """Test job detail loads company and owner in one query, with or without a token"""
+        url = reverse('job-detail', kwargs={'pk': self.job.pk})
+        with query_budget.for_view(JobViewSet, 'retrieve'):
+            response = self.client.get(url)
+        self.assertEqual(response.data['company']['user']['phone'], '0510000003')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.job.company.user)}')
+        with query_budget.for_view(JobViewSet, 'retrieve'):
+            self.client.get(url)
+
+    def test_n_plus_one_names_serializer_field(self):
+        """Test repeated lazy loads are reported with the serializer field"""
+        jobs = Job.objects.all()
+        with self.assertRaises(QueryBudgetExceeded) as raised:
+            with query_budget():
+                JobListSerializer(jobs, many=True).data
+        self.assertIn('N+1 suspected in JobListSerializer.company_name: 12x', str(raised.exception))
+        self.assertIn('"companies_company"', str(raised.exception))
+
+    def test_over_budget_fails(self):
+        """Test exceeding the declared number of queries fails"""
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'block ran 2 queries, budget is 1'):
+            with query_budget(1):
+                Job.objects.count()
+                Company.objects.count()
+
+    @override_settings(QUERY_BUDGETS={'ENABLED': False})
+    def test_dev_middleware_logs_instead_of_failing(self):
+        """Test the dev server warns about the view and field at fault"""
+        # The installed middleware stays off: it would log (DEBUG=True) too
+        middleware = QueryBudgetMiddleware.__new__(QueryBudgetMiddleware)
+        middleware.get_response = lambda request: self.client.get(reverse('job-list'))
+        with mock.patch.object(JobViewSet, 'get_queryset', lambda view: Job.objects.all()):
+            with self.assertLogs('libs.query_budget', 'WARNING') as logs:
+                request = mock.Mock(method='GET', path='/api/jobs/', resolver_match=None)
+                middleware(request)
+        self.assertTrue(
+            any('JobListSerializer.company_name' in line for line in logs.output), logs.output
+        )
+
+
+class ApiMiddlewareStackTests(TestCase):
+    """Tests for skipping browser-only middleware on /api/ paths"""
+
+    def test_api_skips_browser_middleware(self):
+        """Test API responses get no session, CSRF or frame headers"""
+        response = self.client.get(reverse('job-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Frame-Options', response)
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+        self.assertEqual(len(response.cookies), 0)
+
+    def test_browser_paths_keep_full_stack(self):
+        """Test the admin still gets sessions, CSRF and clickjacking protection"""
+        response = self.client.get(reverse('admin:login'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+        self.assertIn('csrftoken', response.cookies)
+
+    def test_csrf_enforced_on_browser_paths(self):
+        """Test the nested CSRF check still rejects forged admin posts"""
+        client = Client(enforce_csrf_checks=True)
+        response = client.post(reverse('admin:login'), {'username': 'x', 'password': 'y'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(API_PATH_PREFIXES=[])
+    def test_no_prefixes_runs_everything_everywhere(self):
+        """Test an empty API_PATH_PREFIXES restores the flat stack"""
+        response = self.client.get(reverse('job-list'))
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+
+    @override_settings(
+        DEBUG=True, METRICS={'ENABLED': True}, LOAD_SHEDDING={'MAX_IN_FLIGHT': 10},
+        QUERY_BUDGETS={'ENABLED': True}
+    )
+    def test_no_middleware_adapted_under_asgi(self):
+        """Test the ASGI chain runs every middleware natively, without threads"""
+        with mock.patch('django.core.handlers.base.logger') as logger:
+            ASGIHandler()
+        adapted = [call for call in logger.debug.call_args_list if 'adapted' in call.args[0]]
+        self.assertEqual(adapted, [])
+
+    async def test_async_stack(self):
+        """Test both stacks under the async handler"""
+        client = AsyncClient()
+        response = await client.get('/api/jobs/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Frame-Options', response)
+        response = await client.get('/admin/login/')
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+
+
+class JobRateLimitTests(APITestCase):
+    """Tests for the public_read rate limit on job endpoints"""
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(phone=f'051000000{n}', password='x', role=UserRole.COMPANY)
+            for n in range(2)
+        ]
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        limits = override_settings(RATE_LIMITS={
+            'ENABLED': True,
+            'STORE': os.path.join(directory.name, 'ratelimit.sqlite3'),
+            'POLICIES': {'public_read': [{'per': 'user', 'rate': '1/min'}]},
+        })
+        limits.enable()
+        self.addCleanup(limits.disable)
+
+    def test_users_and_anonymous_clients_have_own_buckets(self):
+        """Test users are limited per account and anonymous clients per IP"""
+        url = reverse('job-list')
+        for user in self.users:
+            self.client.force_authenticate(user=user)
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class LoadSheddingTests(TestCase):
+    """Tests for shedding requests above MAX_IN_FLIGHT"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def slow_view(self, request):
+        self.started.set()
+        self.release.wait(5)
+        return HttpResponse('done')
+
+    @override_settings(LOAD_SHEDDING={'MAX_IN_FLIGHT': 1, 'RETRY_AFTER': 2})
+    def test_sheds_above_limit(self):
+        """Test a request arriving while the worker is full gets 503"""
+        middleware = LoadSheddingMiddleware(self.slow_view)
+        worker = threading.Thread(target=middleware, args=(self.factory.get('/api/jobs/'),))
+        worker.start()
+        self.started.wait(5)
+
+        response = middleware(self.factory.get('/api/jobs/'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '2')
+        # Exempt paths are always served
+        self.release.set()
+        self.assertEqual(middleware(self.factory.get('/metrics')).status_code, 200)
+        worker.join()
+
+        self.assertEqual(middleware.in_flight, 0)
+        self.assertEqual(middleware(self.factory.get('/api/jobs/')).status_code, 200)
+
+    @override_settings(LOAD_SHEDDING={'MAX_IN_FLIGHT': 1})
+    async def test_sheds_async(self):
+        """Test the limit counts in-flight coroutines under ASGI"""
+        release = asyncio.Event()
+
+        async def view(request):
+            await release.wait()
+            return HttpResponse('done')
+
+        middleware = LoadSheddingMiddleware(view)
+        factory = AsyncRequestFactory()
+        first = asyncio.ensure_future(middleware(factory.get('/api/jobs/')))
+        await asyncio.sleep(0)
+        self.assertEqual((await middleware(factory.get('/api/jobs/'))).status_code, 503)
+        release.set()
+        self.assertEqual((await first).status_code, 200)
+        self.assertEqual(middleware.in_flight, 0)
+
+    def test_disabled_by_default(self):
+        """Test the middleware removes itself when MAX_IN_FLIGHT is 0"""
+        with self.assertRaises(MiddlewareNotUsed):
+            LoadSheddingMiddleware(self.slow_view)
+
+
+class JobAutocompleteTests(APITestCase):
+    """Tests for GET /api/jobs/autocomplete/{field}/"""
+
+    def setUp(self):
+        autocomplete.reset()
+        self.addCleanup(autocomplete.reset)
+        # Sync on every query
+        sync = override_settings(AUTOCOMPLETE={'SYNC_INTERVAL': 0, 'REBUILD_INTERVAL': 3600})
+        sync.enable()
+        self.addCleanup(sync.disable)
+        self.user = User.objects.create_user(
+            phone='0520000000', password='x', role=UserRole.COMPANY
+        )
+        self.company = Company.objects.create(user=self.user, name='Acme Labs', location='Riyadh')
+        self.jobs = [
+            Job.objects.create(
+                company=self.company, title=title, description='D', requirements='R',
+                location='Riyadh', required_skills=skills
+            )
+            for title, skills in [
+                ('Python Developer', ['Python', 'Django']),
+                ('Senior Python Engineer', ['python', 'PostgreSQL']),
+                ('Product Manager', ['Roadmaps']),
+            ]
+        ]
+
+    def complete(self, field, q, **params):
+        url = reverse('job-autocomplete', args=[field])
+        response = self.client.get(url, {'q': q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(item['value'], item['count']) for item in response.data['results']]
+
+    def test_ranked_by_frequency_from_any_word(self):
+        """Test terms match on any word start, case-insensitively, most used first"""
+        self.assertEqual(self.complete('skills', 'P'), [('Python', 2), ('PostgreSQL', 1)])
+        self.assertEqual(
+            self.complete('titles', 'pyth'),
+            [('Python Developer', 1), ('Senior Python Engineer', 1)]
+        )
+        self.assertEqual(self.complete('titles', 'eng'), [('Senior Python Engineer', 1)])
+        self.assertEqual(self.complete('locations', 'riy'), [('Riyadh', 3)])
+        self.assertEqual(self.complete('companies', 'lab'), [('Acme Labs', 3)])
+        self.assertEqual(self.complete('skills', 'p', limit=1), [('Python', 2)])
+        self.assertEqual(self.complete('titles', ''), [])
+
+    def test_writes_are_applied_incrementally(self):
+        """Test saves and set-based soft delete/restore update the built index"""
+        self.complete('titles', 'x')
+        index = autocomplete._live.index
+
+        self.jobs[2].title = 'Python Trainer'
+        self.jobs[2].save()
+        self.assertEqual(self.complete('titles', 'python t'), [('Python Trainer', 1)])
+        self.assertEqual(self.complete('titles', 'product'), [])
+
+        self.jobs[0].is_active = False
+        self.jobs[0].save(update_fields=['is_active'])
+        self.assertEqual(self.complete('skills', 'pyth'), [('Python', 1)])
+
+        Job.objects.filter(pk=self.jobs[1].pk).soft_delete()
+        self.assertEqual(self.complete('skills', 'pyth'), [])
+        Job.all_objects.filter(pk=self.jobs[1].pk).restore()
+        self.assertEqual(self.complete('skills', 'pyth'), [('python', 1)])
+        self.assertEqual(self.complete('companies', 'acme'), [('Acme Labs', 2)])
+
+        self.company.name = 'Acme Robotics'
+        self.company.save()
+        self.assertEqual(self.complete('companies', 'acme'), [('Acme Robotics', 2)])
+        self.assertIs(autocomplete._live.index, index)
+
+    def test_invalid_requests(self):
+        """Test unknown fields and bad limits are rejected"""
+        url = reverse('job-autocomplete', args=['salaries'])
+        self.assertEqual(self.client.get(url, {'q': 'a'}).status_code, status.HTTP_404_NOT_FOUND)
+        url = reverse('job-autocomplete', args=['titles'])
+        for limit in ('x', '0'):
+            response = self.client.get(url, {'q': 'a', 'limit': limit})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_prefix_index_discard(self):
+        """Test a term leaves the index when its count drops to zero"""
+        index = PrefixIndex()
+        index.add('Data Engineer', 2)
+        index.discard('data engineer')
+        self.assertEqual(index.complete('eng'), [('Data Engineer', 1)])
+        index.discard('DATA ENGINEER')
+        self.assertEqual((index.complete('eng'), len(index), index.entries), ([], 0, []))
+
+    def test_prefix_index_add_many(self):
+        """Test a bulk load matches adding the terms one by one"""
+        terms = {'Data Engineer': 2, 'Python Engineer': 1, 'data engineer': 1, 'Go': 3}
+        one_by_one = PrefixIndex()
+        for term, count in terms.items():
+            one_by_one.add(term, count)
+        bulk = PrefixIndex()
+        bulk.add_many({'Go': 1})
+        bulk.complete('go')
+        bulk.add_many({term: count - (term == 'Go') for term, count in terms.items()})
+        self.assertEqual(bulk.entries, one_by_one.entries)
+        self.assertEqual(bulk.complete('eng'), [('Data Engineer', 3), ('Python Engineer', 1)])
+        self.assertEqual(bulk.complete('go'), [('Go', 3)])
+
+    def test_rebuild_runs_in_background(self):
+        """Test a due rebuild does not block reads, then replaces the index"""
+        started, release = threading.Event(), threading.Event()
+
+        class Index:
+            builds = 0
+
+            def __init__(self):
+                self.built_at = self.synced_at = time.monotonic()
+
+            @classmethod
+            def build(cls):
+                cls.builds += 1
+                index = cls()
+                index.number = cls.builds
+                if index.number > 1:
+                    started.set()
+                    release.wait(5)
+                return index
+
+        live = LiveIndex(Index, lambda: {'SYNC_INTERVAL': 3600, 'REBUILD_INTERVAL': 0})
+        self.assertEqual(live.read(lambda index: index.number), 1)
+        # Rebuild due: started in the background, the old index answers
+        self.assertEqual(live.read(lambda index: index.number), 1)
+        self.assertTrue(started.wait(5))
+        self.assertEqual(live.read(lambda index: index.number), 1)
+        release.set()
+        for thread in threading.enumerate():
+            if thread.name == 'Index-rebuild':
+                thread.join(5)
+        self.assertEqual(live.index.number, 2)
+
+
+class SimilarJobsTests(APITestCase):
+    """Tests for GET /api/jobs/{id}/similar/"""
+
+    def setUp(self):
+        similar.reset()
+        self.addCleanup(similar.reset)
+        sync = override_settings(SIMILAR_JOBS={'SYNC_INTERVAL': 0, 'REBUILD_INTERVAL': 3600})
+        sync.enable()
+        self.addCleanup(sync.disable)
+        user = User.objects.create_user(phone='0530000000', password='x', role=UserRole.COMPANY)
+        self.company = Company.objects.create(user=user, name='Acme', location='Riyadh')
+        self.backend = self.create_job(
+            'Backend Engineer', ['Python', 'Django'], 'Build REST APIs with Django and PostgreSQL.'
+        )
+        self.api = self.create_job(
+            'Python API Developer', ['Python', 'Django'], 'Design REST APIs in Django.'
+        )
+        self.data = self.create_job(
+            'Data Engineer', ['Python', 'Spark'], 'Run Spark pipelines and PostgreSQL warehouses.'
+        )
+        self.design = self.create_job(
+            'Product Designer', ['Figma'], 'Design mobile screens in Figma.'
+        )
+        # Common words, so the other terms are not stop words (MAX_DF)
+        for n in range(4):
+            self.create_job(f'Accountant {n}', ['Excel'], 'Close the books.')
+
+    def create_job(self, title, skills, description):
+        return Job.objects.create(
+            company=self.company, title=title, description=description,
+            requirements='Team player', location='Riyadh', required_skills=skills
+        )
+
+    def similar_ids(self, job, **params):
+        response = self.client.get(reverse('job-similar', args=[job.pk]), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        scores = [result['score'] for result in response.data['results']]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        return [result['job']['id'] for result in response.data['results']]
+
+    def test_ranked_by_shared_terms(self):
+        """Test jobs sharing more weighted terms rank first, unrelated ones not at all"""
+        ids = self.similar_ids(self.backend)
+        self.assertEqual(ids[:2], [self.api.pk, self.data.pk])
+        self.assertNotIn(self.backend.pk, ids)
+        self.assertEqual(self.similar_ids(self.backend, limit=1), [self.api.pk])
+        self.assertEqual(self.similar_ids(self.design), [self.api.pk])
+
+    def test_cached_lists_follow_job_changes(self):
+        """Test new, edited and deactivated jobs update cached neighbours"""
+        self.assertEqual(self.similar_ids(self.data)[0], self.backend.pk)
+        spark = self.create_job('Spark Engineer', ['Spark', 'Python'], 'Spark pipelines warehouses.')
+        self.assertEqual(self.similar_ids(self.data)[0], spark.pk)
+
+        spark.is_active = False
+        spark.save(update_fields=['is_active'])
+        self.assertNotIn(spark.pk, self.similar_ids(self.data))
+
+        self.design.title = 'Spark Pipelines Engineer'
+        self.design.required_skills = ['Spark']
+        self.design.save()
+        self.assertEqual(self.similar_ids(self.data)[0], self.design.pk)
+
+        Job.objects.filter(pk=self.data.pk).soft_delete()
+        response = self.client.get(reverse('job-similar', args=[self.data.pk]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_vectors_are_compact(self):
+        """Test vectors are sorted term id / float32 arrays of unit length"""
+        model = similar.SimilarJobs.build()
+        terms, weights = model.vectors[self.backend.pk]
+        self.assertEqual((terms.typecode, weights.typecode), ('I', 'f'))
+        self.assertEqual(list(terms), sorted(terms))
+        self.assertAlmostEqual(sum(weight * weight for weight in weights), 1, places=5)
+        self.assertAlmostEqual(
+            model.scores(model.vectors[self.backend.pk])[self.backend.pk], 1, places=5
+        )
+
+    def test_invalid_requests(self):
+        """Test unknown jobs and bad limits are rejected"""
+        response = self.client.get(reverse('job-similar', args=[999999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(reverse('job-similar', args=[self.api.pk]), {'limit': 'x'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+DESCRIPTION = (
+    'We are hiring a backend engineer to design, build and operate the REST APIs '
+    'behind our recruitment platform. You will own services end to end, from data '
+    'models and background jobs to monitoring, and work closely with mobile and web teams.'
+)
+
+
+class JobDuplicateTests(APITestCase):
+    """Tests for near-duplicate job detection (MinHash/LSH)"""
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(phone=f'054000000{n}', password='x', role=UserRole.COMPANY)
+            for n in range(2)
+        ]
+        self.companies = [
+            Company.objects.create(user=user, name=f'Company {n}', location='Riyadh')
+            for n, user in enumerate(self.users)
+        ]
+        self.client.force_authenticate(user=self.users[0])
+
+    def post_job(self, description=DESCRIPTION, **fields):
+        return self.client.post(reverse('job-list'), {
+            'title': 'Backend Engineer', 'description': description,
+            'requirements': 'Python, Django and SQL', 'location': 'Riyadh', **fields,
+        }, format='json')
+
+    def test_reposts_are_listed(self):
+        """Test a repost, even lightly edited, lists the company's earlier job"""
+        first = self.post_job()
+        self.assertNotIn('duplicates', first.data)
+        job = Job.objects.get(title='Backend Engineer')
+        self.assertEqual(JobBand.objects.filter(job=job).count(), minhash.BANDS)
+
+        edited = self.post_job(description=DESCRIPTION.replace('closely', 'daily'))
+        self.assertEqual(edited.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([item['id'] for item in edited.data['duplicates']], [job.pk])
+        self.assertGreaterEqual(edited.data['duplicates'][0]['similarity'], 0.8)
+
+        other = self.post_job(description='Design mobile screens and a design system in Figma.')
+        self.assertNotIn('duplicates', other.data)
+        self.client.force_authenticate(user=self.users[1])
+        self.assertNotIn('duplicates', self.post_job().data)
+
+    @override_settings(JOB_DUPLICATES={'ON_WRITE': 'reject', 'THRESHOLD': 0.8})
+    def test_reject_mode(self):
+        """Test reposts get 409 when duplicates are rejected"""
+        self.post_job()
+        response = self.post_job()
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(len(response.data['duplicates']), 1)
+        self.assertEqual(Job.objects.count(), 1)
+
+        # Editing a job does not conflict with itself
+        job = Job.objects.get()
+        response = self.client.patch(
+            reverse('job-detail', args=[job.pk]), {'description': DESCRIPTION + ' Remote.'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_find_duplicate_jobs_command(self):
+        """Test bulk-inserted jobs are indexed and clustered across companies"""
+        Job.objects.bulk_create([
+            Job(company=company, title='Backend Engineer', description=DESCRIPTION + suffix,
+                requirements='Python', location='Riyadh')
+            for company in self.companies for suffix in ('', ' Apply now.')
+        ] + [
+            Job(company=self.companies[0], title='Designer',
+                description='Design mobile screens in Figma.', requirements='Figma',
+                location='Riyadh')
+        ])
+        out = StringIO()
+        call_command('find_duplicate_jobs', stdout=out)
+        self.assertIn('Indexed 5 jobs', out.getvalue())
+        self.assertIn('1 clusters, 4 jobs', out.getvalue())
+
+    def test_signature_estimates_jaccard(self):
+        """Test MinHash estimates track the exact Jaccard similarity"""
+        first = minhash.shingles(DESCRIPTION)
+        second = minhash.shingles(DESCRIPTION.replace('REST', 'GraphQL'))
+        estimate = minhash.estimate(minhash.signature(first), minhash.signature(second))
+        self.assertAlmostEqual(estimate, minhash.jaccard(first, second), delta=0.15)
+
+
+class RepresentationCacheTests(APITestCase):
+    """Tests for the per-(pk, updated_at) cache of job and company representations"""
+
+    def setUp(self):
+        cache.clear()
+        self.company_user = User.objects.create_user(
+            phone='0502222222',
+            password='testpass123',
+            role=UserRole.COMPANY
+        )
+        self.company = Company.objects.create(
+            user=self.company_user, name='TechCorp', industry=Industry.TECH, location='Riyadh'
+        )
+        for index in range(3):
+            Job.objects.create(
+                company=self.company, title=f'Engineer {index}', description='Build APIs',
+                employment_type=EmploymentType.FULL_TIME, location='Riyadh'
+            )
+
+    def serialize(self):
+        jobs = Job.objects.select_related('company__user').order_by('id')
+        return JobReadSerializer(jobs, many=True).data
+
+    def test_cached_output_equals_uncached(self):
+        """Test cached pages match plain serialization, and unchanged blocks are not re-rendered"""
+        with override_settings(REPRESENTATION_CACHE={'ENABLED': False}):
+            expected = self.serialize()
+        render = mock.patch.object(
+            representation_cache, '_render', wraps=representation_cache._render
+        )
+        user = mock.patch.object(
+            UserReadSerializer, 'to_representation', autospec=True,
+            side_effect=UserReadSerializer.to_representation
+        )
+        with render as render, user as user:
+            self.assertEqual(self.serialize(), expected)
+            # 3 job blocks and 1 company block; the company and its user once per page
+            self.assertEqual(render.call_count, 3 + 1)
+            self.assertEqual(user.call_count, 1)
+            render.reset_mock()
+            self.assertEqual(self.serialize(), expected)
+        self.assertEqual(render.call_count, 0)
+
+    def test_page_is_one_cache_round_trip(self):
+        """Test a list page reads its blocks with one get_many and writes misses with one set_many"""
+        with mock.patch.object(cache, 'get_many', wraps=cache.get_many) as get_many, \
+                mock.patch.object(cache, 'set_many', wraps=cache.set_many) as set_many:
+            self.serialize()
+        # 3 jobs and their one company
+        get_many.assert_called_once()
+        self.assertEqual(len(get_many.call_args.args[0]), 4)
+        set_many.assert_called_once()
+        self.assertEqual(len(set_many.call_args.args[0]), 4)
+
+    def test_changes_show_up(self):
+        """Test edits, company renames and (de)activation are never served stale"""
+        self.serialize()
+        job = Job.objects.order_by('id').first()
+        job.title = 'Senior Engineer'
+        job.save()
+        self.company.name = 'Najm'
+        self.company.save()
+        data = self.serialize()
+        self.assertEqual(data[0]['title'], 'Senior Engineer')
+        self.assertEqual({item['company']['name'] for item in data}, {'Najm'})
+
+        self.client.force_authenticate(user=self.company_user)
+        url = reverse('job-detail', kwargs={'pk': job.pk})
+        self.assertTrue(self.client.get(url).data['is_active'])
+        self.client.post(reverse('job-deactivate', kwargs={'pk': job.pk}))
+        self.assertFalse(self.client.get(url).data['is_active'])
@@ -1,10 +1,19 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import JobViewSet
+from .views import JobViewSet, JobAsyncReadView, JobAutocompleteView
 
 router = DefaultRouter()
 router.register('', JobViewSet, basename='job')
 
 urlpatterns = [
+    path('autocomplete/<str:field>/', JobAutocompleteView.as_view(), name='job-autocomplete'),
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
+
+# Under ASGI, GET list/retrieve take the async read path
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = [
+        path('', JobAsyncReadView.as_view(action='list')),
+        path('<int:pk>/', JobAsyncReadView.as_view(action='retrieve')),
+    ] + urlpatterns
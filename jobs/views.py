@@ -1,11 +1,21 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Job
-from .serializers import JobReadSerializer, JobListSerializer, JobWriteSerializer
+from rest_framework.views import APIView
+from libs.async_views import AsyncReadView
+from libs.db_router import ReplicaReadMixin
+from . import autocomplete
+from . import similar as similar_jobs
+from .models import Job, JobChange
+from .serializers import (
+    JobReadSerializer,
+    JobListSerializer,
+    JobWriteSerializer,
+    JobChangeSerializer
+)
 from .filters import JobFilter
 
-class JobViewSet(viewsets.ModelViewSet):
+class JobViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for Job CRUD operations.
 
@@ -16,8 +26,18 @@ class JobViewSet(viewsets.ModelViewSet):
     delete:     DELETE /api/jobs/{id}/      - Soft delete job
     activate:   POST /api/jobs/{id}/activate/   - Activate job
     deactivate: POST /api/jobs/{id}/deactivate/ - Deactivate job
+    changes:    GET /api/jobs/changes/?since=  - Incremental changes feed (public)
+    similar:    GET /api/jobs/{id}/similar/    - Most similar active jobs (public)
     """
     queryset = Job.objects.filter(is_active=True)
+    # Rate limited per user / IP, see RATE_LIMITS
+    throttle_scope = 'public_read'
+    # Max queries per action, checked by tests and QueryBudgetMiddleware.
+    # Includes a JWT caller's user and company lookups
+    query_budgets = {'list': 4, 'retrieve': 3}
+    changes_page_size = 500
+    changes_max_page_size = 5000
+    similar_page_size = 10
     filterset_class = JobFilter
     search_fields = ['title', 'description', 'required_skills']
     ordering_fields = ['title', 'created_at', 'salary_min']
@@ -26,8 +46,10 @@ class JobViewSet(viewsets.ModelViewSet):
         # Companies see all their jobs, others see only active
         user = self.request.user
         if user.is_authenticated and hasattr(user, 'company'):
-            return Job.objects.filter(company=user.company)
-        return Job.objects.filter(is_active=True)
+            queryset = Job.objects.filter(company=user.company)
+        else:
+            queryset = Job.objects.filter(is_active=True)
+        return queryset.select_related('company__user')
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -37,7 +59,7 @@ class JobViewSet(viewsets.ModelViewSet):
         return JobReadSerializer
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'changes', 'similar']:
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticated()]
 
@@ -46,7 +68,8 @@ class JobViewSet(viewsets.ModelViewSet):
         """Activate a job posting"""
         job = self.get_object()
         job.is_active = True
-        job.save(update_fields=['is_active'])
+        # updated_at too: cached representations are keyed on it
+        job.save(update_fields=['is_active', 'updated_at'])
         return Response({'message': 'Job activated'})
 
     @action(detail=True, methods=['post'])
@@ -54,8 +77,130 @@ class JobViewSet(viewsets.ModelViewSet):
         """Deactivate a job posting"""
         job = self.get_object()
         job.is_active = False
-        job.save(update_fields=['is_active'])
+        # updated_at too: cached representations are keyed on it
+        job.save(update_fields=['is_active', 'updated_at'])
         return Response({'message': 'Job deactivated'})
 
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Job changes after a cursor, oldest first.
+        Start with since=0, then pass back next_cursor until has_more is false.
+        `job` holds the public job data, or null once it is no longer public.
+        """
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = int(request.query_params.get('limit', self.changes_page_size))
+        except ValueError:
+            return Response(
+                {'error': 'since and limit must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if since < 0 or limit < 1:
+            return Response(
+                {'error': 'since must be >= 0 and limit >= 1'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = min(limit, self.changes_max_page_size)
+
+        # One extra row tells us whether another page follows
+        entries = list(JobChange.objects.filter(id__gt=since).order_by('id')[:limit + 1])
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        return Response({
+            'results': JobChangeSerializer(entries, many=True).data,
+            'next_cursor': entries[-1].id if entries else since,
+            'has_more': has_more,
+        })
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """
+        Active jobs most similar to this one by title, skills and text,
+        best first, from a TF-IDF model (see jobs/similar.py).
+        """
+        try:
+            limit = int(request.query_params.get('limit', self.similar_page_size))
+        except ValueError:
+            return Response(
+                {'error': 'limit must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if limit < 1:
+            return Response(
+                {'error': 'limit must be >= 1'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        neighbours = None
+        if pk.isdigit():
+            neighbours = similar_jobs.similar(int(pk), min(limit, similar_jobs.TOP_K))
+        if neighbours is None:
+            return Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        jobs = Job.objects.select_related('company').in_bulk([pk for pk, _ in neighbours])
+        return Response({
+            'results': [
+                {'score': round(score, 4), 'job': JobListSerializer(jobs[pk]).data}
+                for pk, score in neighbours if pk in jobs
+            ],
+        })
+
     def perform_destroy(self, instance):
-        instance.soft_delete(user=self.request.user)
\ No newline at end of file
+        instance.soft_delete(user=self.request.user)
+
+
+class JobAutocompleteView(APIView):
+    """
+    Completions for a search box, from an in-memory index (jobs/autocomplete.py).
+
+    GET /api/jobs/autocomplete/{field}/?q=pyt&limit=10
+    field: titles, skills, locations or companies. Results are ranked by
+    the number of public jobs using them (`count`).
+    """
+    permission_classes = [permissions.AllowAny]
+    # Anonymous endpoint: no JWT to decode, limited per IP
+    authentication_classes = []
+    throttle_scope = 'autocomplete'
+    fields = {
+        'titles': 'title',
+        'skills': 'skill',
+        'locations': 'location',
+        'companies': 'company',
+    }
+    page_size = 10
+    max_page_size = 50
+
+    def get(self, request, field):
+        if field not in self.fields:
+            return Response(
+                {'error': f'field must be one of: {", ".join(self.fields)}'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        query = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', self.page_size))
+        except ValueError:
+            return Response(
+                {'error': 'limit must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if limit < 1:
+            return Response(
+                {'error': 'limit must be >= 1'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = min(limit, self.max_page_size)
+
+        results = autocomplete.complete(self.fields[field], query, limit)
+        return Response({
+            'query': query,
+            'results': [{'value': value, 'count': count} for value, count in results],
+        })
+
+
+class JobAsyncReadView(AsyncReadView):
+    """
+    Async list/retrieve for the ASGI app (see libs/async_views.py).
+    Other methods are served by JobViewSet.
+    """
+    viewset_class = JobViewSet
@@ -0,0 +1,205 @@
+# libs/async_views.py
+"""
+Async read path (list / retrieve) for DRF viewsets, for ASGI deployments.
+
+AsyncReadView serves GET/HEAD of one viewset action with Django's async
+ORM, so a request waiting on the database or on a slow client does not
+hold a worker. Everything else (POST, PUT, PATCH, DELETE, OPTIONS) is
+handed to the regular sync viewset.
+
+The viewset itself is reused for everything that does not touch the
+database: get_queryset(), filter backends, permissions, serializers.
+What does touch it is done async here:
+
+    authentication   AsyncJWTAuthentication.aauthenticate()
+    pagination       AsyncPageNumberPagination (acount + aiterator)
+    retrieve         queryset.aget()
+
+Querysets must select_related() everything the serializer reads, since
+lazy loading is not allowed in async code: in get_queryset(), or per
+action in `select_related`.
+"""
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.http import Http404, HttpResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from libs import db_router
+
+# Router mapping of the sync viewset, per route
+ROUTE_ACTIONS = {
+    'list': {'get': 'list', 'post': 'create'},
+    'retrieve': {
+        'get': 'retrieve', 'put': 'update',
+        'patch': 'partial_update', 'delete': 'destroy',
+    },
+}
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication with the user lookup done by the async ORM"""
+
+    # Reverse one-to-ones loaded with the user, so views can check
+    # hasattr(user, 'company') without a sync query
+    user_select_related = ['company', 'candidate']
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+        try:
+            user = await self.user_model.objects.select_related(
+                *self.user_select_related
+            ).aget(**{jwt_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return user
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """PageNumberPagination with the count and page fetched async"""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return [obj async for obj in queryset.aiterator()]
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached_property: fill it so nothing counts sync
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+        self.page.object_list = [obj async for obj in self.page.object_list.aiterator()]
+        self.request = request
+        return self.page.object_list
+
+
+class AsyncReadView(View):
+    """
+    Async list or retrieve for `viewset_class`, e.g.
+
+        JobAsyncReadView.as_view(action='list')
+        JobAsyncReadView.as_view(action='retrieve')
+    """
+    viewset_class = None
+    action = None
+    # {action: [select_related paths the serializer needs]}
+    select_related = {}
+    authentication_class = AsyncJWTAuthentication
+    pagination_class = AsyncPageNumberPagination
+    renderer_class = JSONRenderer
+    fallback_view = None
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        action = initkwargs['action']
+        initkwargs.setdefault(
+            'fallback_view', cls.viewset_class.as_view(ROUTE_ACTIONS[action])
+        )
+        # Writes are handled (and CSRF-exempted) by the DRF viewset
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return self.get(request, *args, **kwargs)
+        return sync_to_async(self.fallback_view)(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        authenticator = self.authentication_class()
+        drf_request = Request(request, authenticators=())
+        viewset = self.viewset_class(
+            request=drf_request, action=self.action, args=args,
+            kwargs=kwargs, format_kwarg=None, headers={}
+        )
+        try:
+            await self.authenticate(authenticator, drf_request)
+            viewset.check_permissions(drf_request)
+            viewset.check_throttles(drf_request)
+
+            alias = viewset.replica_alias(drf_request)
+            with db_router.read_from(alias):
+                queryset = viewset.filter_queryset(viewset.get_queryset())
+                if self.select_related.get(self.action):
+                    queryset = queryset.select_related(*self.select_related[self.action])
+                if self.action == 'list':
+                    data = await self.list(viewset, queryset, drf_request)
+                else:
+                    data = await self.retrieve(viewset, queryset, drf_request, kwargs)
+        except (APIException, Http404) as exc:
+            return self.handle_exception(exc, authenticator, viewset, drf_request)
+        return self.render(data)
+
+    async def authenticate(self, authenticator, drf_request):
+        try:
+            result = await authenticator.aauthenticate(drf_request)
+        except APIException:
+            drf_request._not_authenticated()
+            raise
+        if result is None:
+            drf_request._not_authenticated()
+        else:
+            drf_request.user, drf_request.auth = result
+
+    async def list(self, viewset, queryset, request):
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(queryset, request, view=viewset)
+        serializer = viewset.get_serializer(page, many=True)
+        if paginator.page_size is None:
+            return serializer.data
+        return paginator.get_paginated_response(serializer.data).data
+
+    async def retrieve(self, viewset, queryset, request, kwargs):
+        lookup = {viewset.lookup_field: kwargs[viewset.lookup_url_kwarg or viewset.lookup_field]}
+        try:
+            obj = await queryset.aget(**lookup)
+        except (queryset.model.DoesNotExist, ValueError):
+            raise Http404
+        viewset.check_object_permissions(request, obj)
+        return viewset.get_serializer(obj).data
+
+    def handle_exception(self, exc, authenticator, viewset, drf_request):
+        if isinstance(exc, APIException) and exc.status_code == 401:
+            exc.auth_header = authenticator.authenticate_header(drf_request)
+        response = exception_handler(exc, {'view': viewset, 'request': drf_request})
+        if response is None:
+            raise exc
+        rendered = self.render(response.data, status=response.status_code)
+        for name, value in response.items():
+            rendered[name] = value
+        return rendered
+
+    def render(self, data, status=200):
+        renderer = self.renderer_class()
+        return HttpResponse(
+            renderer.render(data), status=status,
+            content_type=f'{renderer.media_type}; charset={renderer.charset}'
+        )
@@ -0,0 +1,188 @@
+# libs/audit.py
+"""
+Write-behind audit log for BaseModel changes.
+
+BaseModel.save() and the soft delete queryset methods call the record_*
+helpers below. Events are queued once the surrounding transaction
+commits and written in batches (bulk_create into audit.AuditEvent) by a
+background thread, so request latency does not pay for history writes.
+
+Settings (all optional):
+
+    AUDIT_LOG = {
+        'ENABLED': True,
+        'ASYNC': True,          # False = write on commit, in the caller
+        'BATCH_SIZE': 500,
+        'FLUSH_INTERVAL': 1.0,  # seconds
+        'MAX_QUEUE_SIZE': 10000,
+    }
+
+When the queue is full the caller drains and writes it itself, so
+producers slow down instead of losing events. Remaining events are
+flushed at interpreter exit.
+"""
+import atexit
+import logging
+import queue
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'ASYNC': True,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 1.0,
+    'MAX_QUEUE_SIZE': 10000,
+}
+
+CREATE = 'CREATE'
+UPDATE = 'UPDATE'
+SOFT_DELETE = 'SOFT_DELETE'
+RESTORE = 'RESTORE'
+
+# Described by the event itself (action, user, time), not reported as diffs
+IGNORED_FIELDS = {
+    'id', 'created_at', 'updated_at', 'deleted_at',
+    'created_by_id', 'updated_by_id', 'deleted_by_id',
+}
+
+
+def audit_settings():
+    return {**DEFAULTS, **getattr(settings, 'AUDIT_LOG', {})}
+
+
+def is_enabled():
+    return audit_settings()['ENABLED']
+
+
+class AuditWriter:
+    """Bounded in-memory queue of events plus the thread that drains it"""
+
+    def __init__(self):
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, events):
+        config = audit_settings()
+        if not config['ASYNC']:
+            self.write(events)
+            return
+        self._ensure_started(config)
+        for event in events:
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                # Backpressure: drain in the caller rather than drop
+                self.flush()
+                try:
+                    self._queue.put_nowait(event)
+                except queue.Full:
+                    # Other producers refilled it meanwhile
+                    self.write([event])
+
+    def flush(self):
+        """Write everything queued so far (callable from any thread)"""
+        if self._queue is None:
+            return
+        batch_size = audit_settings()['BATCH_SIZE']
+        while True:
+            batch = self._take(batch_size)
+            if not batch:
+                return
+            self.write(batch)
+
+    def write(self, events):
+        AuditEvent = apps.get_model('audit', 'AuditEvent')
+        try:
+            AuditEvent.objects.bulk_create([AuditEvent(**e) for e in events])
+        except Exception:
+            logger.exception('Failed to write %d audit events', len(events))
+
+    def _take(self, limit, timeout=None):
+        batch = []
+        try:
+            if timeout is not None:
+                batch.append(self._queue.get(timeout=timeout))
+            while len(batch) < limit:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _ensure_started(self, config):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._queue = queue.Queue(maxsize=config['MAX_QUEUE_SIZE'])
+                self._thread = threading.Thread(
+                    target=self._run, name='audit-writer', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            config = audit_settings()
+            batch = self._take(config['BATCH_SIZE'], timeout=config['FLUSH_INTERVAL'])
+            if batch:
+                self.write(batch)
+                # This thread's connection, as after a request (CONN_MAX_AGE)
+                close_old_connections()
+
+
+writer = AuditWriter()
+atexit.register(writer.flush)
+
+
+def _event(model, object_id, action, changes, user_id):
+    return {
+        'model': model._meta.label_lower,
+        'object_id': object_id,
+        'action': action,
+        'changes': changes,
+        'user_id': user_id,
+        'occurred_at': timezone.now(),
+    }
+
+
+def _enqueue(events):
+    if events:
+        transaction.on_commit(lambda: writer.put(events))
+
+
+def record_instance(instance, adding, changes):
+    """
+    Record one save() of a BaseModel instance.
+    `changes` is {attname: [old, new]} for the fields that were saved.
+    """
+    if adding:
+        action, user_id = CREATE, instance.created_by_id
+    elif 'deleted_at' in changes and changes['deleted_at'][1] is not None:
+        action, user_id = SOFT_DELETE, instance.deleted_by_id
+    elif 'deleted_at' in changes:
+        action, user_id = RESTORE, None
+    else:
+        action, user_id = UPDATE, instance.updated_by_id
+
+    diff = {
+        name: values for name, values in changes.items()
+        if name not in IGNORED_FIELDS
+    }
+    if action == UPDATE and not diff:
+        return
+    _enqueue([_event(type(instance), instance.pk, action, diff, user_id)])
+
+
+def record_bulk(model, ids, action, user=None):
+    """Record a set-based soft delete / restore of many rows"""
+    if not is_enabled():
+        return
+    user_id = user.pk if user is not None else None
+    _enqueue([_event(model, pk, action, {}, user_id) for pk in ids])
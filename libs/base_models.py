@@ -1,7 +1,12 @@
 # libs/base_models.py
-from django.db import models
+import copy
+from contextlib import nullcontext
+
+from django.db import models, transaction
 from django.conf import settings
 from django.utils import timezone
+from libs import audit
+from libs.managers import soft_delete_children, restore_children
 
 
 class BaseModel(models.Model):
@@ -38,17 +43,136 @@ class BaseModel(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
+    # Related accessors soft-deleted together with this record,
+    # e.g. soft_cascade = ['jobs'] (see libs/managers.py)
+    soft_cascade = []
+
+    # Related accessors whose rows archive_soft_deleted deletes instead
+    # of archiving (derived data), e.g. archive_discard = ['bands']
+    archive_discard = []
+
+    # save() writes only changed columns (see save() below)
+    track_dirty_fields = True
+
+    # Run save() and after_save() in one transaction
+    atomic_save = False
+
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Snapshot of the loaded values, used to diff on save
+        instance._loaded_values = instance._field_values()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._mark_clean(fields)
+
+    def _field_values(self):
+        """Current values of the loaded (non-deferred) concrete fields"""
+        values = {}
+        deferred = self.get_deferred_fields()
+        for field in self._meta.concrete_fields:
+            if field.attname in deferred:
+                continue
+            value = getattr(self, field.attname)
+            if isinstance(field, models.FileField):
+                value = value.name or None
+            elif isinstance(field, models.JSONField):
+                # Lists/dicts are edited in place, keep our own copy
+                value = copy.deepcopy(value)
+            values[field.attname] = value
+        return values
+
+    def _attnames(self, field_names):
+        return {self._meta.get_field(name).attname for name in field_names}
+
+    def _mark_clean(self, fields=None):
+        """Take the current values of `fields` (default all) as the snapshot"""
+        current = self._field_values()
+        if fields is not None:
+            wanted = self._attnames(fields)
+            current = {name: v for name, v in current.items() if name in wanted}
+        # Edits to other fields stay dirty
+        self._loaded_values = {**getattr(self, '_loaded_values', {}), **current}
+
+    def get_changes(self, fields=None):
+        """
+        {attname: [old, new]} for fields changed since the row was loaded,
+        optionally limited to `fields` (names, as passed to update_fields)
+        """
+        loaded = getattr(self, '_loaded_values', {})
+        current = self._field_values()
+        if fields is not None:
+            wanted = self._attnames(fields)
+            current = {name: v for name, v in current.items() if name in wanted}
+        return {
+            name: [loaded.get(name), value]
+            for name, value in current.items()
+            if name not in loaded or loaded[name] != value
+        }
+
+    def save(self, *args, **kwargs):
+        """
+        Save, writing only the columns that changed since the row was loaded
+        (plus updated_at/updated_by). Nothing is written when nothing changed.
+        Instances that were never loaded or saved get a normal full save.
+        """
+        adding = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        changes = self.get_changes(update_fields)
+
+        tracked = (
+            self.track_dirty_fields
+            and not adding
+            and not args
+            and update_fields is None
+            and not kwargs.get('force_insert')
+            and hasattr(self, '_loaded_values')
+        )
+        if tracked:
+            if not changes:
+                return
+            kwargs['update_fields'] = {*changes, 'updated_at', 'updated_by'}
+
+        with transaction.atomic() if self.atomic_save else nullcontext():
+            super().save(*args, **kwargs)
+            self._mark_clean(kwargs.get('update_fields'))
+            self.after_save(adding, changes)
+
+    def after_save(self, adding, changes):
+        """
+        Runs after every save() with the {attname: [old, new]} that was
+        written. Override (calling super) to add side effects.
+        """
+        if audit.is_enabled():
+            audit.record_instance(self, adding, changes)
+
+    @classmethod
+    def rows_changed(cls, ids, action, user=None):
+        """
+        Called by the set-based soft delete/restore (libs/managers.py)
+        with the affected ids, inside the same transaction.
+        """
+        audit.record_bulk(cls, ids, action, user)
+
     def soft_delete(self, user=None):
-        """Mark record as deleted without removing from DB"""
+        """Mark record (and its soft_cascade children) as deleted"""
         self.deleted_at = timezone.now()
         self.deleted_by = user
-        self.save(update_fields=['deleted_at', 'deleted_by'])
+        with transaction.atomic():
+            this = type(self)._base_manager.filter(pk=self.pk)
+            soft_delete_children(type(self), this, user, self.deleted_at)
+            self.save(update_fields=['deleted_at', 'deleted_by'])
 
     def restore(self):
-        """Restore a soft-deleted record"""
-        self.deleted_at = None
-        self.deleted_by = None
-        self.save(update_fields=['deleted_at', 'deleted_by'])
\ No newline at end of file
+        """Restore a soft-deleted record and its cascaded children"""
+        with transaction.atomic():
+            this = type(self)._base_manager.filter(pk=self.pk)
+            restore_children(type(self), this)
+            self.deleted_at = None
+            self.deleted_by = None
+            self.save(update_fields=['deleted_at', 'deleted_by'])
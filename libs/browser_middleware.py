@@ -0,0 +1,105 @@
+# libs/browser_middleware.py
+"""
+Middleware that only browser pages need, skipped for the JWT API.
+
+Sessions, CSRF, auth (session user), messages and clickjacking protection
+are for the admin and other cookie-based pages. /api/ requests carry a
+JWT, set no cookies and return JSON, so running them there is pure
+overhead. BrowserOnlyMiddleware runs BROWSER_MIDDLEWARE as a nested
+stack for every path except API_PATH_PREFIXES:
+
+    MIDDLEWARE = [
+        ...,
+        'libs.browser_middleware.BrowserOnlyMiddleware',
+    ]
+    BROWSER_MIDDLEWARE = [
+        'django.contrib.sessions.middleware.SessionMiddleware',
+        'django.middleware.csrf.CsrfViewMiddleware',
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+        'django.contrib.messages.middleware.MessageMiddleware',
+        'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    ]
+    API_PATH_PREFIXES = ['/api/']   # [] = run them everywhere
+
+The nested middleware's process_view / process_template_response /
+process_exception hooks (e.g. the CSRF check) are forwarded, so browser
+paths behave exactly as with a flat MIDDLEWARE list. Every entry must
+support the handler's mode (sync under WSGI, async under ASGI), as
+Django's own middleware does.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.module_loading import import_string
+
+
+class BrowserOnlyMiddleware:
+    """Run BROWSER_MIDDLEWARE for every path but API_PATH_PREFIXES"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.api_prefixes = tuple(getattr(settings, 'API_PATH_PREFIXES', ()))
+        is_async = iscoroutinefunction(get_response)
+
+        # Built like BaseHandler.load_middleware(), innermost first
+        handler = get_response
+        self.middleware = []
+        for path in reversed(getattr(settings, 'BROWSER_MIDDLEWARE', [])):
+            middleware = import_string(path)
+            capable = 'async_capable' if is_async else 'sync_capable'
+            if not getattr(middleware, capable, not is_async):
+                raise ImproperlyConfigured(
+                    f'{path} is not {capable.replace("_", " ")}, '
+                    f'move it from BROWSER_MIDDLEWARE to MIDDLEWARE'
+                )
+            try:
+                instance = middleware(handler)
+            except MiddlewareNotUsed:
+                continue
+            self.middleware.insert(0, instance)
+            handler = convert_exception_to_response(instance)
+        self.browser_stack = handler
+
+        if is_async:
+            markcoroutinefunction(self)
+
+    def is_api(self, request):
+        return request.path_info.startswith(self.api_prefixes)
+
+    def __call__(self, request):
+        # Returns a coroutine under ASGI: both stacks run in the same mode
+        if self.is_api(request):
+            return self.get_response(request)
+        return self.browser_stack(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_api(request):
+            return None
+        for instance in self.middleware:
+            if hasattr(instance, 'process_view'):
+                response = instance.process_view(request, view_func, view_args, view_kwargs)
+                if response is not None:
+                    return response
+        return None
+
+    def process_template_response(self, request, response):
+        if self.is_api(request):
+            return response
+        for instance in reversed(self.middleware):
+            if hasattr(instance, 'process_template_response'):
+                response = instance.process_template_response(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        if self.is_api(request):
+            return None
+        for instance in reversed(self.middleware):
+            if hasattr(instance, 'process_exception'):
+                response = instance.process_exception(request, exception)
+                if response is not None:
+                    return response
+        return None
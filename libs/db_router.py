@@ -0,0 +1,165 @@
+# libs/db_router.py
+"""
+Primary/replica database routing with read-your-writes.
+
+Writes always go to `default` (the primary). Reads go to the primary
+too, except inside views using ReplicaReadMixin: their list/retrieve
+actions read from a random replica. A user who just wrote something is
+pinned to the primary for REPLICA_STICKY_SECONDS, so a company sees its
+new job immediately even if the replicas lag behind.
+
+Settings:
+
+    DATABASE_ROUTERS = ['libs.db_router.PrimaryReplicaRouter']
+    DATABASE_REPLICAS = ['replica1', 'replica2']   # aliases in DATABASES
+    REPLICA_STICKY_SECONDS = 5
+
+Pins are kept in the default cache, which must be shared (Redis,
+Memcached, database) when the API runs in several processes.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+# Alias the current request reads from, None = primary
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def replica_aliases():
+    return [
+        alias for alias in getattr(settings, 'DATABASE_REPLICAS', [])
+        if alias in settings.DATABASES
+    ]
+
+
+def choose_replica():
+    """Random replica alias, or None when no replica is configured"""
+    replicas = replica_aliases()
+    return random.choice(replicas) if replicas else None
+
+
+def current_read_alias():
+    return _read_alias.get() or DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def read_from(alias):
+    """Route ORM reads inside the block to `alias`"""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def _pin_key(user):
+    return f'db-router:pinned:{user.pk}'
+
+
+def pin_to_primary(user):
+    """Send `user`'s replica reads to the primary for a little while"""
+    cache.set(_pin_key(user), True, getattr(settings, 'REPLICA_STICKY_SECONDS', 5))
+
+
+async def apin_to_primary(user):
+    """pin_to_primary() for async code"""
+    await cache.aset(_pin_key(user), True, getattr(settings, 'REPLICA_STICKY_SECONDS', 5))
+
+
+def is_pinned(user):
+    return user.is_authenticated and cache.get(_pin_key(user), False)
+
+
+class PrimaryReplicaRouter:
+    """Writes to the primary, reads wherever read_from() says"""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        pool = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    ViewSet mixin: serve `replica_actions` from a replica unless the
+    user is pinned to the primary after a recent write.
+    """
+    replica_actions = ['list', 'retrieve']
+
+    def replica_alias(self, request):
+        """Replica to read from for this request, None = primary"""
+        if self.action in self.replica_actions and not is_pinned(request.user):
+            return choose_replica()
+        return None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Authentication ran above, so request.user is the real user
+        alias = self.replica_alias(request)
+        if alias is not None:
+            self._replica_token = _read_alias.set(alias)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            _read_alias.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class PrimaryPinMiddleware:
+    """Pin the user to the primary after every successful write request"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        user = self.writer(request, response)
+        if user is not None:
+            pin_to_primary(user)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if request.method in SAFE_METHODS:
+            return response  # The async read path: nothing to pin
+        # request.user may be a lazy session user, loaded with a query
+        user = await sync_to_async(self.writer)(request, response)
+        if user is not None:
+            await apin_to_primary(user)
+        return response
+
+    def writer(self, request, response):
+        """The user to pin after this request, None when it wrote nothing"""
+        # DRF copies the authenticated (JWT) user back onto the request
+        user = getattr(request, 'user', None)
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+        ):
+            return user
+        return None
@@ -0,0 +1,91 @@
+# libs/live_index.py
+"""
+Process-wide holder of an in-memory index kept current from the
+database (jobs/autocomplete.py, jobs/similar.py).
+
+The index object provides build() (a classmethod), sync(), and the
+built_at / synced_at monotonic times. LiveIndex builds it on first use,
+syncs it at most every SYNC_INTERVAL seconds before a read and replaces
+it every REBUILD_INTERVAL seconds. Builds never hold the lock that
+serializes reads and syncs:
+
+- the first build runs in the requesting thread, as there is nothing to
+  serve yet; concurrent first requests wait for that single build;
+- a due rebuild runs in a background thread while the current index
+  keeps answering, then the new one is swapped in. It catches up from
+  its own cursor on the next sync.
+
+    live = LiveIndex(JobAutocomplete, autocomplete_settings)
+    live.read(lambda index: index.complete('title', 'pyth', 10))
+"""
+import logging
+import threading
+import time
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class LiveIndex:
+    """The current index of `index_class`, built, synced and rebuilt as configured"""
+
+    def __init__(self, index_class, get_settings):
+        self.index_class = index_class
+        self.get_settings = get_settings
+        self.index = None
+        self._lock = threading.Lock()        # reads and syncs
+        self._build_lock = threading.Lock()  # one build at a time
+        self._generation = 0                 # bumped by reset()
+
+    def read(self, query):
+        """query(index) on the current index, synced first when due"""
+        config = self.get_settings()
+        index = self.index
+        if index is None:
+            self._first_build()
+        elif time.monotonic() - index.built_at >= config['REBUILD_INTERVAL']:
+            self._start_rebuild()
+        with self._lock:
+            index = self.index
+            if time.monotonic() - index.synced_at >= config['SYNC_INTERVAL']:
+                index.sync()
+            return query(index)
+
+    def reset(self):
+        """Drop the index; the next read builds it"""
+        with self._lock:
+            self.index = None
+            self._generation += 1
+
+    def _first_build(self):
+        with self._build_lock:
+            if self.index is None:
+                index = self.index_class.build()
+                with self._lock:
+                    self.index = index
+
+    def _start_rebuild(self):
+        if not self._build_lock.acquire(blocking=False):
+            return  # Already rebuilding
+        threading.Thread(
+            target=self._rebuild, args=(self._generation,),
+            name=f'{self.index_class.__name__}-rebuild', daemon=True
+        ).start()
+
+    def _rebuild(self, generation):
+        try:
+            index = self.index_class.build()
+            with self._lock:
+                # Not after a reset() made during the build
+                if generation == self._generation:
+                    self.index = index
+        except Exception:
+            logger.exception('Rebuilding %s failed', self.index_class.__name__)
+            with self._lock:
+                if self.index is not None:
+                    # Keep serving it; retry after another REBUILD_INTERVAL
+                    self.index.built_at = time.monotonic()
+        finally:
+            self._build_lock.release()
+            connection.close()
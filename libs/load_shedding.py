@@ -0,0 +1,99 @@
+# libs/load_shedding.py
+"""
+Load shedding: answer 503 right away when a worker is already busy.
+
+When more than MAX_IN_FLIGHT requests are being handled by this process
+(threads under WSGI, coroutines under ASGI), new requests get a 503
+with Retry-After instead of queueing behind the others. Clients back
+off, and the requests already running still finish in time.
+
+Settings:
+
+    LOAD_SHEDDING = {
+        'MAX_IN_FLIGHT': 0,          # 0 = off (middleware removed)
+        'RETRY_AFTER': 1,            # seconds
+        'EXEMPT_PATHS': ['/metrics'],
+    }
+
+The limit is per process: size it to the worker's threads (or the
+concurrency an async worker handles well).
+"""
+import threading
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+
+DEFAULTS = {
+    'MAX_IN_FLIGHT': 0,
+    'RETRY_AFTER': 1,
+    'EXEMPT_PATHS': ['/metrics'],
+}
+
+
+def shedding_settings():
+    return {**DEFAULTS, **getattr(settings, 'LOAD_SHEDDING', {})}
+
+
+class LoadSheddingMiddleware:
+    """503 + Retry-After while MAX_IN_FLIGHT requests are in progress"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        config = shedding_settings()
+        if not config['MAX_IN_FLIGHT']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.max_in_flight = config['MAX_IN_FLIGHT']
+        self.retry_after = config['RETRY_AFTER']
+        self.exempt_paths = tuple(config['EXEMPT_PATHS'])
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def enter(self, request):
+        """Count the request in, False when it must be shed"""
+        if request.path_info.startswith(self.exempt_paths):
+            return None
+        with self._lock:
+            if self.in_flight >= self.max_in_flight:
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def shed(self):
+        response = JsonResponse(
+            {'detail': 'Server is busy, please retry shortly.'}, status=503
+        )
+        response['Retry-After'] = str(self.retry_after)
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        entered = self.enter(request)
+        if entered is False:
+            return self.shed()
+        try:
+            return self.get_response(request)
+        finally:
+            if entered:
+                self.leave()
+
+    async def __acall__(self, request):
+        entered = self.enter(request)
+        if entered is False:
+            return self.shed()
+        try:
+            return await self.get_response(request)
+        finally:
+            if entered:
+                self.leave()
@@ -1,18 +1,102 @@
 # libs/managers.py
-from django.db import models
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+from libs import audit
 
 
-class SoftDeleteManager(models.Manager):
+def soft_cascade_rules(model):
+    """
+    Yield (child_model, fk_name) for every relation listed in
+    model.soft_cascade, e.g. Company.soft_cascade = ['jobs'].
+    """
+    for name in getattr(model, 'soft_cascade', ()):
+        relation = model._meta.get_field(name)
+        yield relation.related_model, relation.field.name
+
+
+def tracked_update(queryset, action, user=None, **values):
+    """queryset.update(**values), then Model.rows_changed() with the ids"""
+    ids = list(queryset.values_list('pk', flat=True))
+    count = queryset.update(**values)
+    queryset.model.rows_changed(ids, action, user)
+    return count
+
+
+def soft_delete_children(model, parents, user=None, when=None):
+    """
+    Soft delete the live children of `parents` following the soft_cascade
+    rules, deepest level first, one UPDATE per rule.
+    Children get the parent's deleted_at so restore can find them again.
+    """
+    when = when or timezone.now()
+    for child, fk_name in soft_cascade_rules(model):
+        children = child._base_manager.filter(
+            **{f'{fk_name}__in': parents.values('pk')},
+            deleted_at__isnull=True,
+        )
+        soft_delete_children(child, children, user, when)
+        tracked_update(
+            children, audit.SOFT_DELETE, user, deleted_at=when, deleted_by=user
+        )
+
+
+def restore_children(model, parents):
+    """
+    Restore children that were soft deleted together with `parents`
+    (same deleted_at as their parent). Must run before the parents
+    themselves are restored.
+    """
+    for child, fk_name in soft_cascade_rules(model):
+        children = child._base_manager.filter(
+            **{f'{fk_name}__in': parents.values('pk')},
+            deleted_at=F(f'{fk_name}__deleted_at'),
+        )
+        restore_children(child, children)
+        tracked_update(children, audit.RESTORE, deleted_at=None, deleted_by=None)
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    Set-based soft delete / restore.
+    Each call is one transaction with one UPDATE per model touched,
+    no matter how many rows match.
+    """
+
+    def soft_delete(self, user=None):
+        """Soft delete all rows (and their soft_cascade children)"""
+        when = timezone.now()
+        live = self.filter(deleted_at__isnull=True)
+        with transaction.atomic():
+            soft_delete_children(self.model, live, user, when)
+            return tracked_update(
+                live, audit.SOFT_DELETE, user, deleted_at=when, deleted_by=user
+            )
+
+    def restore(self):
+        """Restore all rows and the children deleted along with them"""
+        deleted = self.filter(deleted_at__isnull=False)
+        with transaction.atomic():
+            restore_children(self.model, deleted)
+            return tracked_update(
+                deleted, audit.RESTORE, deleted_at=None, deleted_by=None
+            )
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
     """
     Manager that filters out soft-deleted records.
     Use as: objects = SoftDeleteManager()
+    soft_delete(user) / restore() are available on the manager too and
+    act on get_queryset(): objects.soft_delete() deletes every live row.
     """
 
     def get_queryset(self):
         return super().get_queryset().filter(deleted_at__isnull=True)
 
 
-class AllObjectsManager(models.Manager):
+class AllObjectsManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
     """
     Manager that includes ALL records (even deleted).
     Use as: all_objects = AllObjectsManager()
@@ -20,7 +104,36 @@ class AllObjectsManager(models.Manager):
     pass
 
 
+class ArchivedObjectsManager(models.Manager):
+    """
+    Manager over the archive table of a model (rows moved out by
+    the archive_soft_deleted command).
+    Use as: archived_objects = ArchivedObjectsManager('jobs.ArchivedJob')
+    """
+
+    def __init__(self, archive_model):
+        super().__init__()
+        self.archive_model_label = archive_model
+
+    @property
+    def archive_model(self):
+        return apps.get_model(self.archive_model_label)
+
+    def get_queryset(self):
+        return self._queryset_class(
+            model=self.archive_model, using=self._db, hints=self._hints
+        )
+
+
 # Usage in any model:
 # class MyModel(BaseModel):
 #     objects = SoftDeleteManager()      # MyModel.objects.all() = only active
-#     all_objects = AllObjectsManager()  # MyModel.all_objects.all() = include deleted
\ No newline at end of file
+#     all_objects = AllObjectsManager()  # MyModel.all_objects.all() = include deleted
+#     archived_objects = ArchivedObjectsManager('app.ArchivedMyModel')  # archived rows
+#
+#     # Soft-deleting a MyModel also soft-deletes these related rows
+#     soft_cascade = ['children']
+#
+# MyModel.objects.filter(...).soft_delete(user)  # one UPDATE per model
+# MyModel.objects.soft_delete(user)              # every live row
+# MyModel.all_objects.filter(...).restore()
@@ -0,0 +1,230 @@
+# libs/media.py
+"""
+Uploaded media (MEDIA_ROOT) served by Django, with permission checks.
+
+GET /media/<path> serves a file only while a live record points at it:
+
+    logos/...  Company.logo       anyone, cached publicly for MAX_AGE
+    cvs/...    Candidate.cv_file  the candidate, companies and admins
+                                  (JWT Bearer token or admin session)
+
+Anything else is a 404, so the view never exposes stray files.
+
+Responses carry an ETag (mtime + size) and Last-Modified, answer
+If-None-Match / If-Modified-Since with 304, and support single byte
+ranges (Range, If-Range -> 206, 416) so PDF viewers and resumed
+downloads fetch only what they need. The body is a FileResponse over
+the open file: under a WSGI server with wsgi.file_wrapper (gunicorn)
+it is sent with sendfile(), never copied through Python. A range is
+read through RangeFile, which stops at the range end and has no
+fileno(): some file wrappers (wsgiref, runserver) ignore Content-Length
+and would otherwise send the file to EOF.
+
+Behind nginx, set ACCEL_REDIRECT to an `internal` location aliasing
+MEDIA_ROOT and the view only checks permissions, then hands the file
+off with X-Accel-Redirect (nginx does ranges and caching):
+
+    location /protected-media/ { internal; alias /srv/app/media/; }
+
+Settings:
+
+    MEDIA_SERVING = {
+        'ACCEL_REDIRECT': '',   # e.g. '/protected-media/', '' = serve here
+        'MAX_AGE': 3600,        # Cache-Control max-age of public files
+    }
+"""
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.apps import apps
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+DEFAULTS = {
+    'ACCEL_REDIRECT': '',
+    'MAX_AGE': 3600,
+}
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def media_settings():
+    return {**DEFAULTS, **getattr(settings, 'MEDIA_SERVING', {})}
+
+
+def _anyone(user, instance):
+    return True
+
+
+def _can_read_cv(user, candidate):
+    return user.is_authenticated and (
+        user.is_staff or user.is_admin_user() or user.is_company_user()
+        or candidate.user_id == user.pk
+    )
+
+
+# (model, file field, who may read): each field's upload_to picks its files
+SOURCES = [
+    ('companies.Company', 'logo', _anyone),
+    ('candidates.Candidate', 'cv_file', _can_read_cv),
+]
+
+
+def find_owner(name):
+    """(record, field, permission) of the live record storing `name`, or None"""
+    for label, field_name, permission in SOURCES:
+        model = apps.get_model(label)
+        field = model._meta.get_field(field_name)
+        if name.startswith(field.upload_to):
+            instance = model.objects.filter(**{field_name: name}).first()
+            if instance is not None:
+                return instance, field, permission
+    return None
+
+
+def authenticate(request):
+    """The JWT user, else the session user (admin), else AnonymousUser"""
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        result = None
+    if result is not None:
+        return result[0]
+    # Imported here: needs the auth app loaded
+    from django.contrib.auth.models import AnonymousUser
+    return getattr(request, 'user', None) or AnonymousUser()
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range(header, size):
+    """(start, end) inclusive of a single-range header, None to send the whole file"""
+    match = _RANGE.match(header.replace(' ', ''))
+    if not match:
+        return None  # Multiple ranges or not bytes: a 200 is allowed
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        if int(last) == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(0, size - int(last)), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+class RangeFile:
+    """`length` bytes of `file` from its current position, as a file to stream"""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.name = file.name  # FileResponse's Content-Type
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        chunk = self.file.read(size) if size else b''
+        self.remaining -= len(chunk)
+        return chunk
+
+    def close(self):
+        self.file.close()
+
+
+class RangeFileResponse(FileResponse):
+    """FileResponse of `length` bytes from the file's current position"""
+
+    def __init__(self, filelike, length, **kwargs):
+        super().__init__(RangeFile(filelike, length), **kwargs)
+        self.headers['Content-Length'] = length
+
+
+@require_safe
+def media_view(request, path):
+    """GET /media/<path>: an uploaded file the user may read"""
+    name = posixpath.normpath(path)
+    if name != path or name.startswith(('/', '..')):
+        raise Http404
+    owner = find_owner(name)
+    if owner is None:
+        raise Http404
+    instance, field, permission = owner
+
+    public = permission is _anyone
+    if not public:
+        user = authenticate(request)
+        if not user.is_authenticated:
+            return HttpResponse('Authentication required', status=401, content_type='text/plain')
+        if not permission(user, instance):
+            return HttpResponse('Forbidden', status=403, content_type='text/plain')
+
+    config = media_settings()
+    cache_control = f'public, max-age={config["MAX_AGE"]}' if public else 'private, no-cache'
+    if config['ACCEL_REDIRECT']:
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = config['ACCEL_REDIRECT'].rstrip('/') + '/' + quote(name)
+        return _finish(response, cache_control, public)
+
+    try:
+        full_path = field.storage.path(name)
+    except NotImplementedError:
+        # Remote storage (S3...): it serves the file itself
+        return HttpResponseRedirect(field.storage.url(name))
+    try:
+        stat = os.stat(full_path)
+    except FileNotFoundError:
+        raise Http404
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    mtime = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=mtime)
+    if response is not None:
+        response['ETag'] = etag
+        return _finish(response, cache_control, public)
+
+    span = None
+    header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if header and (not if_range or if_range == etag or parse_http_date_safe(if_range) == mtime):
+        try:
+            span = parse_range(header, stat.st_size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return _finish(response, cache_control, public)
+
+    filelike = open(full_path, 'rb')
+    if span is None:
+        response = FileResponse(filelike)
+    else:
+        start, end = span
+        filelike.seek(start)
+        response = RangeFileResponse(filelike, end - start + 1, status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(mtime)
+    return _finish(response, cache_control, public)
+
+
+def _finish(response, cache_control, public):
+    response['Cache-Control'] = cache_control
+    if not public:
+        patch_vary_headers(response, ['Authorization', 'Cookie'])
+    return response
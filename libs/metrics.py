@@ -0,0 +1,289 @@
+# libs/metrics.py
+"""
+Per-request performance instrumentation.
+
+RequestMetricsMiddleware measures, for every request, the total latency,
+the number and time of DB queries, serializer time (Serializer.data) and
+render time (Response.rendered_content). It adds them as a Server-Timing
+header and aggregates them per resolved view/action (e.g.
+`JobViewSet.list`) for GET /metrics, in Prometheus text format.
+
+Settings:
+
+    METRICS = {
+        'ENABLED': False,
+        'TOKEN': '',            # GET /metrics needs "Authorization: Bearer <TOKEN>" (or staff)
+        'SERVER_TIMING': True,
+        'BUCKETS': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    }
+
+When disabled the middleware drops out of the stack (MiddlewareNotUsed)
+and nothing is instrumented. Metrics are kept per process: scrape every
+worker, or run one worker per metrics port.
+"""
+import hmac
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+from rest_framework import serializers
+from rest_framework.response import Response
+
+DEFAULTS = {
+    'ENABLED': False,
+    'TOKEN': '',
+    'SERVER_TIMING': True,
+    'BUCKETS': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+}
+
+# Timings of the request being handled (copied into sync_to_async threads)
+_current = ContextVar('request_timings', default=None)
+
+
+def metrics_settings():
+    return {**DEFAULTS, **getattr(settings, 'METRICS', {})}
+
+
+class RequestTimings:
+    """Counters for one request, filled by the hooks below"""
+
+    __slots__ = ('queries', 'db', 'serialize', 'render', '_active')
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.render = 0.0
+        self._active = set()
+
+
+def record_query(execute, sql, params, many, context):
+    """Connection execute wrapper: time queries made for a request"""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db += time.perf_counter() - started
+
+
+def install_query_wrapper(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def timed_property(prop, name):
+    """Wrap a property so its outermost call adds to RequestTimings.<name>"""
+
+    def getter(self):
+        timings = _current.get()
+        if timings is None or name in timings._active:
+            return prop.fget(self)
+        timings._active.add(name)
+        started = time.perf_counter()
+        try:
+            return prop.fget(self)
+        finally:
+            timings._active.discard(name)
+            setattr(timings, name, getattr(timings, name) + time.perf_counter() - started)
+
+    getter.timed = True
+    return property(getter)
+
+
+def instrument():
+    """Hook DB connections, serializers and renderers (once per process)"""
+    connection_created.connect(install_query_wrapper)
+    for connection in connections.all(initialized_only=True):
+        install_query_wrapper(connection)
+    if not getattr(serializers.BaseSerializer.data.fget, 'timed', False):
+        serializers.BaseSerializer.data = timed_property(
+            serializers.BaseSerializer.data, 'serialize'
+        )
+        Response.rendered_content = timed_property(Response.rendered_content, 'render')
+
+
+def view_name(request):
+    """'JobViewSet.list', 'MeView.get', ... or 'unresolved' for 404s"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    func = match.func
+    view_class = getattr(func, 'cls', None) or getattr(func, 'view_class', None)
+    if view_class is None:
+        return match._func_path
+    method = request.method.lower()
+    actions = getattr(func, 'actions', None)
+    if actions:
+        action = actions.get(method, method)
+    else:
+        action = getattr(func, 'view_initkwargs', {}).get('action', method)
+    return f'{view_class.__name__}.{action}'
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+    return ','.join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+
+class MetricsRegistry:
+    """In-memory counters and latency histograms, keyed by view"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = defaultdict(int)          # (view, method, status)
+            self.latency = {}                         # (view, method) -> [buckets, sum, count]
+            self.queries = defaultdict(int)           # (view, method)
+            self.seconds = defaultdict(float)         # (view, method, part)
+
+    def observe(self, view, method, status, duration, timings, buckets):
+        key = (view, method)
+        with self._lock:
+            self.requests[(view, method, status)] += 1
+            histogram = self.latency.setdefault(key, [[0] * len(buckets), 0.0, 0])
+            for index, bound in enumerate(buckets):
+                if duration <= bound:
+                    histogram[0][index] += 1
+            histogram[1] += duration
+            histogram[2] += 1
+            self.queries[key] += timings.queries
+            for part in ('db', 'serialize', 'render'):
+                self.seconds[(view, method, part)] += getattr(timings, part)
+
+    def render(self, buckets):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            lines += [
+                '# HELP http_requests_total Requests by view, method and status.',
+                '# TYPE http_requests_total counter',
+            ]
+            for (view, method, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'http_requests_total{{{_labels(view=view, method=method, status=status)}}} {count}'
+                )
+
+            lines += [
+                '# HELP http_request_duration_seconds Request latency by view.',
+                '# TYPE http_request_duration_seconds histogram',
+            ]
+            for (view, method), (counts, total, count) in sorted(self.latency.items()):
+                labels = _labels(view=view, method=method)
+                for bound, bucket_count in zip(buckets, counts):
+                    lines.append(
+                        f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {bucket_count}'
+                    )
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f'http_request_duration_seconds_sum{{{labels}}} {total}')
+                lines.append(f'http_request_duration_seconds_count{{{labels}}} {count}')
+
+            lines += [
+                '# HELP http_request_db_queries_total DB queries run by requests, by view.',
+                '# TYPE http_request_db_queries_total counter',
+            ]
+            for (view, method), count in sorted(self.queries.items()):
+                lines.append(
+                    f'http_request_db_queries_total{{{_labels(view=view, method=method)}}} {count}'
+                )
+
+            lines += [
+                '# HELP http_request_part_seconds_total Time spent in db, serialize and render, by view.',
+                '# TYPE http_request_part_seconds_total counter',
+            ]
+            for (view, method, part), seconds in sorted(self.seconds.items()):
+                lines.append(
+                    f'http_request_part_seconds_total{{{_labels(view=view, method=method, part=part)}}} '
+                    f'{seconds}'
+                )
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class RequestMetricsMiddleware:
+    """Time every request; add Server-Timing and feed the registry"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        config = metrics_settings()
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.server_timing = config['SERVER_TIMING']
+        self.buckets = tuple(config['BUCKETS'])
+        instrument()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - started)
+
+    def finish(self, request, response, timings, duration):
+        registry.observe(
+            view_name(request), request.method, response.status_code,
+            duration, timings, self.buckets
+        )
+        if self.server_timing:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries"',
+                f'serialize;dur={timings.serialize * 1000:.2f}',
+                f'render;dur={timings.render * 1000:.2f}',
+                f'total;dur={duration * 1000:.2f}',
+            ])
+        return response
+
+
+def metrics_view(request):
+    """GET /metrics: Prometheus scrape endpoint"""
+    config = metrics_settings()
+    if not config['ENABLED']:
+        raise Http404
+    header = request.headers.get('Authorization', '')
+    token = config['TOKEN']
+    allowed = (
+        (token and hmac.compare_digest(header.encode(), f'Bearer {token}'.encode()))
+        or getattr(request.user, 'is_staff', False)
+    )
+    if not allowed:
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(
+        registry.render(tuple(config['BUCKETS'])),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,77 @@
+# libs/minhash.py
+"""
+MinHash signatures and LSH band keys for near-duplicate text detection.
+
+The Jaccard similarity of two texts' word shingle sets is estimated by
+the share of equal values in their signatures. Signatures are cut into
+BANDS bands of ROWS values; each band hashes to one 64-bit key, and two
+texts share at least one key with probability 1 - (1 - s^ROWS)^BANDS
+for similarity s, i.e. almost surely above ~0.8 and rarely below ~0.5:
+
+    keys = band_keys(signature(shingles(text)))
+    # store keys, look up texts sharing any of them, then verify with
+    jaccard(shingles(text), shingles(other_text))
+
+Hashes are derived from blake2b and a fixed seed, so signatures and keys
+are the same in every process and can be stored.
+"""
+import hashlib
+import random
+import re
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+# Mersenne prime for the (a * x + b) mod P permutations
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 64) - 1
+_rng = random.Random(1)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)
+]
+
+_WORD = re.compile(r'\w+')
+
+
+def _hash64(data):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Set of `size`-word shingles of `text` (lowercased)"""
+    words = _WORD.findall(text.casefold())
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def signature(shingle_set):
+    """NUM_PERM minimum hash values of `shingle_set`"""
+    if not shingle_set:
+        return [_MAX_HASH] * NUM_PERM
+    hashes = [_hash64(shingle.encode()) for shingle in shingle_set]
+    return [min((a * x + b) % _PRIME for x in hashes) for a, b in _PERMUTATIONS]
+
+
+def band_keys(values):
+    """One signed 64-bit key per band (fits a BigIntegerField)"""
+    keys = []
+    for band in range(BANDS):
+        rows = values[band * ROWS:(band + 1) * ROWS]
+        data = f'{band}:{",".join(map(str, rows))}'.encode()
+        keys.append(_hash64(data) - (1 << 63))
+    return keys
+
+
+def estimate(first, second):
+    """Jaccard similarity estimated from two signatures"""
+    return sum(a == b for a, b in zip(first, second)) / NUM_PERM
+
+
+def jaccard(first, second):
+    """Exact Jaccard similarity of two shingle sets"""
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
@@ -0,0 +1,152 @@
+# libs/openapi.py
+"""
+OpenAPI schema served from a file built at deploy time.
+
+SpectacularAPIView introspects every view and serializer on each
+request. Instead, the schema is generated once:
+
+    python manage.py build_openapi_schema
+
+which writes OPENAPI_SCHEMA['PATH'] (JSON) and a gzip copy next to it.
+schema_view serves the gzip bytes to clients that accept them, with a
+strong ETag (304 on If-None-Match) and `Cache-Control: public,
+max-age=MAX_AGE`. The file is re-read only when it changes on disk.
+
+Without the file, DEBUG generates the schema on demand (uncached) so
+local changes show up; other deployments answer 503 until the command
+has run.
+
+Settings:
+
+    OPENAPI_SCHEMA = {
+        'PATH': BASE_DIR / 'build' / 'openapi.json',
+        'MAX_AGE': 86400,
+    }
+"""
+import gzip
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.views.decorators.http import require_safe
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'PATH': None,
+    'MAX_AGE': 86400,
+}
+
+CONTENT_TYPE = 'application/vnd.oai.openapi+json; charset=utf-8'
+
+_ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+def schema_settings():
+    return {**DEFAULTS, **getattr(settings, 'OPENAPI_SCHEMA', {})}
+
+
+def generate_schema():
+    """The OpenAPI document as JSON bytes (slow: introspects every view)"""
+    # Imported here: the generator pulls in most of drf_spectacular
+    from drf_spectacular.generators import SchemaGenerator
+    from drf_spectacular.renderers import OpenApiJsonRenderer
+
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    return OpenApiJsonRenderer().render(schema, renderer_context={})
+
+
+def compress(content):
+    # mtime=0: the same schema always gives the same bytes
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def _write_atomic(path, data):
+    directory = os.path.dirname(path)
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as f:
+        f.write(data)
+    os.replace(f.name, path)
+
+
+def build_artifact(path):
+    """Generate the schema into `path` and `path`.gz, return the Artifact"""
+    artifact = Artifact(generate_schema())
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # The .gz first: a reader seeing the new JSON also finds the new .gz
+    _write_atomic(f'{path}.gz', artifact.gzipped)
+    _write_atomic(path, artifact.content)
+    return artifact
+
+
+class Artifact:
+    """Schema bytes, gzipped bytes and their ETags"""
+
+    def __init__(self, content, gzipped=None):
+        self.content = content
+        self.gzipped = gzipped if gzipped is not None else compress(content)
+        digest = hashlib.sha256(content).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        # Strong ETags differ per encoding
+        self.gzip_etag = f'"{digest}-gzip"'
+
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def load_artifact(path):
+    """The Artifact at `path`, None when it was not built"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        if _loaded.get('key') != key:
+            with open(path, 'rb') as f:
+                content = f.read()
+            try:
+                with open(f'{path}.gz', 'rb') as f:
+                    gzipped = f.read()
+            except FileNotFoundError:
+                gzipped = None
+            if gzipped is not None and gzip.decompress(gzipped) != content:
+                gzipped = None  # Stale .gz (e.g. hand-edited JSON)
+            _loaded.update(key=key, artifact=Artifact(content, gzipped))
+        return _loaded['artifact']
+
+
+@require_safe
+def schema_view(request):
+    """GET /api/schema/: the prebuilt OpenAPI document"""
+    config = schema_settings()
+    artifact = load_artifact(str(config['PATH'])) if config['PATH'] else None
+    cache_control = f'public, max-age={config["MAX_AGE"]}'
+    if artifact is None:
+        if not settings.DEBUG:
+            logger.error('OpenAPI schema not built: run manage.py build_openapi_schema')
+            return JsonResponse(
+                {'detail': 'API schema is not available.'}, status=503
+            )
+        artifact = Artifact(generate_schema())
+        cache_control = 'no-cache'
+
+    use_gzip = bool(_ACCEPTS_GZIP.search(request.headers.get('Accept-Encoding', '')))
+    etag = artifact.gzip_etag if use_gzip else artifact.etag
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(
+            artifact.gzipped if use_gzip else artifact.content, content_type=CONTENT_TYPE
+        )
+        if use_gzip:
+            response['Content-Encoding'] = 'gzip'
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
@@ -0,0 +1,128 @@
+# libs/prefix_index.py
+"""
+In-memory prefix index for autocomplete.
+
+Terms are counted (add/discard) and matched case-insensitively on the
+start of any word, so 'eng' finds 'Senior Engineer'. Lookups bisect a
+sorted list of (word suffix, term key) pairs, so a query costs
+O(log n + matches) with no database access:
+
+    index = PrefixIndex()
+    index.add('Senior Python Engineer')
+    index.add('Python Developer')
+    index.complete('pyth')  # [('Python Developer', 1), ...]
+
+add() inserts into the sorted list, O(n) per new term: load a whole
+index with add_many(), which sorts once.
+
+Results are ranked by count, then alphabetically, and cached per prefix
+until a term matching it is added or discarded. The first spelling
+seen of a term is the one returned ('Python', not 'python' added later).
+Not thread-safe: callers serialize access (see jobs/autocomplete.py).
+"""
+import heapq
+import re
+from bisect import bisect_left
+
+# Sorts after every character a query can contain
+_MAX_CHAR = '\U0010ffff'
+
+_WORD = re.compile(r'\w+')
+_SPACES = re.compile(r'\s+')
+
+# Prefixes whose results are kept, until a matching term changes
+CACHE_SIZE = 1024
+
+
+def normalize(text):
+    return _SPACES.sub(' ', text).strip().casefold()
+
+
+class PrefixIndex:
+    """Counted terms, completed from the start of any of their words"""
+
+    def __init__(self):
+        self.counts = {}    # term key -> count
+        self.display = {}   # term key -> first spelling seen
+        self.entries = []   # sorted (word suffix, term key)
+        self._cache = {}    # prefix -> {limit: results}
+
+    def __len__(self):
+        return len(self.counts)
+
+    @staticmethod
+    def suffixes(key):
+        """`key` from the start of each of its words"""
+        return {key[match.start():] for match in _WORD.finditer(key)}
+
+    def add(self, term, count=1):
+        key = normalize(term)
+        if not key:
+            return
+        if key not in self.counts:
+            self.counts[key] = 0
+            self.display[key] = term.strip()
+            for suffix in self.suffixes(key):
+                entry = (suffix, key)
+                self.entries.insert(bisect_left(self.entries, entry), entry)
+        self.counts[key] += count
+        self._invalidate(key)
+
+    def add_many(self, counts):
+        """add() every term of {term: count}, sorting the entries once"""
+        new = []
+        for term, count in counts.items():
+            key = normalize(term)
+            if not key:
+                continue
+            if key not in self.counts:
+                self.counts[key] = 0
+                self.display[key] = term.strip()
+                new.extend((suffix, key) for suffix in self.suffixes(key))
+            self.counts[key] += count
+        if new:
+            # Timsort merges the two sorted runs in linear time
+            new.sort()
+            self.entries += new
+            self.entries.sort()
+        self._cache.clear()
+
+    def discard(self, term, count=1):
+        key = normalize(term)
+        if key not in self.counts:
+            return
+        self.counts[key] -= count
+        if self.counts[key] <= 0:
+            del self.counts[key], self.display[key]
+            for suffix in self.suffixes(key):
+                position = bisect_left(self.entries, (suffix, key))
+                del self.entries[position]
+        self._invalidate(key)
+
+    def _invalidate(self, key):
+        """Forget the cached results of every prefix matching `key`"""
+        if not self._cache:
+            return
+        for suffix in self.suffixes(key):
+            for end in range(1, len(suffix) + 1):
+                self._cache.pop(suffix[:end], None)
+
+    def complete(self, prefix, limit=10):
+        """[(term, count)] of the `limit` most frequent terms matching `prefix`"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        cached = self._cache.get(prefix, {}).get(limit)
+        if cached is not None:
+            return cached
+
+        start = bisect_left(self.entries, (prefix,))
+        end = bisect_left(self.entries, (prefix + _MAX_CHAR,), start)
+        counts = self.counts
+        # A term with several matching words appears once
+        ranked = {(-counts[key], key) for _, key in self.entries[start:end]}
+        results = [(self.display[key], -count) for count, key in heapq.nsmallest(limit, ranked)]
+        if prefix not in self._cache and len(self._cache) >= CACHE_SIZE:
+            self._cache.clear()
+        self._cache.setdefault(prefix, {})[limit] = results
+        return results
@@ -0,0 +1,235 @@
+# libs/query_budget.py
+"""
+Query budgets and N+1 detection.
+
+Queries are grouped by normalized SQL and by where they came from: the
+serializer field being rendered (e.g. `JobListSerializer.company_name`)
+or else the innermost project frame. The same query repeated REPEATS or
+more times from one place is reported as a suspected N+1.
+
+In tests, wrap a request in a budget; it fails (AssertionError) when the
+endpoint runs more queries than declared or shows an N+1:
+
+    with query_budget(3):
+        self.client.get('/api/jobs/')
+
+    with query_budget.for_view(JobViewSet, 'list'):   # JobViewSet.query_budgets
+        self.client.get('/api/jobs/')
+
+`query_budget` also works as a decorator. On the dev server,
+QueryBudgetMiddleware checks every request against the view's declared
+`query_budgets` and logs a warning instead of failing.
+
+A budget counts every query of the request, authentication included,
+so budget tests send a real JWT rather than force_authenticate(): they
+see what the middleware sees.
+
+Settings:
+
+    QUERY_BUDGETS = {
+        'ENABLED': DEBUG,  # QueryBudgetMiddleware
+        'REPEATS': 3,
+    }
+"""
+import logging
+import re
+import sys
+from collections import Counter
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from libs.metrics import view_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'REPEATS': 3,
+}
+
+# Active QueryRecorders (nested budgets all see every query)
+_recorders = ContextVar('query_recorders', default=())
+
+_IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_SKIPPED_FILES = {__file__, str(Path(__file__).with_name('metrics.py'))}
+
+
+def budget_settings():
+    return {**DEFAULTS, **getattr(settings, 'QUERY_BUDGETS', {})}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def normalize_sql(sql):
+    """Same shape of query = same string: IN lists and numbers collapsed"""
+    return _NUMBER.sub('N', _IN_LIST.sub('(...)', sql))
+
+
+def query_origin():
+    """'Serializer.field' being rendered, else 'path.py:line' of project code"""
+    base_dir = str(settings.BASE_DIR)
+    frame = sys._getframe(2)
+    call_site = None
+    while frame is not None:
+        code = frame.f_code
+        if code.co_name == 'to_representation' and 'field' in frame.f_locals:
+            serializer = frame.f_locals.get('self')
+            field = frame.f_locals['field']
+            return f'{type(serializer).__name__}.{field.field_name}'
+        filename = code.co_filename
+        if (
+            call_site is None
+            and filename.startswith(base_dir)
+            and 'site-packages' not in filename
+            and filename not in _SKIPPED_FILES
+        ):
+            call_site = f'{Path(filename).relative_to(base_dir)}:{frame.f_lineno}'
+        frame = frame.f_back
+    return call_site or 'unknown'
+
+
+def record_query(execute, sql, params, many, context):
+    """Connection execute wrapper feeding the active recorders"""
+    recorders = _recorders.get()
+    if recorders:
+        key = (normalize_sql(sql), query_origin())
+        for recorder in recorders:
+            recorder.queries.append(key)
+    return execute(sql, params, many, context)
+
+
+def install_query_wrapper(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def instrument():
+    connection_created.connect(install_query_wrapper)
+    for connection in connections.all(initialized_only=True):
+        install_query_wrapper(connection)
+
+
+class QueryRecorder:
+    """Collects (normalized sql, origin) for the queries run while active"""
+
+    def __init__(self):
+        self.queries = []
+        self._token = None
+
+    def start(self):
+        instrument()
+        self._token = _recorders.set(_recorders.get() + (self,))
+        return self
+
+    def stop(self):
+        _recorders.reset(self._token)
+
+    def repeated(self, repeats):
+        """[(count, sql, origin)] for queries run `repeats` times or more"""
+        return [
+            (count, sql, origin)
+            for (sql, origin), count in Counter(self.queries).most_common()
+            if count >= repeats
+        ]
+
+    def problems(self, max_queries=None, repeats=None, label='block'):
+        """Human readable budget / N+1 violations, empty when fine"""
+        repeats = repeats or budget_settings()['REPEATS']
+        problems = []
+        if max_queries is not None and len(self.queries) > max_queries:
+            problems.append(
+                f'{label} ran {len(self.queries)} queries, budget is {max_queries}'
+            )
+        for count, sql, origin in self.repeated(repeats):
+            problems.append(f'N+1 suspected in {origin}: {count}x {sql}')
+        return problems
+
+
+class query_budget(ContextDecorator):
+    """Fail when the block runs more than `max_queries` queries or an N+1"""
+
+    def __init__(self, max_queries=None, repeats=None, label='block'):
+        self.max_queries = max_queries
+        self.repeats = repeats
+        self.label = label
+
+    @classmethod
+    def for_view(cls, view_class, action, **kwargs):
+        """Budget declared in view_class.query_budgets[action]"""
+        return cls(
+            view_class.query_budgets[action],
+            label=f'{view_class.__name__}.{action}', **kwargs
+        )
+
+    def __enter__(self):
+        self.recorder = QueryRecorder().start()
+        return self.recorder
+
+    def __exit__(self, exc_type, exc, tb):
+        self.recorder.stop()
+        if exc_type is not None:
+            return False
+        problems = self.recorder.problems(self.max_queries, self.repeats, self.label)
+        if problems:
+            raise QueryBudgetExceeded('\n'.join(problems))
+        return False
+
+
+def declared_budget(request):
+    """(label, budget) from the resolved view's `query_budgets`, if any"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None, None
+    label = view_name(request)
+    view_class = getattr(match.func, 'cls', None) or getattr(match.func, 'view_class', None)
+    budgets = getattr(view_class, 'query_budgets', {})
+    return label, budgets.get(label.rsplit('.', 1)[-1])
+
+
+class QueryBudgetMiddleware:
+    """Dev server: log budget overruns and N+1s instead of failing"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not budget_settings()['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder().start()
+        try:
+            response = self.get_response(request)
+        finally:
+            recorder.stop()
+        self.report(request, recorder)
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder().start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            recorder.stop()
+        self.report(request, recorder)
+        return response
+
+    def report(self, request, recorder):
+        label, budget = declared_budget(request)
+        for problem in recorder.problems(budget, label=label or request.path):
+            logger.warning('%s %s: %s', request.method, request.path, problem)
@@ -0,0 +1,198 @@
+# libs/representation_cache.py
+"""
+Per-object cache of read serializer output.
+
+The same company is serialized in every job of a page, in company lists
+and in /api/companies/me/. A serializer using CachedRepresentationMixin
+stores each object's representation under
+
+    repr:<serializer>:<fields hash>:<model>:<pk>:<updated_at>:<request host hash>
+
+Every save bumps updated_at, so an entry never needs invalidating: a
+changed row simply has a new key, and old entries expire after TIMEOUT.
+The request host is part of the key because file fields render as
+absolute URLs when a request is in the context.
+
+Only the serializer's own fields are cached, i.e. what updated_at
+covers. Nested serializer fields (a job's company, a company's user) are
+rendered by their own serializer, once per related object and response,
+from its cache when it uses the mixin too. A job block therefore stays
+valid when its company changes, and one company block serves all of
+its jobs. Fields reading
+related rows through `source='company.name'` are not covered by
+updated_at: serializers with those must not use the mixin.
+
+With many=True (Meta.list_serializer_class = CachedListSerializer), a
+page costs one get_many for its objects and their nested cached objects,
+and one set_many for the misses:
+
+    class CompanyReadSerializer(CachedRepresentationMixin, serializers.ModelSerializer):
+        class Meta:
+            model = Company
+            list_serializer_class = CachedListSerializer
+
+Settings:
+
+    REPRESENTATION_CACHE = {
+        'ENABLED': True,
+        'ALIAS': 'default',   # CACHES alias
+        'TIMEOUT': 3600,
+    }
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import models
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+
+DEFAULTS = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'TIMEOUT': 3600,
+}
+
+
+def representation_settings():
+    return {**DEFAULTS, **getattr(settings, 'REPRESENTATION_CACHE', {})}
+
+
+def _render(fields, instance):
+    """{name: representation} of `fields`, as Serializer.to_representation"""
+    ret = {}
+    for field in fields:
+        try:
+            attribute = field.get_attribute(instance)
+        except SkipField:
+            continue
+        check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+        ret[field.field_name] = None if check_for_none is None else field.to_representation(attribute)
+    return ret
+
+
+class CachedRepresentationMixin:
+    """ModelSerializer mixin caching each object's own fields (see module docstring)"""
+
+    def representation_key(self, instance):
+        """Cache key of `instance`'s block, None when it cannot be cached"""
+        # __dict__: a deferred updated_at must not cost a query
+        updated_at = instance.__dict__.get('updated_at')
+        if instance.pk is None or updated_at is None:
+            return None
+        root = self.root
+        if not hasattr(root, '_representation_host'):
+            request = self.context.get('request')
+            host = request.build_absolute_uri('/') if request is not None else ''
+            root._representation_host = hashlib.md5(host.encode()).hexdigest()[:8]
+        return (
+            f'{self._key_prefix()}:{instance._meta.label_lower}:{instance.pk}:'
+            f'{updated_at.isoformat()}:{root._representation_host}'
+        )
+
+    def _key_prefix(self):
+        cls = type(self)
+        prefix = cls.__dict__.get('_representation_prefix')
+        if prefix is None:
+            # A deploy changing the fields starts new keys
+            fields = hashlib.md5(','.join(self.fields).encode()).hexdigest()[:8]
+            prefix = f'repr:{cls.__module__}.{cls.__qualname__}:{fields}'
+            cls._representation_prefix = prefix
+        return prefix
+
+    def _layout(self):
+        """[(field, is nested serializer)], computed once per serializer instance"""
+        layout = self.__dict__.get('_representation_layout')
+        if layout is None:
+            layout = self._representation_layout = [
+                (field, isinstance(field, serializers.BaseSerializer))
+                for field in self._readable_fields
+            ]
+        return layout
+
+    def _nested(self, field, instance, ret):
+        """Render nested serializer `field`, once per related object and page"""
+        try:
+            attribute = field.get_attribute(instance)
+        except SkipField:
+            return
+        if not isinstance(attribute, models.Model) or attribute.pk is None:
+            ret.update(_render([field], instance))
+            return
+        memo = self.root.__dict__.setdefault('_nested_representations', {})
+        key = (type(field), attribute._meta.label_lower, attribute.pk)
+        if key not in memo:
+            memo[key] = field.to_representation(attribute)
+        ret[field.field_name] = memo[key]
+
+    def to_representation(self, instance):
+        config = representation_settings()
+        key = self.representation_key(instance) if config['ENABLED'] else None
+        if key is None:
+            return super().to_representation(instance)
+
+        root = self.root
+        found = getattr(root, '_representations', None)
+        if found is not None and key in found:
+            own = found[key]
+        else:
+            own = caches[config['ALIAS']].get(key)
+        if own is None:
+            own = _render([field for field, nested in self._layout() if not nested], instance)
+            misses = getattr(root, '_representation_misses', None)
+            if misses is not None:
+                # Written by CachedListSerializer in one set_many
+                misses[key] = own
+            else:
+                caches[config['ALIAS']].set(key, own, config['TIMEOUT'])
+        if found is not None:
+            found[key] = own
+
+        ret = {}
+        for field, nested in self._layout():
+            if nested:
+                self._nested(field, instance, ret)
+            elif field.field_name in own:
+                ret[field.field_name] = own[field.field_name]
+        return ret
+
+
+class CachedListSerializer(serializers.ListSerializer):
+    """ListSerializer fetching the page's cached blocks in one get_many"""
+
+    def to_representation(self, data):
+        config = representation_settings()
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        if not config['ENABLED']:
+            return [self.child.to_representation(item) for item in items]
+
+        keys = set()
+        # The items, and the objects of their cached nested serializers
+        for serializer, get in [(self.child, None)] + [
+            (field, field.get_attribute) for field in self.child._readable_fields
+            if isinstance(field, CachedRepresentationMixin)
+        ]:
+            for item in items:
+                try:
+                    instance = item if get is None else get(item)
+                except (SkipField, AttributeError, ObjectDoesNotExist):
+                    continue
+                if isinstance(instance, models.Model):
+                    key = serializer.representation_key(instance)
+                    if key is not None:
+                        keys.add(key)
+
+        cache = caches[config['ALIAS']]
+        root = self.root
+        # None: looked up and missing
+        root._representations = {
+            **getattr(root, '_representations', {}), **dict.fromkeys(keys), **cache.get_many(keys)
+        }
+        root._representation_misses = {}
+        ret = [self.child.to_representation(item) for item in items]
+        misses = root.__dict__.pop('_representation_misses')
+        if misses:
+            cache.set_many(misses, config['TIMEOUT'])
+        return ret
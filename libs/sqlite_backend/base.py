@@ -0,0 +1,123 @@
+# libs/sqlite_backend/base.py
+"""
+SQLite backend tuned for serving production traffic from one file.
+
+Django's sqlite3 backend plus a few OPTIONS of its own:
+
+    DATABASES['default'] = {
+        'ENGINE': 'libs.sqlite_backend',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {
+            'pragmas': {'journal_mode': 'WAL', 'synchronous': 'NORMAL', ...},
+            'transaction_mode': 'IMMEDIATE',
+            'serialize_writes': True,
+            'begin_retries': 5,
+            'begin_backoff': 0.05,  # seconds, doubled on every retry
+        },
+    }
+
+`pragmas` run on every new connection. With transaction_mode IMMEDIATE,
+atomic blocks take the write lock at BEGIN instead of upgrading a read
+lock halfway through, which SQLite refuses with "database is locked"
+without waiting for busy_timeout. `serialize_writes` makes the threads
+of one process queue for that lock on a Python lock (FIFO-ish hand-off)
+instead of polling the database file, and a BEGIN that still finds the
+database busy (another process writing) is retried with backoff.
+"""
+import random
+import threading
+import time
+
+from django.db import OperationalError
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+
+BACKEND_OPTIONS = {
+    'pragmas': {},
+    'transaction_mode': None,
+    'serialize_writes': False,
+    'begin_retries': 5,
+    'begin_backoff': 0.05,
+}
+
+# One writer lock per database file, shared by all threads of the process
+_write_locks = {}
+_write_locks_guard = threading.Lock()
+
+
+def write_lock(name):
+    with _write_locks_guard:
+        return _write_locks.setdefault(str(name), threading.Lock())
+
+
+def is_busy(error):
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+class DatabaseWrapper(SQLiteDatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._holds_write_lock = False
+
+    @property
+    def backend_options(self):
+        options = self.settings_dict['OPTIONS']
+        return {name: options.get(name, default) for name, default in BACKEND_OPTIONS.items()}
+
+    def get_connection_params(self):
+        # Ours, not sqlite3.connect() arguments
+        kwargs = super().get_connection_params()
+        for name in BACKEND_OPTIONS:
+            kwargs.pop(name, None)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.backend_options['pragmas'].items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        options = self.backend_options
+        mode = options['transaction_mode']
+        if options['serialize_writes']:
+            write_lock(self.settings_dict['NAME']).acquire()
+            self._holds_write_lock = True
+        try:
+            for attempt in range(options['begin_retries'] + 1):
+                try:
+                    self.cursor().execute(f'BEGIN {mode}' if mode else 'BEGIN')
+                    return
+                except OperationalError as error:
+                    if not is_busy(error) or attempt == options['begin_retries']:
+                        raise
+                    delay = options['begin_backoff'] * 2 ** attempt
+                    time.sleep(delay * random.uniform(0.5, 1.5))
+        except BaseException:
+            self._release_write_lock()
+            raise
+
+    def _release_write_lock(self):
+        if self._holds_write_lock:
+            self._holds_write_lock = False
+            write_lock(self.settings_dict['NAME']).release()
+
+    def _commit(self):
+        try:
+            return super()._commit()
+        finally:
+            self._release_write_lock()
+
+    def _rollback(self):
+        try:
+            return super()._rollback()
+        finally:
+            self._release_write_lock()
+
+    def _close(self):
+        try:
+            return super()._close()
+        finally:
+            self._release_write_lock()
@@ -0,0 +1,247 @@
+# libs/throttling.py
+"""
+Token-bucket rate limiting shared by every worker process on the host.
+
+Views opt in with a scope, e.g. `throttle_scope = 'login'`, and
+TokenBucketThrottle (in DEFAULT_THROTTLE_CLASSES) applies the scope's
+policies. A policy is a bucket of `burst` tokens refilled at `rate`,
+kept per client IP, per user (IP for anonymous requests) or once for
+the whole endpoint:
+
+    RATE_LIMITS = {
+        'ENABLED': False,
+        'STORE': '/dev/shm/mini_sbr-ratelimit.sqlite3',
+        'POLICIES': {
+            'login': [
+                {'per': 'ip', 'rate': '10/min'},
+                {'per': 'endpoint', 'rate': '300/min', 'burst': 100},
+            ],
+        },
+    }
+
+Buckets live in a small SQLite file (tmpfs by default) that all workers
+open; each check is one short write transaction, so processes never see
+a stale count. A request takes a token from each of its scope's buckets
+only when all of them have one: a client denied by the endpoint bucket
+keeps its own. A denied request gets DRF's 429 with Retry-After. If the
+store fails, requests are let through (and logged): rate limiting must
+not take the API down.
+
+Clients are told apart by REST_FRAMEWORK['NUM_PROXIES']: with 0 (the
+default here) the 'ip' is REMOTE_ADDR and X-Forwarded-For, which any
+client can set, is ignored. Behind a reverse proxy set NUM_PROXIES to
+the number of proxies in front of the app.
+"""
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'STORE': None,
+    'POLICIES': {},
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Refill, charge `cost` only if the bucket has it, report what happened
+CONSUME_SQL = '''
+    INSERT INTO buckets (key, tokens, updated, allowed)
+    VALUES (:key, :burst - :cost, :now, 1)
+    ON CONFLICT (key) DO UPDATE SET
+        tokens = CASE
+            WHEN min(:burst, tokens + max(0, :now - updated) * :rate) >= :cost
+            THEN min(:burst, tokens + max(0, :now - updated) * :rate) - :cost
+            ELSE min(:burst, tokens + max(0, :now - updated) * :rate)
+        END,
+        allowed = min(:burst, tokens + max(0, :now - updated) * :rate) >= :cost,
+        updated = :now
+    RETURNING tokens, allowed
+'''
+
+# Tokens of a bucket now, no row when it is new (full)
+PEEK_SQL = '''
+    SELECT min(:burst, tokens + max(0, :now - updated) * :rate)
+    FROM buckets WHERE key = :key
+'''
+
+# Drop idle buckets every CLEANUP_EVERY checks (per process)
+CLEANUP_EVERY = 1000
+
+
+def rate_limit_settings():
+    return {**DEFAULTS, **getattr(settings, 'RATE_LIMITS', {})}
+
+
+def default_store_path():
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(directory, 'mini_sbr-ratelimit.sqlite3')
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60): requests per period in seconds"""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period.strip()[0]]
+
+
+class Policy:
+    """One bucket definition of a scope"""
+
+    def __init__(self, per, rate, burst=None):
+        if per not in ('ip', 'user', 'endpoint'):
+            raise ValueError(f"Rate limit 'per' must be ip, user or endpoint, not {per!r}")
+        count, seconds = parse_rate(rate)
+        self.per = per
+        self.rate = count / seconds  # tokens per second
+        self.burst = burst or count
+
+    @property
+    def refill_seconds(self):
+        """Time for an empty bucket to fill up again"""
+        return self.burst / self.rate
+
+
+class BucketStore:
+    """Token buckets in a SQLite file, one connection per thread"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._checks = 0
+
+    def connection(self):
+        local = self._local
+        # A forked worker must not reuse its parent's connection
+        if getattr(local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            # Buckets are disposable: no fsync
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                'updated REAL NOT NULL, allowed INTEGER NOT NULL)'
+            )
+            local.connection, local.pid = connection, os.getpid()
+        return local.connection
+
+    def consume(self, key, rate, burst, cost=1, now=None):
+        """Take `cost` tokens from `key`: (allowed, seconds until allowed)"""
+        return self.consume_many([(key, rate, burst)], cost, now)
+
+    def consume_many(self, buckets, cost=1, now=None):
+        """
+        Take `cost` tokens from every (key, rate, burst) bucket if they
+        all have them, else from none: (allowed, seconds until allowed)
+        """
+        now = time.time() if now is None else now
+        connection = self.connection()
+        if len(buckets) == 1:
+            # One UPSERT is already all or nothing
+            [(key, rate, burst)] = buckets
+            tokens, allowed = connection.execute(CONSUME_SQL, {
+                'key': key, 'rate': rate, 'burst': burst, 'cost': cost, 'now': now,
+            }).fetchone()
+            return (True, 0) if allowed else (False, (cost - tokens) / rate)
+
+        connection.execute('BEGIN IMMEDIATE')
+        with connection:  # COMMIT, or ROLLBACK on error
+            wait = None
+            for key, rate, burst in buckets:
+                row = connection.execute(PEEK_SQL, {
+                    'key': key, 'rate': rate, 'burst': burst, 'now': now,
+                }).fetchone()
+                tokens = burst if row is None else row[0]
+                if tokens < cost:
+                    wait = max(wait or 0, (cost - tokens) / rate)
+            if wait is not None:
+                return False, wait
+            for key, rate, burst in buckets:
+                connection.execute(CONSUME_SQL, {
+                    'key': key, 'rate': rate, 'burst': burst, 'cost': cost, 'now': now,
+                }).fetchone()
+        return True, 0
+
+    def cleanup(self, idle_seconds, now=None):
+        """Delete buckets untouched for `idle_seconds` (they are full)"""
+        now = time.time() if now is None else now
+        self.connection().execute(
+            'DELETE FROM buckets WHERE updated < ?', (now - idle_seconds,)
+        )
+
+    def maybe_cleanup(self, get_idle_seconds):
+        """cleanup(get_idle_seconds()) once every CLEANUP_EVERY calls"""
+        self._checks += 1
+        if self._checks % CLEANUP_EVERY == 0:
+            self.cleanup(get_idle_seconds())
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    path = rate_limit_settings()['STORE'] or default_store_path()
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = BucketStore(path)
+        return _stores[path]
+
+
+def scope_policies(scope):
+    return [Policy(**policy) for policy in rate_limit_settings()['POLICIES'].get(scope, [])]
+
+
+def longest_refill():
+    """Seconds after which every bucket of every scope is full again"""
+    return max(
+        (policy.refill_seconds
+         for scope in rate_limit_settings()['POLICIES'] for policy in scope_policies(scope)),
+        default=0
+    )
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Apply RATE_LIMITS['POLICIES'][view.throttle_scope]"""
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        scope = getattr(view, 'throttle_scope', None)
+        if not scope or not rate_limit_settings()['ENABLED']:
+            return True
+        policies = scope_policies(scope)
+        if not policies:
+            return True
+
+        store = get_store()
+        try:
+            allowed, wait = store.consume_many([
+                (self.get_bucket_key(scope, policy, request), policy.rate, policy.burst)
+                for policy in policies
+            ])
+            if not allowed:
+                self.retry_after = wait
+                return False
+            store.maybe_cleanup(longest_refill)
+        except sqlite3.Error:
+            logger.exception('Rate limit store %s failed, not limiting', store.path)
+        return True
+
+    def get_bucket_key(self, scope, policy, request):
+        if policy.per == 'endpoint':
+            return f'{scope}:endpoint'
+        user = getattr(request, 'user', None)
+        if policy.per == 'user' and user is not None and user.is_authenticated:
+            return f'{scope}:user:{user.pk}'
+        return f'{scope}:ip:{self.get_ident(request)}'
+
+    def wait(self):
+        return self.retry_after
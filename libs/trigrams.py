@@ -0,0 +1,150 @@
+# libs/trigrams.py
+"""
+Trigram index for typo-tolerant name search, like PostgreSQL's pg_trgm
+but in plain tables, so it works on SQLite too.
+
+A text's trigrams are the 3-character slices of its lowercased,
+accent-stripped words, each padded as '  word ' ('Ahmed' -> '  a', ' ah',
+'ahm', 'hme', 'med', 'ed '). Similarity is shared / all trigrams
+(Jaccard): 'Ahmad Hasan' vs 'Ahmed Hassan' is 0.47.
+
+A model indexes a field by declaring a trigram table and a TrigramIndex:
+
+    class CompanyNameTrigram(AbstractTrigram):
+        owner = models.ForeignKey('Company', on_delete=models.CASCADE, ...)
+
+    class Company(BaseModel):
+        name_index = TrigramIndex('companies.CompanyNameTrigram', 'name')
+
+        def after_save(self, adding, changes):
+            super().after_save(adding, changes)
+            if adding or 'name' in changes:
+                self.name_index.update(self)
+
+and FuzzyFilter(index=Company.name_index) filters a FilterSet by it.
+search() stays one lazy SQL query: the trigram index picks the rows
+sharing enough trigrams to reach the threshold, similarity is computed
+per row in SQL and results come best first, so it also runs under the
+async read views.
+"""
+import math
+import re
+import unicodedata
+
+import django_filters
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils.functional import cached_property
+
+# pg_trgm's default similarity threshold
+SIMILARITY_THRESHOLD = 0.3
+
+_WORD = re.compile(r'\w+')
+
+
+def trigrams(text):
+    """Set of the padded word trigrams of `text`"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char)).casefold()
+    found = set()
+    for word in _WORD.findall(text):
+        padded = f'  {word} '
+        found.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return found
+
+
+def similarity(first, second):
+    """Trigram similarity of two texts, 0-1"""
+    first, second = trigrams(first), trigrams(second)
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+class AbstractTrigram(models.Model):
+    """One trigram of an owner's indexed field; subclasses add `owner`"""
+
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        abstract = True
+
+
+class TrigramIndex:
+    """Keeps `field` of the owners of `model` (an AbstractTrigram) indexed"""
+
+    def __init__(self, model, field):
+        self.model_label = model
+        self.field = field
+
+    @cached_property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def update(self, instance):
+        """Re-index one owner, after its field changed"""
+        self.update_many([instance])
+
+    def update_many(self, instances):
+        with transaction.atomic():
+            self.model.objects.filter(owner__in=[instance.pk for instance in instances]).delete()
+            self.model.objects.bulk_create([
+                self.model(owner_id=instance.pk, trigram=trigram)
+                for instance in instances
+                for trigram in trigrams(getattr(instance, self.field))
+            ], batch_size=1000)
+
+    def rebuild(self, queryset, batch_size=1000):
+        """
+        Re-index every owner in `queryset`, return how many.
+        Each batch replaces its owners' rows in one transaction, so every
+        owner stays searchable throughout; rows of owners outside
+        `queryset` are dropped at the end.
+        """
+        count = 0
+        instances = queryset.only('pk', self.field).order_by('pk')
+        last = None
+        while True:
+            batch = list((instances if last is None else instances.filter(pk__gt=last))[:batch_size])
+            if not batch:
+                break
+            self.update_many(batch)
+            count += len(batch)
+            last = batch[-1].pk
+        self.model.objects.exclude(owner__in=queryset.values('pk')).delete()
+        return count
+
+    def search(self, queryset, query, threshold=SIMILARITY_THRESHOLD):
+        """`queryset` rows similar to `query`, annotated with `similarity`, best first"""
+        wanted = trigrams(query)
+        if not wanted:
+            return queryset.none()
+        rows = self.model.objects.filter(owner=OuterRef('pk')).values('owner')
+        shared = rows.filter(trigram__in=wanted).annotate(n=Count('pk')).values('n')
+        total = rows.annotate(n=Count('pk')).values('n')
+        # shared / |query| bounds the similarity: skip rows sharing too few
+        candidates = (
+            self.model.objects.filter(trigram__in=wanted).values('owner')
+            .annotate(n=Count('pk')).filter(n__gte=math.ceil(threshold * len(wanted)))
+            .values('owner')
+        )
+        shared = Cast(Coalesce(Subquery(shared), 0), FloatField())
+        return queryset.filter(pk__in=candidates).annotate(
+            similarity=shared / (Value(float(len(wanted))) + Subquery(total) - shared)
+        ).filter(similarity__gte=threshold).order_by(F('similarity').desc(), 'pk')
+
+
+class FuzzyFilter(django_filters.CharFilter):
+    """?fuzzy=ahmad hasan: typo-tolerant match on a TrigramIndex, best first"""
+
+    def __init__(self, *args, index, threshold=SIMILARITY_THRESHOLD, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.index = index
+        self.threshold = threshold
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        return self.index.search(qs, value, self.threshold)
@@ -0,0 +1,64 @@
+# libs/zipstream.py
+"""
+ZIP archives streamed while they are written.
+
+zipfile can write to an unseekable stream: each member's sizes and CRC
+then follow its data (a data descriptor) instead of being patched into
+its header. stream_zip() gives ZipFile such a stream and yields what it
+wrote after every chunk copied, so a response can send an archive of
+any size holding one source chunk and one open file at a time, with
+nothing buffered in memory or on disk:
+
+    entries = [ZipEntry('cv.pdf', lambda: open(path, 'rb'), modified, compress=False)]
+    return StreamingHttpResponse(stream_zip(entries), content_type='application/zip')
+
+Members are stored as-is (compress=False) or deflated. Already
+compressed formats (PDF, DOCX, images) gain nothing from deflate and
+cost CPU, so pass compress=False for them.
+"""
+import zipfile
+from typing import Callable, NamedTuple
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ZipEntry(NamedTuple):
+    name: str
+    open: Callable       # () -> binary file, opened when the member is written
+    modified: tuple      # (year, month, day, hour, minute, second)
+    compress: bool = True
+
+
+class _Sink:
+    """Unseekable file collecting the bytes ZipFile writes"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_zip(entries, chunk_size=CHUNK_SIZE):
+    """Yield the bytes of a ZIP archive of `entries` (ZipEntry) as it is written"""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w') as archive:
+        for entry in entries:
+            info = zipfile.ZipInfo(entry.name, date_time=entry.modified)
+            info.compress_type = zipfile.ZIP_DEFLATED if entry.compress else zipfile.ZIP_STORED
+            with entry.open() as source, archive.open(info, 'w') as member:
+                while chunk := source.read(chunk_size):
+                    member.write(chunk)
+                    if sink.chunks:
+                        yield sink.drain()
+    # The central directory
+    yield sink.drain()
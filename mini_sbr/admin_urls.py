@@ -0,0 +1,9 @@
+# mini_sbr/admin_urls.py
+"""
+Admin URLs. mini_sbr/urls.py refers to this module by name, so the
+admin views are only imported when an /admin/ URL is first resolved,
+not on every worker boot.
+"""
+from django.contrib import admin
+
+urlpatterns = admin.site.get_urls()
@@ -0,0 +1,12 @@
+# mini_sbr/docs_urls.py
+"""
+Swagger UI for the prebuilt schema. Like mini_sbr/admin_urls.py, it is
+referenced by module name so drf_spectacular.views is not imported at
+worker boot.
+"""
+from django.urls import path
+from drf_spectacular.views import SpectacularSwaggerView
+
+urlpatterns = [
+    path('', SpectacularSwaggerView.as_view(url_name='schema'), name='docs'),
+]
@@ -34,20 +34,35 @@ INSTALLED_APPS = [
     'companies',
     'candidates',
     'jobs',
+    'audit',
     # 'applications',
     # 'dashboard',
 ]
 
 MIDDLEWARE = [
+    'libs.metrics.RequestMetricsMiddleware',
+    'libs.load_shedding.LoadSheddingMiddleware',
+    'libs.query_budget.QueryBudgetMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'libs.db_router.PrimaryPinMiddleware',
+    'libs.browser_middleware.BrowserOnlyMiddleware',
+]
+
+# Cookie/HTML middleware, skipped for API_PATH_PREFIXES
+# (JWT-only, see libs/browser_middleware.py)
+BROWSER_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+API_PATH_PREFIXES = env.list('API_PATH_PREFIXES', default=['/api/'])
+# The admin's middleware checks only look at MIDDLEWARE; the admin gets
+# sessions, auth and messages from BROWSER_MIDDLEWARE
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
 
 ROOT_URLCONF = 'mini_sbr.urls'
 
@@ -77,6 +92,46 @@ DATABASES = {
     }
 }
 
+# Read replicas (see libs/db_router.py), as database URLs, e.g.
+# DATABASE_REPLICA_URLS=sqlite:////srv/replica1.sqlite3,sqlite:////srv/replica2.sqlite3
+for index, url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[]), start=1):
+    DATABASES[f'replica{index}'] = {
+        **env.db_url_config(url),
+        # Tests read the primary through the replica aliases
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Production SQLite mode (see libs/sqlite_backend/base.py): WAL, tuned
+# pragmas, persistent connections and serialized write transactions
+if env.bool('SQLITE_PRODUCTION', default=False):
+    for database in DATABASES.values():
+        if database['ENGINE'] != 'django.db.backends.sqlite3':
+            continue
+        database.update({
+            'ENGINE': 'libs.sqlite_backend',
+            'CONN_MAX_AGE': env.int('CONN_MAX_AGE', default=600),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pragmas': {
+                    'journal_mode': 'WAL',
+                    'synchronous': 'NORMAL',
+                    'mmap_size': 256 * 1024 * 1024,
+                    'cache_size': -64000,  # KiB, i.e. 64 MB
+                    'busy_timeout': 5000,  # ms
+                    'temp_store': 'MEMORY',
+                },
+                'transaction_mode': 'IMMEDIATE',
+                'serialize_writes': env.bool('SQLITE_SERIALIZE_WRITES', default=True),
+            },
+        })
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['libs.db_router.PrimaryReplicaRouter']
+REPLICA_STICKY_SECONDS = env.int('REPLICA_STICKY_SECONDS', default=5)
+
+# Async list/retrieve views for jobs and companies (set by mini_sbr/asgi.py)
+ASYNC_READ_VIEWS = env.bool('ASYNC_READ_VIEWS', default=False)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -95,6 +150,19 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# GET /media/<path>: permission checks, ranges, optional X-Accel-Redirect
+# to an internal nginx location (see libs/media.py)
+MEDIA_SERVING = {
+    'ACCEL_REDIRECT': env('MEDIA_ACCEL_REDIRECT', default=''),
+    'MAX_AGE': env.int('MEDIA_MAX_AGE', default=3600),
+}
+
+# GET /api/candidates/cvs/: bounds of one streamed CV archive (see candidates/cv_archive.py)
+CV_ARCHIVES = {
+    'MAX_FILES': env.int('CV_ARCHIVE_MAX_FILES', default=100),
+    'MAX_BYTES': env.int('CV_ARCHIVE_MAX_BYTES', default=200 * 1024 * 1024),
+}
+
 # Default primary key
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -117,6 +185,13 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        # Only for views with a throttle_scope, see RATE_LIMITS
+        'libs.throttling.TokenBucketThrottle',
+    ],
+    # Reverse proxies in front of the app: client IPs for rate limits come
+    # from X-Forwarded-For only behind them, else from REMOTE_ADDR
+    'NUM_PROXIES': env.int('NUM_PROXIES', default=0),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
@@ -128,6 +203,98 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
 }
 
+# Audit log (write-behind, see libs/audit.py)
+AUDIT_LOG = {
+    'ENABLED': env.bool('AUDIT_LOG_ENABLED', default=True),
+    'ASYNC': env.bool('AUDIT_LOG_ASYNC', default=True),
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 1.0,
+    'MAX_QUEUE_SIZE': 10000,
+}
+
+# Request metrics: Server-Timing header and GET /metrics (see libs/metrics.py)
+METRICS = {
+    'ENABLED': env.bool('METRICS_ENABLED', default=False),
+    'TOKEN': env('METRICS_TOKEN', default=''),
+    'SERVER_TIMING': env.bool('METRICS_SERVER_TIMING', default=True),
+}
+
+# Query budgets: log N+1s and over-budget views on the dev server
+# (see libs/query_budget.py)
+QUERY_BUDGETS = {
+    'ENABLED': env.bool('QUERY_BUDGETS_ENABLED', default=DEBUG),
+    'REPEATS': 3,
+}
+
+# Rate limits: token buckets per view throttle_scope, shared by the
+# workers of one host (see libs/throttling.py)
+RATE_LIMITS = {
+    'ENABLED': env.bool('RATE_LIMITS_ENABLED', default=False),
+    'STORE': env('RATE_LIMIT_STORE', default=None),
+    'POLICIES': {
+        'login': [
+            {'per': 'ip', 'rate': '10/min'},
+            {'per': 'endpoint', 'rate': '600/min', 'burst': 100},
+        ],
+        'register': [
+            {'per': 'ip', 'rate': '5/hour'},
+            {'per': 'endpoint', 'rate': '120/min', 'burst': 30},
+        ],
+        'public_read': [
+            {'per': 'user', 'rate': '120/min', 'burst': 60},
+        ],
+        # One request per keystroke
+        'autocomplete': [
+            {'per': 'ip', 'rate': '600/min', 'burst': 100},
+        ],
+    },
+}
+
+# In-memory autocomplete index, synced from the job outbox (see jobs/autocomplete.py)
+AUTOCOMPLETE = {
+    'SYNC_INTERVAL': env.float('AUTOCOMPLETE_SYNC_INTERVAL', default=1.0),
+    'REBUILD_INTERVAL': env.int('AUTOCOMPLETE_REBUILD_INTERVAL', default=3600),
+}
+
+# In-memory TF-IDF model for /api/jobs/{id}/similar/ (see jobs/similar.py)
+SIMILAR_JOBS = {
+    'SYNC_INTERVAL': env.float('SIMILAR_JOBS_SYNC_INTERVAL', default=1.0),
+    'REBUILD_INTERVAL': env.int('SIMILAR_JOBS_REBUILD_INTERVAL', default=3600),
+}
+
+# Candidate job feed: rows kept per candidate; job changes are scored by
+# a background thread (see candidates/feed.py)
+JOB_FEED = {
+    'ASYNC': env.bool('JOB_FEED_ASYNC', default=True),
+    'MAX_PER_CANDIDATE': env.int('JOB_FEED_MAX_PER_CANDIDATE', default=200),
+}
+
+# Company/job read serializer output cached per (pk, updated_at)
+# (see libs/representation_cache.py)
+REPRESENTATION_CACHE = {
+    'ENABLED': env.bool('REPRESENTATION_CACHE_ENABLED', default=True),
+    'TIMEOUT': env.int('REPRESENTATION_CACHE_TIMEOUT', default=3600),
+}
+
+# Near-duplicate job postings: 'warn', 'reject' (409) or 'off' (see jobs/duplicates.py)
+JOB_DUPLICATES = {
+    'ON_WRITE': env('JOB_DUPLICATES_ON_WRITE', default='warn'),
+    'THRESHOLD': env.float('JOB_DUPLICATES_THRESHOLD', default=0.8),
+}
+
+# 503 + Retry-After above this many requests in flight per worker
+# process, 0 = off (see libs/load_shedding.py)
+LOAD_SHEDDING = {
+    'MAX_IN_FLIGHT': env.int('MAX_IN_FLIGHT_REQUESTS', default=0),
+    'RETRY_AFTER': env.int('LOAD_SHEDDING_RETRY_AFTER', default=1),
+}
+
+# Prebuilt schema for /api/schema/ (manage.py build_openapi_schema, see libs/openapi.py)
+OPENAPI_SCHEMA = {
+    'PATH': env('OPENAPI_SCHEMA_PATH', default=str(BASE_DIR / 'build' / 'openapi.json')),
+    'MAX_AGE': env.int('OPENAPI_SCHEMA_MAX_AGE', default=86400),
+}
+
 # API Documentation
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Mini-SBR API',
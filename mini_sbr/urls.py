@@ -1,29 +1,31 @@
 # mini_sbr/urls.py
 from django.contrib import admin
 from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-)
+from libs.media import media_view
+from libs.metrics import metrics_view
+from libs.openapi import schema_view
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    # Imported on first use (see mini_sbr/admin_urls.py)
+    path('admin/', ('mini_sbr.admin_urls', 'admin', admin.site.name)),
 
     # API endpoints
     path('api/auth/', include('users.urls')),
     path('api/companies/', include('companies.urls')),
     path('api/candidates/', include('candidates.urls')),
     path('api/jobs/', include('jobs.urls')),
+    path('api/audit/', include('audit.urls')),
     # path('api/applications/', include('applications.urls')),
     # path('api/dashboard/', include('dashboard.urls')),
 
-    # API Documentation
-    # path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    # path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='docs'),
-]
+    # Prometheus scrape endpoint (METRICS_ENABLED, token protected)
+    path('metrics', metrics_view, name='metrics'),
+
+    # API Documentation: prebuilt schema (manage.py build_openapi_schema);
+    # the Swagger UI views are imported on first use (mini_sbr/docs_urls.py)
+    path('api/schema/', schema_view, name='schema'),
+    path('api/docs/', ('mini_sbr.docs_urls', None, None)),
 
-# Serve media files in development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    # Uploaded logos and CVs, permission checked (see libs/media.py)
+    path('media/<path:path>', media_view, name='media'),
+]
@@ -0,0 +1,224 @@
+# users/management/commands/_seed_generators.py
+"""
+Pure-python row generators for the seed_data command.
+
+No Django imports here, so chunks can be generated in worker processes
+and sent back as plain dicts. Every chunk gets its own Random seeded
+from (seed, kind, chunk), so output is the same for any worker count.
+"""
+import random
+
+
+# Weighted roughly by population / job market size
+LOCATIONS = [
+    ('Riyadh', 35),
+    ('Jeddah', 22),
+    ('Dammam', 10),
+    ('Mecca', 8),
+    ('Medina', 6),
+    ('Khobar', 6),
+    ('Dhahran', 4),
+    ('Tabuk', 3),
+    ('Abha', 3),
+    ('Remote', 3),
+]
+
+INDUSTRIES = [
+    ('TECH', 30),
+    ('CONSTRUCTION', 15),
+    ('HEALTHCARE', 15),
+    ('FINANCE', 15),
+    ('EDUCATION', 10),
+    ('RETAIL', 10),
+    ('OTHER', 5),
+]
+
+EMPLOYMENT_TYPES = [
+    ('FULL_TIME', 70),
+    ('CONTRACT', 15),
+    ('PART_TIME', 10),
+    ('INTERNSHIP', 5),
+]
+
+# Skill families: (role titles, skills)
+SKILL_FAMILIES = [
+    (
+        ['Software Engineer', 'Backend Developer', 'Python Developer'],
+        ['Python', 'Django', 'REST APIs', 'PostgreSQL', 'Docker', 'Git',
+         'Redis', 'Celery', 'Linux', 'AWS'],
+    ),
+    (
+        ['Frontend Developer', 'Mobile Developer', 'Full Stack Developer'],
+        ['JavaScript', 'TypeScript', 'React', 'Next.js', 'Flutter', 'Dart',
+         'CSS', 'HTML', 'Node.js', 'Git'],
+    ),
+    (
+        ['Data Analyst', 'Data Scientist', 'BI Developer'],
+        ['SQL', 'Python', 'Tableau', 'Excel', 'Power BI', 'Pandas',
+         'Machine Learning', 'Statistics', 'Spark'],
+    ),
+    (
+        ['Project Manager', 'Product Manager', 'Scrum Master'],
+        ['Project Management', 'Agile', 'Scrum', 'Leadership', 'Jira',
+         'Communication', 'Budgeting', 'Stakeholder Management'],
+    ),
+    (
+        ['Accountant', 'Financial Analyst', 'Auditor'],
+        ['Accounting', 'IFRS', 'Excel', 'SAP', 'Financial Modeling',
+         'Auditing', 'Zakat', 'Budgeting'],
+    ),
+    (
+        ['Site Engineer', 'Civil Engineer', 'Safety Officer'],
+        ['AutoCAD', 'Civil Engineering', 'Site Supervision', 'HSE',
+         'Primavera', 'Quantity Surveying', 'Revit'],
+    ),
+    (
+        ['Nurse', 'Pharmacist', 'Lab Technician'],
+        ['Patient Care', 'BLS', 'Pharmacology', 'Clinical Research',
+         'Laboratory', 'EMR', 'Infection Control'],
+    ),
+]
+
+SENIORITY = [('', 50), ('Junior ', 20), ('Senior ', 22), ('Lead ', 8)]
+
+FIRST_NAMES = [
+    'Ahmed', 'Mohammed', 'Abdullah', 'Omar', 'Khalid', 'Faisal', 'Saad',
+    'Yousef', 'Ali', 'Hassan', 'Fatima', 'Noura', 'Sara', 'Reem', 'Maha',
+    'Huda', 'Lama', 'Amal', 'Aisha', 'Maryam',
+]
+
+LAST_NAMES = [
+    'Al-Rashid', 'Al-Harbi', 'Al-Qahtani', 'Al-Otaibi', 'Al-Ghamdi',
+    'Al-Zahrani', 'Al-Shehri', 'Al-Dossary', 'Hassan', 'Al-Mutairi',
+    'Al-Subaie', 'Al-Anazi',
+]
+
+COMPANY_WORDS = [
+    'Tech', 'Build', 'Health', 'Capital', 'Smart', 'Gulf', 'Najd', 'Red Sea',
+    'Desert', 'Falcon', 'Oasis', 'Horizon', 'Vision', 'Summit', 'Nova',
+]
+
+COMPANY_SUFFIXES = ['Arabia', 'Group', 'Solutions', 'Co.', 'Holding', 'Labs']
+
+# Monthly SAR salary medians per employment type
+SALARY_MEDIANS = {
+    'FULL_TIME': 14000,
+    'CONTRACT': 16000,
+    'PART_TIME': 6000,
+    'INTERNSHIP': 3000,
+}
+
+
+def _rng(seed, kind, chunk):
+    return random.Random(f'{seed}:{kind}:{chunk}')
+
+
+def _pick(rng, weighted):
+    values, weights = zip(*weighted)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _skills(rng, family_skills, low, high):
+    count = min(len(family_skills), rng.randint(low, high))
+    return rng.sample(family_skills, count)
+
+
+def user_rows(seed, start, count):
+    """Users get sequential phones so they stay unique across chunks"""
+    rng = _rng(seed, 'users', start)
+    rows = []
+    for index in range(start, start + count):
+        rows.append({
+            'phone': phone_for(index),
+            'first_name': rng.choice(FIRST_NAMES),
+            'last_name': rng.choice(LAST_NAMES),
+        })
+    return rows
+
+
+def company_rows(seed, start, count):
+    rng = _rng(seed, 'companies', start)
+    rows = []
+    for index in range(start, start + count):
+        industry = _pick(rng, INDUSTRIES)
+        name = (
+            f'{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_WORDS)} '
+            f'{rng.choice(COMPANY_SUFFIXES)} {index}'
+        )
+        rows.append({
+            'name': name,
+            'industry': industry,
+            'location': _pick(rng, LOCATIONS),
+            'description': f'{name} is a {industry.lower()} company.',
+            'website': f'https://company{index}.example.com',
+        })
+    return rows
+
+
+def job_rows(seed, start, count):
+    rng = _rng(seed, 'jobs', start)
+    rows = []
+    for _ in range(count):
+        titles, family_skills = rng.choice(SKILL_FAMILIES)
+        seniority = _pick(rng, SENIORITY)
+        title = f'{seniority}{rng.choice(titles)}'
+        employment_type = _pick(rng, EMPLOYMENT_TYPES)
+        skills = _skills(rng, family_skills, 2, 6)
+        years = {'Junior ': 1, '': 3, 'Senior ': 5, 'Lead ': 8}[seniority]
+
+        # Log-normal spread around the median, scaled by seniority
+        median = SALARY_MEDIANS[employment_type] * (1 + years / 10)
+        salary_min = round(rng.lognormvariate(0, 0.25) * median, -2)
+        salary_max = round(salary_min * rng.uniform(1.2, 1.6), -2)
+        has_salary = rng.random() < 0.8
+
+        rows.append({
+            'title': title,
+            'description': (
+                f'We are hiring a {title} to join our team. '
+                f'You will work with {", ".join(skills)}.'
+            ),
+            'requirements': f'{years}+ years experience',
+            'required_skills': skills,
+            'employment_type': employment_type,
+            'location': _pick(rng, LOCATIONS),
+            'salary_min': salary_min if has_salary else None,
+            'salary_max': salary_max if has_salary else None,
+            'is_active': rng.random() < 0.85,
+        })
+    return rows
+
+
+def candidate_rows(seed, start, count):
+    rng = _rng(seed, 'candidates', start)
+    rows = []
+    for _ in range(count):
+        titles, family_skills = rng.choice(SKILL_FAMILIES)
+        experience = min(30, int(rng.expovariate(1 / 5)))
+        rows.append({
+            'full_name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            'skills': _skills(rng, family_skills, 1, 8),
+            'experience_years': experience,
+            'location': _pick(rng, LOCATIONS),
+            'bio': f'{rng.choice(titles)} with {experience} years experience.',
+        })
+    return rows
+
+
+def phone_for(index):
+    """Seeded users use the 059 range to stay clear of real test accounts"""
+    return f'059{index:07d}'
+
+
+GENERATORS = {
+    'users': user_rows,
+    'companies': company_rows,
+    'jobs': job_rows,
+    'candidates': candidate_rows,
+}
+
+
+def generate_chunk(args):
+    """Entry point for worker processes: (kind, seed, start, count)"""
+    kind, seed, start, count = args
+    return GENERATORS[kind](seed, start, count)
@@ -0,0 +1,158 @@
+# users/management/commands/archive_soft_deleted.py
+"""
+Move rows soft-deleted longer than the retention window into their
+archive tables (every model with an ArchivedObjectsManager).
+
+    python manage.py archive_soft_deleted --days 90
+    python manage.py archive_soft_deleted --model jobs.Job --batch-size 200 --sleep 0.05
+
+Each batch is its own short transaction (copy + delete), so the live
+API is never blocked for long and an interrupted run simply resumes
+where it stopped on the next invocation. A row already in the archive
+fails its batch instead of being skipped.
+
+Rows depending on an archived row are handled explicitly:
+
+- relations listed in the model's archive_discard (derived data such
+  as recommendations or trigram rows) are deleted with it;
+- archivable dependents (a candidate's saved searches) are archived
+  first, the command runs dependents before the models they point to;
+- any other dependent keeps the row live, reported as "kept".
+"""
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from libs.managers import ArchivedObjectsManager
+
+
+def archived_models():
+    """Yield (model, archive_model) for models with an archive table, dependents first"""
+    archives = {}
+    for model in apps.get_models():
+        for manager in model._meta.managers:
+            if isinstance(manager, ArchivedObjectsManager):
+                archives[model] = manager.archive_model
+
+    ordered, seen = [], set()
+
+    def visit(model):
+        if model in seen:
+            return
+        seen.add(model)
+        for relation in model._meta.related_objects:
+            if relation.related_model in archives:
+                visit(relation.related_model)
+        ordered.append(model)
+
+    for model in archives:
+        visit(model)
+    for model in ordered:
+        yield model, archives[model]
+
+
+def discarded_relations(model):
+    """Reverse relations listed in model.archive_discard"""
+    return [model._meta.get_field(name) for name in getattr(model, 'archive_discard', ())]
+
+
+def kept_relations(model):
+    """Reverse relations whose rows keep a row from being archived"""
+    discarded = discarded_relations(model)
+    return [
+        relation for relation in model._meta.related_objects
+        if not relation.many_to_many
+        and relation.on_delete is not models.DO_NOTHING
+        and relation not in discarded
+    ]
+
+
+def archive_batch(model, archive_model, ids, cutoff):
+    """Copy one batch into the archive and delete it from the live table"""
+    columns = [field.attname for field in model._meta.concrete_fields]
+    with transaction.atomic():
+        # Re-check inside the transaction: a row may have been restored
+        expired = model._base_manager.filter(pk__in=ids, deleted_at__lt=cutoff)
+        for relation in kept_relations(model):
+            expired = expired.exclude(**{f'{relation.name}__isnull': False})
+        rows = list(expired.values(*columns))
+        archive_model.objects.bulk_create([archive_model(**row) for row in rows])
+        moved = [row[model._meta.pk.attname] for row in rows]
+        for relation in discarded_relations(model):
+            relation.related_model._base_manager.filter(
+                **{f'{relation.field.name}__in': moved}
+            ).delete()
+        model._base_manager.filter(pk__in=moved).delete()
+    return len(moved)
+
+
+class Command(BaseCommand):
+    help = 'Move long soft-deleted rows into archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=90,
+            help='Archive rows soft-deleted more than this many days ago'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--sleep', type=float, default=0,
+            help='Seconds to pause between batches'
+        )
+        parser.add_argument(
+            '--model', action='append', dest='models',
+            help='Only archive this model (app_label.Model), repeatable'
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        targets = list(archived_models())
+        if options['models']:
+            wanted = {label.lower() for label in options['models']}
+            targets = [t for t in targets if t[0]._meta.label_lower in wanted]
+            if not targets:
+                raise CommandError('No archivable model matches --model')
+
+        for model, archive_model in targets:
+            expired = model._base_manager.filter(
+                deleted_at__lt=cutoff
+            ).order_by('pk')
+            label = model._meta.label
+
+            if options['dry_run']:
+                self.stdout.write(f'{label}: {expired.count()} rows to archive')
+                continue
+
+            total = 0
+            last_pk = 0
+            while True:
+                ids = list(
+                    expired.filter(pk__gt=last_pk)
+                    .values_list('pk', flat=True)[:batch_size]
+                )
+                if not ids:
+                    break
+                try:
+                    total += archive_batch(model, archive_model, ids, cutoff)
+                except IntegrityError as exc:
+                    raise CommandError(
+                        f'{label}: batch after pk {last_pk} not archived: {exc}'
+                    )
+                last_pk = ids[-1]
+                if options['sleep']:
+                    time.sleep(options['sleep'])
+
+            message = f'{label}: archived {total} rows'
+            kept = expired.count()
+            if kept:
+                message += f', kept {kept} still referenced'
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,35 @@
+# users/management/commands/build_openapi_schema.py
+"""
+Generate the OpenAPI schema served at /api/schema/ (see libs/openapi.py).
+Run at deploy time, after collectstatic:
+
+    python manage.py build_openapi_schema
+    python manage.py build_openapi_schema --path /srv/mini_sbr/openapi.json
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from libs.openapi import build_artifact, schema_settings
+
+
+class Command(BaseCommand):
+    help = 'Build the OpenAPI schema artifact (JSON + gzip)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', help="Output file (default: OPENAPI_SCHEMA['PATH'])"
+        )
+
+    def handle(self, *args, **options):
+        path = options['path'] or schema_settings()['PATH']
+        if not path:
+            raise CommandError("Set OPENAPI_SCHEMA['PATH'] or pass --path")
+
+        started = time.perf_counter()
+        artifact = build_artifact(str(path))
+        self.stdout.write(self.style.SUCCESS(
+            f'{path}: {len(artifact.content)} bytes, '
+            f'{len(artifact.gzipped)} gzipped, ETag {artifact.etag} '
+            f'({time.perf_counter() - started:.2f}s)'
+        ))
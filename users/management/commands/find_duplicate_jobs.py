@@ -0,0 +1,53 @@
+# users/management/commands/find_duplicate_jobs.py
+"""
+Cluster near-duplicate job postings across the whole jobs table (see
+jobs/duplicates.py). Jobs without band keys (bulk inserted) are indexed
+first:
+
+    python manage.py find_duplicate_jobs
+    python manage.py find_duplicate_jobs --threshold 0.9 --show 50
+    python manage.py find_duplicate_jobs --reindex
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import duplicates
+from jobs.models import Job, JobBand
+
+
+class Command(BaseCommand):
+    help = 'Find clusters of near-duplicate job postings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold', type=float,
+            help="Jaccard similarity (default: JOB_DUPLICATES['THRESHOLD'])"
+        )
+        parser.add_argument('--show', type=int, default=20, help='Clusters to list')
+        parser.add_argument(
+            '--reindex', action='store_true', help='Recompute every band key first'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['reindex']:
+            JobBand.objects.all().delete()
+        indexed = duplicates.index_missing()
+        if indexed:
+            self.stdout.write(f'Indexed {indexed} jobs in {time.perf_counter() - started:.1f}s')
+
+        clusters = duplicates.clusters(options['threshold'])
+        jobs = Job.objects.select_related('company').in_bulk(
+            [pk for cluster in clusters[:options['show']] for pk in cluster]
+        )
+        for cluster in clusters[:options['show']]:
+            self.stdout.write(f'\n{len(cluster)} postings:')
+            for pk in sorted(cluster):
+                job = jobs[pk]
+                self.stdout.write(f'  #{pk} {job.title} ({job.company.name})')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n{len(clusters)} clusters, {sum(len(cluster) for cluster in clusters)} jobs '
+            f'({time.perf_counter() - started:.1f}s)'
+        ))
@@ -0,0 +1,26 @@
+# users/management/commands/rebuild_job_feed.py
+"""
+Recompute every candidate's job feed (see candidates/feed.py). Writes
+keep the feed current; run this once after deploying the feed or the
+skill tables it is maintained from, after changing the scoring, or after
+seed_data (bulk inserts skip the hooks). Each chunk of candidates is
+committed on its own:
+
+    python manage.py rebuild_job_feed
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from candidates import feed
+
+
+class Command(BaseCommand):
+    help = 'Recompute the materialized candidate job feed'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rows = feed.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'{rows} recommendations written ({time.perf_counter() - started:.2f}s)'
+        ))
@@ -0,0 +1,27 @@
+# users/management/commands/rebuild_name_trigrams.py
+"""
+Re-index candidate and company names for ?fuzzy= search (see
+libs/trigrams.py). Writes keep the index current; run this once after
+deploying it, or after seed_data (bulk inserts skip the hooks):
+
+    python manage.py rebuild_name_trigrams
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from candidates.models import Candidate
+from companies.models import Company
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the trigram indexes of candidate and company names'
+
+    def handle(self, *args, **options):
+        for model in (Candidate, Company):
+            started = time.perf_counter()
+            count = model.name_index.rebuild(model.all_objects.all())
+            self.stdout.write(self.style.SUCCESS(
+                f'{count} {model._meta.verbose_name_plural} indexed '
+                f'({time.perf_counter() - started:.2f}s)'
+            ))
@@ -0,0 +1,166 @@
+# users/management/commands/seed_data.py
+"""
+Generate a large, deterministic dataset for local performance testing.
+
+    python manage.py seed_data
+    python manage.py seed_data --users 100000 --companies 10000 \
+        --jobs 1000000 --candidates 500000 --workers 4
+
+Rows are generated in chunks (optionally in worker processes) and written
+with bulk_create, one transaction per chunk. All users share one
+precomputed password hash, so hashing cost is paid once, not per user.
+"""
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from itertools import cycle
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from users.models import User, UserRole
+from companies.models import Company
+from candidates.models import Candidate
+from jobs.models import Job
+
+from . import _seed_generators as generators
+
+
+class Command(BaseCommand):
+    help = 'Seed database with a large, deterministic load-test dataset'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--companies', type=int, default=100)
+        parser.add_argument('--jobs', type=int, default=5000)
+        parser.add_argument('--candidates', type=int, default=500)
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Rows generated and inserted per chunk'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Processes used to generate rows (1 = in-process)'
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--password', default='password123')
+
+    def handle(self, *args, **options):
+        self.seed = options['seed']
+        self.batch_size = options['batch_size']
+        self.workers = options['workers']
+        n_users = options['users']
+        n_companies = options['companies']
+        n_candidates = options['candidates']
+        n_jobs = options['jobs']
+
+        if self.batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+        if n_companies + n_candidates > n_users:
+            raise CommandError(
+                '--users must be at least --companies + --candidates '
+                '(every profile needs its own user)'
+            )
+        if n_jobs and not n_companies:
+            raise CommandError('--jobs needs at least one company')
+        if User.objects.filter(phone=generators.phone_for(0)).exists():
+            raise CommandError('Seed data already present in this database')
+
+        started = time.perf_counter()
+        self.stdout.write('Seeding database...')
+
+        self.password_hash = make_password(options['password'])
+        self.executor = (
+            ProcessPoolExecutor(max_workers=self.workers)
+            if self.workers > 1 else None
+        )
+        try:
+            # Company users first, then candidate users, then the rest
+            user_ids = self.seed_users(n_users, n_companies)
+            company_user_ids = user_ids[:n_companies]
+            company_ids = self.seed_companies(company_user_ids)
+            self.seed_candidates(
+                user_ids[n_companies:n_companies + n_candidates]
+            )
+            self.seed_jobs(n_jobs, dict(zip(company_ids, company_user_ids)))
+        finally:
+            if self.executor:
+                self.executor.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Database seeded in {time.perf_counter() - started:.1f}s'
+        ))
+
+    def chunks(self, kind, total):
+        """Yield (start, rows) per chunk, in order, generated in parallel"""
+        tasks = [
+            (kind, self.seed, start, min(self.batch_size, total - start))
+            for start in range(0, total, self.batch_size)
+        ]
+        if self.executor:
+            results = self.executor.map(generators.generate_chunk, tasks)
+        else:
+            results = map(generators.generate_chunk, tasks)
+        for task, rows in zip(tasks, results):
+            yield task[2], rows
+
+    def write(self, label, model, total, build):
+        """Bulk insert all chunks of one model and return the new ids"""
+        started = time.perf_counter()
+        ids = []
+        for start, rows in self.chunks(label, total):
+            objs = [build(start + offset, row) for offset, row in enumerate(rows)]
+            with transaction.atomic():
+                created = model.objects.bulk_create(objs, batch_size=self.batch_size)
+            ids.extend(obj.pk for obj in created)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'Created {total} {label} in {elapsed:.1f}s')
+        return ids
+
+    def seed_users(self, total, n_companies):
+        def build(index, row):
+            return User(
+                password=self.password_hash,
+                role=UserRole.COMPANY if index < n_companies else UserRole.CANDIDATE,
+                **row
+            )
+        return self.write('users', User, total, build)
+
+    def seed_companies(self, user_ids):
+        def build(index, row):
+            user_id = user_ids[index]
+            return Company(user_id=user_id, created_by_id=user_id, **row)
+        return self.write('companies', Company, len(user_ids), build)
+
+    def seed_candidates(self, user_ids):
+        def build(index, row):
+            user_id = user_ids[index]
+            return Candidate(user_id=user_id, created_by_id=user_id, **row)
+        return self.write('candidates', Candidate, len(user_ids), build)
+
+    def seed_jobs(self, total, owners):
+        """owners maps company id -> company user id (used as created_by)"""
+        if not total:
+            return []
+        company_ids = list(owners)
+        # Skew postings towards the first companies: a few big employers
+        # post most jobs, the long tail posts one or two.
+        weights = [1 / (rank + 1) for rank in range(len(company_ids))]
+        picker = random.Random(f'{self.seed}:job-companies')
+        assignment = cycle(
+            picker.choices(company_ids, weights=weights, k=min(total, 100000))
+        )
+
+        def build(index, row):
+            company_id = next(assignment)
+            for field in ('salary_min', 'salary_max'):
+                if row[field] is not None:
+                    row[field] = Decimal(row[field]).quantize(Decimal('0.01'))
+            return Job(
+                company_id=company_id,
+                created_by_id=owners[company_id],
+                **row
+            )
+        return self.write('jobs', Job, total, build)
@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
+from libs.managers import soft_delete_children
 
 
 class UserRole(models.TextChoices):
@@ -9,7 +11,23 @@ class UserRole(models.TextChoices):
     CANDIDATE = 'CANDIDATE', 'Candidate'
 
 
-class UserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+    """Bulk operations on users"""
+
+    def deactivate(self, by=None):
+        """
+        Deactivate users and soft delete their profiles (and, through
+        Company.soft_cascade, their jobs) in one transaction.
+        Profiles are not restored on reactivation - use
+        Company.all_objects.filter(user__in=...).restore() for that.
+        """
+        with transaction.atomic():
+            soft_delete_children(self.model, self, by, timezone.now())
+            return self.update(is_active=False)
+    deactivate.queryset_only = True
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     """Custom manager for User model with PHONE as identifier"""
 
     def create_user(self, phone, password=None, **extra_fields):
@@ -58,6 +76,9 @@ class User(AbstractUser):
 
     objects = UserManager()
 
+    # Deactivating a user soft-deletes their profile
+    soft_cascade = ['company', 'candidate']
+
     def __str__(self):
         return self.phone
 
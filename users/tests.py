@@ -1,7 +1,25 @@
-from django.test import TestCase
+import gzip
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+from io import StringIO
+from unittest import mock
+from wsgiref.util import FileWrapper
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+from companies.models import Company
+from candidates.models import Candidate
+from jobs.models import Job
+from libs import media, openapi
+from libs.throttling import BucketStore, get_store
+from .management.commands._seed_generators import generate_chunk
 from .models import User, UserRole
 
 
@@ -203,3 +221,387 @@ class LogoutAPITests(APITestCase):
         url = reverse('logout')
         response = self.client.post(url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class SeedDataCommandTests(TestCase):
+    """Tests for the seed_data management command"""
+
+    def seed(self, **options):
+        options.setdefault('stdout', StringIO())
+        call_command('seed_data', **options)
+
+    def test_seed_creates_requested_volumes(self):
+        """Test seeding creates the requested number of rows"""
+        self.seed(users=30, companies=5, candidates=10, jobs=40, batch_size=7)
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Company.objects.count(), 5)
+        self.assertEqual(Candidate.objects.count(), 10)
+        self.assertEqual(Job.objects.count(), 40)
+        self.assertEqual(
+            User.objects.filter(role=UserRole.COMPANY).count(), 5
+        )
+        self.assertFalse(
+            Company.objects.exclude(user__role=UserRole.COMPANY).exists()
+        )
+
+    def test_seeded_users_share_password(self):
+        """Test seeded users can log in with the seed password"""
+        self.seed(users=3, companies=1, candidates=1, jobs=1, password='seedpass123')
+        user = User.objects.first()
+        self.assertTrue(user.check_password('seedpass123'))
+
+    def test_rows_are_deterministic(self):
+        """Test the same seed always produces the same rows"""
+        first = generate_chunk(('jobs', 7, 0, 50))
+        second = generate_chunk(('jobs', 7, 0, 50))
+        other_seed = generate_chunk(('jobs', 8, 0, 50))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other_seed)
+
+    def test_profiles_cannot_exceed_users(self):
+        """Test every profile needs its own user"""
+        with self.assertRaises(CommandError):
+            self.seed(users=5, companies=3, candidates=3, jobs=0)
+
+    def test_seed_refuses_to_run_twice(self):
+        """Test seeding twice fails instead of colliding on phones"""
+        self.seed(users=2, companies=1, candidates=1, jobs=1)
+        with self.assertRaises(CommandError):
+            self.seed(users=2, companies=1, candidates=1, jobs=1)
+
+
+class UserDeactivateTests(TestCase):
+    """Tests for bulk user deactivation cascading to profiles"""
+
+    def test_deactivate_soft_deletes_profiles_and_jobs(self):
+        """Test deactivating users soft-deletes companies, candidates and jobs"""
+        company_user = User.objects.create_user(
+            phone='0502222222', password='testpass123', role=UserRole.COMPANY
+        )
+        candidate_user = User.objects.create_user(
+            phone='0503333333', password='testpass123', role=UserRole.CANDIDATE
+        )
+        admin = User.objects.create_superuser(phone='0509999999', password='adminpass123')
+        company = Company.objects.create(user=company_user, name='TechCorp', location='Riyadh')
+        Candidate.objects.create(user=candidate_user, full_name='Ahmed Ali')
+        Job.objects.create(
+            company=company, title='Engineer', description='Description',
+            requirements='Requirements', location='Riyadh'
+        )
+
+        count = User.objects.filter(pk__in=[company_user.pk, candidate_user.pk]).deactivate(by=admin)
+
+        self.assertEqual(count, 2)
+        self.assertEqual(User.objects.filter(is_active=False).count(), 2)
+        self.assertEqual(Company.objects.count(), 0)
+        self.assertEqual(Candidate.objects.count(), 0)
+        self.assertEqual(Job.objects.count(), 0)
+        self.assertEqual(Company.all_objects.get().deleted_by, admin)
+
+
+class OpenAPISchemaTests(TestCase):
+    """Tests for the prebuilt OpenAPI schema and its view"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'build', 'openapi.json')
+        cls.output = StringIO()
+        # Generating is slow: build once for the whole class
+        call_command('build_openapi_schema', path=cls.path, stdout=cls.output)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def get(self, **headers):
+        with override_settings(OPENAPI_SCHEMA={'PATH': self.path, 'MAX_AGE': 600}):
+            return self.client.get(reverse('schema'), headers=headers)
+
+    def test_command_writes_json_and_gzip(self):
+        """Test the artifact holds the API paths, plus an identical gzip copy"""
+        with open(self.path, 'rb') as f:
+            content = f.read()
+        with open(f'{self.path}.gz', 'rb') as f:
+            self.assertEqual(gzip.decompress(f.read()), content)
+        self.assertIn('/api/jobs/', json.loads(content)['paths'])
+        self.assertIn('ETag', self.output.getvalue())
+
+    def test_serves_artifact_with_cache_headers(self):
+        """Test the schema is served with an ETag and long caching"""
+        response = self.get()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('/api/jobs/', json.loads(response.content)['paths'])
+        self.assertEqual(response['Cache-Control'], 'public, max-age=600')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_serves_gzip_when_accepted(self):
+        """Test gzip clients get the precompressed bytes and their own ETag"""
+        plain = self.get()
+        response = self.get(accept_encoding='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertNotEqual(response['ETag'], plain['ETag'])
+
+    def test_if_none_match_returns_304(self):
+        """Test revalidation with the ETag returns no body"""
+        etag = self.get()['ETag']
+        response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_reloads_rebuilt_artifact(self):
+        """Test a rebuilt file is picked up without a restart"""
+        path = os.path.join(self.directory.name, 'other.json')
+        with open(path, 'wb') as f:
+            f.write(b'{"openapi": "3.0.3", "paths": {}}')
+        with override_settings(OPENAPI_SCHEMA={'PATH': path}):
+            first = self.client.get(reverse('schema'))
+            with open(path, 'wb') as f:
+                f.write(b'{"openapi": "3.0.3", "paths": {"/x/": {}}}')
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+            second = self.client.get(reverse('schema'))
+        self.assertNotEqual(first['ETag'], second['ETag'])
+        self.assertIn('/x/', json.loads(second.content)['paths'])
+
+    @override_settings(OPENAPI_SCHEMA={'PATH': '/nonexistent/openapi.json'})
+    def test_missing_artifact_is_503(self):
+        """Test production does not generate the schema per request"""
+        with mock.patch.object(openapi, 'generate_schema') as generate:
+            with self.assertLogs('libs.openapi', 'ERROR'):
+                response = self.client.get(reverse('schema'))
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        generate.assert_not_called()
+
+    @override_settings(OPENAPI_SCHEMA={'PATH': '/nonexistent/openapi.json'}, DEBUG=True)
+    def test_missing_artifact_generated_in_debug(self):
+        """Test DEBUG falls back to generating the schema, uncached"""
+        schema = b'{"openapi": "3.0.3", "paths": {}}'
+        with mock.patch.object(openapi, 'generate_schema', return_value=schema):
+            response = self.client.get(reverse('schema'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, schema)
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+
+def consume_all(path, attempts):
+    """Worker process body: how many of `attempts` the shared bucket allowed"""
+    store = BucketStore(path)
+    return sum(store.consume('shared', rate=0.001, burst=50)[0] for _ in range(attempts))
+
+
+class RateLimitTests(APITestCase):
+    """Tests for the shared token-bucket throttles"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store_path = os.path.join(directory.name, 'ratelimit.sqlite3')
+        limits = override_settings(RATE_LIMITS={
+            'ENABLED': True,
+            'STORE': self.store_path,
+            'POLICIES': {
+                'login': [{'per': 'ip', 'rate': '2/min'}],
+                'register': [{'per': 'endpoint', 'rate': '1/hour'}],
+            },
+        })
+        limits.enable()
+        self.addCleanup(limits.disable)
+
+    def login(self, ip='10.0.0.1', **extra):
+        return self.client.post(
+            reverse('login'), {'phone': '0500000000', 'password': 'wrong'},
+            REMOTE_ADDR=ip, **extra
+        )
+
+    def test_login_limited_per_ip(self):
+        """Test the third login attempt in a minute is rejected with Retry-After"""
+        self.assertEqual(self.login().status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.login().status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.login()
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+        # Another client is not affected
+        self.assertEqual(self.login(ip='10.0.0.2').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_endpoint_policy_is_global(self):
+        """Test a per-endpoint bucket is shared by all clients"""
+        data = {'phone': 'invalid', 'password': 'x', 'password_confirm': 'x'}
+        response = self.client.post(reverse('register'), data, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(reverse('register'), data, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_forwarded_for_ignored_without_proxies(self):
+        """Test rotating X-Forwarded-For does not give a client a new bucket"""
+        for forwarded in ('192.0.2.1', '192.0.2.2'):
+            response = self.login(HTTP_X_FORWARDED_FOR=forwarded)
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.login(HTTP_X_FORWARDED_FOR='192.0.2.3')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_denied_request_takes_no_tokens(self):
+        """Test a full endpoint bucket does not drain the client's own bucket"""
+        store = BucketStore(self.store_path)
+        buckets = [('client', 1, 2), ('endpoint', 1, 1)]
+        self.assertEqual(store.consume_many(buckets, now=100), (True, 0))
+        self.assertEqual(store.consume_many(buckets, now=100), (False, 1))
+        self.assertEqual(store.consume_many(buckets, now=100.5), (False, 0.5))
+        # The client bucket still has the token the denied requests did not take
+        self.assertEqual(store.consume('client', rate=1, burst=2, now=100), (True, 0))
+        self.assertEqual(store.consume('client', rate=1, burst=2, now=100), (False, 1))
+
+    @override_settings(RATE_LIMITS={'ENABLED': False})
+    def test_disabled(self):
+        """Test nothing is limited when RATE_LIMITS is off"""
+        for _ in range(5):
+            self.assertEqual(self.login().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bucket_refills(self):
+        """Test tokens come back at the policy rate"""
+        store = BucketStore(self.store_path)
+        self.assertEqual(store.consume('key', rate=1, burst=2, now=100), (True, 0))
+        self.assertEqual(store.consume('key', rate=1, burst=2, now=100), (True, 0))
+        self.assertEqual(store.consume('key', rate=1, burst=2, now=100), (False, 1))
+        self.assertEqual(store.consume('key', rate=1, burst=2, now=100.5), (False, 0.5))
+        self.assertEqual(store.consume('key', rate=1, burst=2, now=101), (True, 0))
+
+    def test_state_shared_across_processes(self):
+        """Test concurrent worker processes never hand out more than the burst"""
+        with multiprocessing.get_context('fork').Pool(4) as pool:
+            allowed = pool.starmap(consume_all, [(self.store_path, 30)] * 4)
+        self.assertEqual(sum(allowed), 50)
+
+    def test_store_failure_lets_requests_through(self):
+        """Test a broken store does not take the API down"""
+        error = sqlite3.OperationalError('disk I/O error')
+        with mock.patch.object(BucketStore, 'consume_many', side_effect=error):
+            with self.assertLogs('libs.throttling', 'ERROR'):
+                for _ in range(3):
+                    self.assertEqual(self.login().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_idle_buckets_cleaned_up(self):
+        """Test cleanup drops buckets that have refilled"""
+        store = get_store()
+        store.consume('old', rate=1, burst=1, now=0)
+        store.consume('new', rate=1, burst=1, now=100)
+        store.cleanup(60, now=100)
+        keys = [row[0] for row in store.connection().execute('SELECT key FROM buckets')]
+        self.assertEqual(keys, ['new'])
+
+
+class MediaViewTests(TestCase):
+    """Tests for the permission-checked, range-aware media view"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        media = override_settings(MEDIA_ROOT=self.directory.name, MEDIA_SERVING={})
+        media.enable()
+        self.addCleanup(media.disable)
+        for name, content in (('logos/logo.png', b'0123456789'), ('cvs/cv.pdf', b'%PDF-1.4 cv')):
+            os.makedirs(os.path.join(self.directory.name, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(self.directory.name, name), 'wb') as f:
+                f.write(content)
+
+        self.company_user = User.objects.create_user(phone='0502222222', role=UserRole.COMPANY)
+        Company.objects.create(
+            user=self.company_user, name='TechCorp', location='Riyadh', logo='logos/logo.png'
+        )
+        self.candidate_user = User.objects.create_user(phone='0503333333', role=UserRole.CANDIDATE)
+        self.candidate = Candidate.objects.create(
+            user=self.candidate_user, full_name='Ahmed Ali', cv_file='cvs/cv.pdf'
+        )
+        self.other_user = User.objects.create_user(phone='0504444444', role=UserRole.CANDIDATE)
+
+    def get(self, path, user=None, **headers):
+        if user is not None:
+            headers['authorization'] = f'Bearer {RefreshToken.for_user(user).access_token}'
+        response = self.client.get(f'/media/{path}', headers=headers)
+        self.addCleanup(response.close)
+        return response
+
+    def test_logo_served_publicly_with_validators(self):
+        """Test logos need no login and come with caching headers"""
+        response = self.get('logos/logo.png')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.getvalue(), b'0123456789')
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        response = self.get('logos/logo.png', if_none_match=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_range_requests(self):
+        """Test single byte ranges get 206, bad ones 416, stale If-Range the whole file"""
+        response = self.get('logos/logo.png', range='bytes=2-5')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response.getvalue(), b'2345')
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(response['Content-Length'], '4')
+
+        self.assertEqual(self.get('logos/logo.png', range='bytes=-3').getvalue(), b'789')
+        self.assertEqual(self.get('logos/logo.png', range='bytes=7-').getvalue(), b'789')
+
+        response = self.get('logos/logo.png', range='bytes=10-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+        etag = self.get('logos/logo.png')['ETag']
+        response = self.get('logos/logo.png', range='bytes=2-5', if_range=etag)
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        response = self.get('logos/logo.png', range='bytes=2-5', if_range='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.getvalue(), b'0123456789')
+
+    def test_range_response_is_bounded(self):
+        """Test a file wrapper ignoring Content-Length still stops at the range end"""
+        filelike = open(os.path.join(self.directory.name, 'logos', 'logo.png'), 'rb')
+        filelike.seek(2)
+        response = media.RangeFileResponse(filelike, 4, status=206)
+        self.addCleanup(response.close)
+        self.assertIsNot(response.file_to_stream, filelike)
+        self.assertFalse(hasattr(response.file_to_stream, 'fileno'))
+        self.assertEqual(response['Content-Length'], '4')
+        self.assertEqual(b''.join(FileWrapper(response.file_to_stream, 3)), b'2345')
+
+    def test_cv_permissions(self):
+        """Test CVs are readable by their candidate, companies and admins only"""
+        self.assertEqual(self.get('cvs/cv.pdf').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(
+            self.get('cvs/cv.pdf', self.other_user).status_code, status.HTTP_403_FORBIDDEN
+        )
+        admin = User.objects.create_superuser(phone='0501111111', password='testpass123')
+        for user in (self.candidate_user, self.company_user, admin):
+            response = self.get('cvs/cv.pdf', user)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.getvalue(), b'%PDF-1.4 cv')
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        self.assertIn('Authorization', response['Vary'])
+
+    def test_only_files_of_live_records_are_served(self):
+        """Test stray files, traversal and deleted profiles' CVs are 404"""
+        with open(os.path.join(self.directory.name, 'cvs', 'stray.pdf'), 'wb') as f:
+            f.write(b'stray')
+        self.assertEqual(
+            self.get('cvs/stray.pdf', self.company_user).status_code, status.HTTP_404_NOT_FOUND
+        )
+        self.assertEqual(self.get('logos/../cvs/cv.pdf').status_code, status.HTTP_404_NOT_FOUND)
+        self.candidate.soft_delete()
+        self.assertEqual(
+            self.get('cvs/cv.pdf', self.company_user).status_code, status.HTTP_404_NOT_FOUND
+        )
+
+    def test_accel_redirect_hands_off_to_proxy(self):
+        """Test ACCEL_REDIRECT sends no body, only the internal location"""
+        with override_settings(MEDIA_SERVING={'ACCEL_REDIRECT': '/protected-media/'}):
+            response = self.get('cvs/cv.pdf', self.company_user)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/cvs/cv.pdf')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response.content, b'')
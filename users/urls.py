@@ -1,16 +1,13 @@
 from django.urls import path
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
-from .views import RegisterView, MeView, LogoutView
+from rest_framework_simplejwt.views import TokenRefreshView
+from .views import RegisterView, LoginView, MeView, LogoutView
 
 urlpatterns = [
     # Registration
     path('register/', RegisterView.as_view(), name='register'),
 
     # JWT Token endpoints
-    path('login/', TokenObtainPairView.as_view(), name='login'),
+    path('login/', LoginView.as_view(), name='login'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 
     # User profile
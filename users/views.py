@@ -1,6 +1,7 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.views import TokenObtainPairView
 from .models import User
 from .serializers import (
     UserReadSerializer,
@@ -17,6 +18,7 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'register'
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -28,6 +30,14 @@ class RegisterView(generics.CreateAPIView):
         }, status=status.HTTP_201_CREATED)
 
 
+class LoginView(TokenObtainPairView):
+    """
+    Obtain a JWT pair (rate limited per IP).
+    POST /api/auth/login/
+    """
+    throttle_scope = 'login'
+
+
 class MeView(generics.RetrieveUpdateAPIView):
     """
     Get or update current user profile.